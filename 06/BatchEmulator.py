@@ -0,0 +1,246 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import os
+import time
+import typing
+import numpy
+from Code import COMP_WORDS, DEST_BITS, JUMP_BITS
+from Disassembler import read_words
+from Emulator import Emulator, ram_assignment, halt_addresses
+
+
+# The fields of a C-instruction word, as Code encodes them.
+_M_BIT = COMP_WORDS["M"] ^ COMP_WORDS["A"]  # y is M instead of A
+_ALU_PREFIX = COMP_WORDS["0"] & 0xE000  # 111 for the ALU, 101 for a shift
+_ALU_SHIFT = DEST_BITS["AMD"].bit_length()  # c1..c6 are above the dest
+_SHIFT_LEFT_BIT = COMP_WORDS["A<<"] ^ COMP_WORDS["A>>"]
+_SHIFT_D_BIT = COMP_WORDS["D<<"] ^ COMP_WORDS["A<<"]  # shifts D, not y
+_DEST_A = DEST_BITS["A"]
+_DEST_D = DEST_BITS["D"]
+_DEST_M = DEST_BITS["M"]
+_JLT = JUMP_BITS["JLT"]
+_JEQ = JUMP_BITS["JEQ"]
+_JGT = JUMP_BITS["JGT"]
+
+
+def _bit_mask(words: numpy.ndarray, bit: int) -> numpy.ndarray:
+    """Returns -1 where the words have the bit set, and 0 elsewhere."""
+    return -((words & bit) != 0).astype(numpy.int32)
+
+
+class BatchEmulator:
+    """Runs many Hack machines in lockstep, one instruction of all of them
+    at a time, with NumPy.
+
+    Every machine, or lane, runs one of the programs: lane i runs program
+    i modulo the number of programs, so a single program runs on all the
+    lanes, each with its own inputs in its RAM, and as many programs as
+    lanes run one per lane. The registers of the lanes are the int32 arrays
+    a, d and pc, holding signed 16-bit values as Emulator does, and their
+    RAM is the int16 array ram, of one row of 32K words per lane (64KB per
+    lane), with the screen memory maps of all lanes in screen. The caller
+    may read and write all of them between runs.
+
+    Every step fetches the instruction word of every running lane, and
+    executes it by the fields Code encodes in it: an A-instruction and
+    every computation of a C-instruction are computed for all the lanes,
+    and their results are selected per lane by masks, so lanes at
+    different addresses, whose PCs diverged, run their own instructions in
+    the same step. A lane stops after it executes the jump of a halting
+    loop of its program, where Emulator.run stops, and the steps then skip
+    it, so every lane ends in the state, and with the steps, of an
+    Emulator running its program.
+    """
+
+    def __init__(self, programs: typing.Sequence[typing.Sequence[int]],
+                 lanes: typing.Optional[int] = None) -> None:
+        """Loads the programs and resets the machines.
+
+        Args:
+            programs (typing.Sequence[typing.Sequence[int]]): the instruction
+                words of the ROM of every program.
+            lanes (typing.Optional[int]): the number of machines, the number
+                of programs by default.
+        """
+        if not programs:
+            raise ValueError("no programs to run")
+        lanes = len(programs) if lanes is None else lanes
+        self.__roms = numpy.zeros((len(programs), Emulator.ROM_SIZE),
+                                  numpy.int32)
+        # the jumps of the halting loops of every program
+        self.__halts = numpy.zeros((len(programs), Emulator.ROM_SIZE + 1),
+                                   bool)
+        for index, words in enumerate(programs):
+            if len(words) > Emulator.ROM_SIZE:
+                raise ValueError("program " + str(index) +
+                                 " does not fit in the ROM")
+            self.__roms[index, :len(words)] = words
+            self.__halts[index, list(halt_addresses(list(words)))] = True
+        self.program = numpy.arange(lanes) % len(programs)
+        self.ram = numpy.zeros((lanes, Emulator.RAM_SIZE), numpy.int16)
+        self.screen = self.ram[:, Emulator.SCREEN:Emulator.KBD]
+        self.a = numpy.zeros(lanes, numpy.int32)
+        self.d = numpy.zeros(lanes, numpy.int32)
+        self.pc = numpy.zeros(lanes, numpy.int32)
+        self.steps = numpy.zeros(lanes, numpy.int64)
+
+    @staticmethod
+    def load(paths: typing.Sequence[str],
+             lanes: typing.Optional[int] = None) -> "BatchEmulator":
+        """
+        Args:
+            paths (typing.Sequence[str]): .hack files, or packed .rom images.
+            lanes (typing.Optional[int]): the number of machines.
+
+        Returns:
+            BatchEmulator: an emulator of the programs.
+        """
+        return BatchEmulator([read_words(path)[0] for path in paths], lanes)
+
+    @property
+    def lanes(self) -> int:
+        """The number of machines."""
+        return len(self.pc)
+
+    def reset(self) -> None:
+        """Restarts all the machines, keeping their RAM."""
+        self.a[:] = 0
+        self.d[:] = 0
+        self.pc[:] = 0
+        self.steps[:] = 0
+
+    @property
+    def halted(self) -> numpy.ndarray:
+        """Is every lane in its halting loop, as an array of bools? This is
+        Emulator.halted, at the jump of the loop or at the A-instruction
+        before it.
+        """
+        return self.__halts[self.program, self.pc] | \
+            self.__halts[self.program, self.pc + 1]
+
+    def run(self, max_steps: int = 1 << 62) -> int:
+        """Executes instructions until all the lanes halt, or until the
+        given number of steps were executed. steps counts the instructions
+        every lane executed. As Emulator.run, a lane which halted already
+        runs its halting loop once more.
+
+        Args:
+            max_steps (int): the maximal number of instructions to execute
+                in every lane.
+
+        Returns:
+            int: the number of steps executed, that is, of instructions of
+            the lane that ran the longest.
+        """
+        roms = self.__roms
+        halts = self.__halts
+        ram = self.ram.reshape(-1)  # indexed by the rows of the lanes
+        lanes = numpy.arange(self.lanes)
+        rows = lanes * Emulator.RAM_SIZE
+        program = self.program[lanes]
+        single = len(roms) == 1  # then the ROM is fetched from by PC alone
+        a, d, pc = self.a[lanes], self.d[lanes], self.pc[lanes]
+        executed = 0
+        while executed < max_steps and len(lanes):
+            stopped = halts[program, pc]  # after the word at PC
+            word = roms[0, pc] if single else roms[program, pc]
+            address = a & 0x7FFF
+            y = numpy.where(word & _M_BIT, ram[rows + address], a)
+
+            # the ALU: zx, nx, zy, ny and no as masks, so it is branchless
+            x = (d & ~_bit_mask(word, 32 << _ALU_SHIFT)) ^ \
+                _bit_mask(word, 16 << _ALU_SHIFT)
+            y_in = (y & ~_bit_mask(word, 8 << _ALU_SHIFT)) ^ \
+                _bit_mask(word, 4 << _ALU_SHIFT)
+            out = numpy.where(word & (2 << _ALU_SHIFT), x + y_in, x & y_in) ^ \
+                _bit_mask(word, 1 << _ALU_SHIFT)
+            shifted = numpy.where(word & _SHIFT_D_BIT, d, y)
+            shifted = numpy.where(word & _SHIFT_LEFT_BIT, shifted << 1,
+                                  shifted >> 1)
+            out = numpy.where(word & _ALU_PREFIX == _ALU_PREFIX, out, shifted)
+            out = ((out + 0x8000) & 0xFFFF) - 0x8000
+
+            c_instruction = word >= 0x8000
+            writes_m = c_instruction & (word & _DEST_M != 0)
+            ram[rows[writes_m] + address[writes_m]] = out[writes_m]
+            jumps = c_instruction & (((word & _JLT != 0) & (out < 0)) |
+                                     ((word & _JEQ != 0) & (out == 0)) |
+                                     ((word & _JGT != 0) & (out > 0)))
+            pc = numpy.where(jumps, address, (pc + 1) & 0x7FFF)
+            a = numpy.where(c_instruction,
+                            numpy.where(word & _DEST_A, out, a), word)
+            d = numpy.where(c_instruction & (word & _DEST_D != 0), out, d)
+            executed += 1
+
+            if stopped.any():
+                # the lane keeps its state, and the steps skip it from now
+                done = lanes[stopped]
+                self.a[done], self.d[done], self.pc[done] = \
+                    a[stopped], d[stopped], pc[stopped]
+                self.steps[done] += executed
+                running = ~stopped
+                lanes, rows = lanes[running], rows[running]
+                program = program[running]
+                a, d, pc = a[running], d[running], pc[running]
+        self.a[lanes], self.d[lanes], self.pc[lanes] = a, d, pc
+        self.steps[lanes] += executed
+        return executed
+
+
+if "__main__" == __name__:
+    # Runs programs on many machines at once, and reports the throughput.
+    argument_parser = argparse.ArgumentParser(
+        prog="BatchEmulator", description="Runs Hack programs on many "
+                                          "machines in lockstep, headlessly.")
+    argument_parser.add_argument(
+        "input_paths", nargs="+", metavar="input_path",
+        help="a .hack file or a packed .rom image, lane i runs program i "
+             "modulo the number of programs")
+    argument_parser.add_argument(
+        "--lanes", type=int,
+        help="the number of machines (default: the number of programs)")
+    argument_parser.add_argument(
+        "--steps", type=int, default=10 ** 6,
+        help="stop after this many instructions, unless all the lanes halt "
+             "before (default: 1000000)")
+    argument_parser.add_argument(
+        "--set", type=ram_assignment, action="append", default=[],
+        metavar="ADDRESS=VALUE", help="set a RAM word of all the lanes "
+                                      "before running")
+    argument_parser.add_argument(
+        "--lane-index", type=int, action="append", default=[],
+        metavar="ADDRESS", help="set this RAM word of every lane to the "
+                                "index of the lane before running")
+    argument_parser.add_argument(
+        "--print", type=int, nargs="+", default=[], metavar="ADDRESS",
+        dest="addresses", help="print these RAM words of every lane after "
+                               "running")
+    arguments = argument_parser.parse_args()
+
+    emulator = BatchEmulator.load(
+        [os.path.abspath(path) for path in arguments.input_paths],
+        arguments.lanes)
+    for ram_address, ram_value in arguments.set:
+        emulator.ram[:, ram_address] = ram_value
+    for ram_address in arguments.lane_index:
+        emulator.ram[:, ram_address] = numpy.arange(emulator.lanes)
+    start = time.perf_counter()
+    executed = emulator.run(arguments.steps)
+    seconds = time.perf_counter() - start
+    instructions = int(emulator.steps.sum())
+    print(str(emulator.lanes) + " lanes, " + str(executed) + " steps, " +
+          str(instructions) + " instructions in " + format(seconds, ".3f") +
+          "s, " + format(instructions / max(seconds, 1e-9), ",.0f") +
+          " instructions/s, " + str(int(emulator.halted.sum())) + " halted")
+    if arguments.addresses:
+        for lane in range(emulator.lanes):
+            print("lane " + str(lane) + ": " + ", ".join(
+                "RAM[" + str(ram_address) + "] = " +
+                str(emulator.ram[lane, ram_address])
+                for ram_address in arguments.addresses))
@@ -0,0 +1,237 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import typing
+from SymbolTable import SymbolTable
+from Parser import Parser
+from Code import Code
+import Main
+
+
+# C-commands the generated programs are made of, as a VM translator emits.
+_C_COMMANDS = ["D=A", "D=M", "M=D", "A=M", "AM=M-1", "M=M+1", "M=M-1",
+               "D=D+M", "D=M-D", "A=A-1", "M=-1", "M=0", "D;JNE", "D;JGT",
+               "0;JMP", "M=M<<", "D=D>>"]
+
+# The real programs timed next to the generated ones.
+_BASELINES = [os.path.join("pong", "Pong.asm"),
+              os.path.join("rect", "Rect.asm")]
+
+
+def generate_program(size: int, label_density: float = 0.05,
+                     variables: int = 100, comment_ratio: float = 0.2,
+                     seed: int = 0) -> str:
+    """Generates a synthetic assembly program.
+
+    Args:
+        size (int): the number of instructions.
+        label_density (float): the number of labels per instruction.
+        variables (int): the number of distinct variables.
+        comment_ratio (float): the number of comment and blank lines per
+            instruction.
+        seed (int): the seed of the generator, the same arguments always
+            generate the same program.
+
+    Returns:
+        str: the program.
+    """
+    rng = random.Random(seed)
+    label_count = max(1, int(size * label_density))
+    labels = ["LABEL_" + str(i) for i in range(label_count)]
+    variable_names = ["var." + str(i) for i in range(max(1, variables))]
+    label_positions = set(rng.sample(range(size), min(label_count, size)))
+    unplaced = list(labels)
+
+    lines = []
+    for i in range(size):
+        while rng.random() < comment_ratio:
+            lines.append(rng.choice(["", "// generated comment " + str(i)]))
+        if i in label_positions and unplaced:
+            lines.append("(" + unplaced.pop() + ")")
+
+        if i % 2 == 0:
+            kind = rng.random()
+            if kind < 0.4:
+                lines.append("@" + rng.choice(labels))
+            elif kind < 0.7:
+                lines.append("@" + rng.choice(variable_names))
+            elif kind < 0.85:
+                lines.append("@" + str(rng.randrange(32768)))
+            else:
+                lines.append("@" + rng.choice(["SP", "LCL", "ARG", "R13"]))
+        else:
+            command = rng.choice(_C_COMMANDS)
+            if rng.random() < 0.1:
+                command += " // trailing comment"
+            lines.append(command)
+
+    # labels left over mark the end of the program
+    for label in unplaced:
+        lines.append("(" + label + ")")
+    return "\n".join(lines) + "\n"
+
+
+def _best_time(function: typing.Callable[[], typing.Any],
+               repeat: int) -> float:
+    """Returns the best wall time of the function, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _parse(source: str) -> None:
+    """Parses the whole program, calling the accessors of every command."""
+    parser = Parser(io.StringIO(source))
+    while parser.has_more_commands():
+        parser.advance()
+        if parser.command_type() == "C_COMMAND":
+            parser.dest()
+            parser.comp()
+            parser.jump()
+        else:
+            parser.symbol()
+
+
+def _parsed(source: str) -> typing.Tuple[
+        typing.List[str], typing.List[str], typing.List[str], int]:
+    """Returns the labels, A-command symbols and C-commands of the program,
+    and its number of instructions.
+    """
+    labels, symbols, c_commands = [], [], []
+    instructions = 0
+    parser = Parser(io.StringIO(source))
+    while parser.has_more_commands():
+        parser.advance()
+        c_type = parser.command_type()
+        if c_type == "L_COMMAND":
+            labels.append(parser.symbol())
+            continue
+        instructions += 1
+        if c_type == "A_COMMAND":
+            if not parser.symbol().isnumeric():
+                symbols.append(parser.symbol())
+        else:
+            c_commands.append(parser.command())
+    return labels, symbols, c_commands, instructions
+
+
+def _resolve(labels: typing.List[str], symbols: typing.List[str]) -> None:
+    """Resolves the symbols the way the assembler does."""
+    symbol_table = SymbolTable()
+    for address, label in enumerate(labels):
+        symbol_table.add_entry(label, address)
+    for symbol in symbols:
+        if symbol_table.contains(symbol):
+            symbol_table.get_address(symbol)
+        else:
+            symbol_table.add_variable(symbol)
+
+
+def _encode(c_commands: typing.List[str]) -> None:
+    """Encodes every C-command."""
+    for command in c_commands:
+        Code.c_instruction(command)
+
+
+def _assemble(source: str, assemble_function: typing.Callable,
+              **options) -> None:
+    """Assembles the program into memory with the given assembler entry."""
+    assemble_function(io.StringIO(source), io.StringIO(), **options)
+
+
+def benchmark(name: str, source: str, repeat: int = 5) -> \
+        typing.Dict[str, typing.Any]:
+    """Times the assembler stages separately and end to end on a program.
+
+    Args:
+        name (str): the name of the program, for the results.
+        source (str): the program.
+        repeat (int): how many times every measurement is repeated, the best
+            time is reported.
+
+    Returns:
+        typing.Dict[str, typing.Any]: the results, times are in seconds and
+        memory in bytes.
+    """
+    labels, symbols, c_commands, instructions = _parsed(source)
+    end_to_end = {
+        "two_pass": (Main.assemble_file, dict()),
+        "single_pass": (Main.assemble_file_single_pass, dict()),
+        "streaming": (Main.assemble_file, dict(streaming=True)),
+    }
+
+    results = {
+        "name": name,
+        "lines": source.count("\n"),
+        "bytes": len(source),
+        "instructions": instructions,
+        "labels": len(labels),
+        "parser": _best_time(lambda: _parse(source), repeat),
+        "symbol_table": _best_time(lambda: _resolve(labels, symbols), repeat),
+        "code": _best_time(lambda: _encode(c_commands), repeat),
+    }
+    for mode, (assemble_function, options) in end_to_end.items():
+        results[mode] = _best_time(
+            lambda: _assemble(source, assemble_function, **options), repeat)
+
+        tracemalloc.start()
+        _assemble(source, assemble_function, **options)
+        results[mode + "_peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return results
+
+
+if "__main__" == __name__:
+    # Benchmarks the assembler on generated programs and on the real
+    # baselines, and writes the results as JSON.
+    argument_parser = argparse.ArgumentParser(
+        prog="Benchmark", description="Benchmarks the Hack assembler.")
+    argument_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="the number of instructions of every generated program")
+    argument_parser.add_argument("--label-density", type=float, default=0.05)
+    argument_parser.add_argument("--variables", type=int, default=100)
+    argument_parser.add_argument("--comment-ratio", type=float, default=0.2)
+    argument_parser.add_argument("--seed", type=int, default=0)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument(
+        "--output", "-o", help="write the JSON results to this file instead "
+                               "of the standard output")
+    arguments = argument_parser.parse_args()
+
+    all_results = []
+    for program_size in arguments.sizes:
+        program = generate_program(
+            program_size, arguments.label_density, arguments.variables,
+            arguments.comment_ratio, arguments.seed)
+        all_results.append(benchmark(
+            "generated-" + str(program_size), program, arguments.repeat))
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for baseline in _BASELINES:
+        with open(os.path.join(directory, baseline), 'r') as baseline_file:
+            all_results.append(benchmark(
+                baseline, baseline_file.read(), arguments.repeat))
+
+    report = json.dumps({"python": sys.version.split()[0],
+                         "results": all_results}, indent=2)
+    if arguments.output is None:
+        print(report)
+    else:
+        with open(arguments.output, 'w') as output_file:
+            output_file.write(report + "\n")
@@ -0,0 +1,196 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import array
+import collections
+import hashlib
+import typing
+
+
+# The c1..c6 bits of the standard computations -> a Python expression of
+# their signed 16-bit result, in terms of d and y (A or M).
+_ALU_EXPRESSIONS = {
+    0b101010: "0",
+    0b111111: "1",
+    0b111010: "-1",
+    0b001100: "d",
+    0b110000: "{y}",
+    0b001101: "~d",
+    0b110001: "~{y}",
+    0b001111: "((32768 - d) & 65535) - 32768",
+    0b110011: "((32768 - {y}) & 65535) - 32768",
+    0b011111: "((d + 32769) & 65535) - 32768",
+    0b110111: "(({y} + 32769) & 65535) - 32768",
+    0b001110: "((d + 32767) & 65535) - 32768",
+    0b110010: "(({y} + 32767) & 65535) - 32768",
+    0b000010: "((d + {y} + 32768) & 65535) - 32768",
+    0b010011: "((d - {y} + 32768) & 65535) - 32768",
+    0b000111: "(({y} - d + 32768) & 65535) - 32768",
+    0b000000: "d & {y}",
+    0b010101: "d | {y}",
+}
+
+# The jump bits -> the condition on out, for the conditional jumps.
+_JUMP_CONDITIONS = {0b001: "out > 0", 0b010: "out == 0", 0b011: "out >= 0",
+                    0b100: "out < 0", 0b101: "out != 0", 0b110: "out <= 0"}
+
+# The longest block compiled, in instructions.
+MAX_BLOCK_SIZE = 256
+
+# The number of ROMs whose compiled blocks are kept for the next emulator.
+MAX_CACHED_ROMS = 16
+
+# ROM hash -> (address -> (block function, block size)), shared by all the
+# emulators of the same ROM, least recently used first.
+_compiled_roms = collections.OrderedDict()
+
+
+def _comp_expression(word: int, y: str) -> typing.Optional[str]:
+    """Returns the Python expression of the computation of a C-instruction
+    word, or None if it has none (a computation no assembler emits).
+    """
+    if word >> 13 & 3 == 3:
+        expression = _ALU_EXPRESSIONS.get(word >> 6 & 0b111111)
+        return None if expression is None else expression.format(y=y)
+    value = "d" if word & (1 << 10) else y
+    if word & (1 << 11):
+        return "(((" + value + " << 1) + 32768) & 65535) - 32768"
+    return value + " >> 1"
+
+
+class BlockCompiler:
+    """Translates the basic blocks of a ROM into Python functions.
+
+    A block starts at the address execution enters it, and runs up to and
+    including its first unconditional jump, or MAX_BLOCK_SIZE instructions.
+    A conditional jump leaves the block early when taken, so a block is a
+    superblock of the basic blocks falling through into each other. Blocks
+    are compiled on first entry, so computed jumps to any address work. A
+    block is a function taking the RAM and the A and D registers, and
+    returning the next PC, the new A and D, and the number of instructions
+    executed. A and D are locals, and a value loaded by an A-instruction is
+    folded into the instructions that use it, instead of being assigned.
+    The RAM holds exactly 32K words, so indexing it with the signed value
+    of A, negative or not, reads the word at the 15-bit address of A.
+
+    The compiled blocks are cached per ROM hash, so every emulator of the
+    same program shares them. The cache keeps the blocks of the
+    MAX_CACHED_ROMS most recently loaded ROMs, an evicted ROM keeps its
+    blocks as long as one of its emulators lives.
+    """
+
+    def __init__(self, words: typing.Sequence[int],
+                 functions: typing.Callable[[int], typing.Callable]) -> None:
+        """Gets ready to compile the blocks of a ROM.
+
+        Args:
+            words (typing.Sequence[int]): the 32K words of the ROM.
+            functions (typing.Callable[[int], typing.Callable]): returns, for
+                a C-instruction word with a computation that has no
+                expression, the function computing out(D, y).
+        """
+        self.__words = words
+        self.__functions = functions
+        digest = hashlib.sha256(array.array('H', words).tobytes()).digest()
+        self.__blocks = _compiled_roms.setdefault(digest, dict())
+        _compiled_roms.move_to_end(digest)
+        while len(_compiled_roms) > MAX_CACHED_ROMS:
+            _compiled_roms.popitem(last=False)
+
+    def block(self, address: int) -> \
+            typing.Tuple[typing.Callable[[array.array, int, int],
+                                         typing.Tuple[int, int, int, int]],
+                         int]:
+        """
+        Args:
+            address (int): the address of the first instruction of the block.
+
+        Returns:
+            typing.Tuple[typing.Callable, int]: the block function, and the
+            largest number of instructions it executes.
+        """
+        block = self.__blocks.get(address)
+        if block is None:
+            block = self.__blocks[address] = self.__compile(address)
+        return block
+
+    def source(self, address: int) -> typing.Tuple[str, int, dict]:
+        """Generates the source of the block at the given address.
+
+        Returns:
+            typing.Tuple[str, int, dict]: the source of the function "block",
+            the largest number of instructions it executes, and the globals
+            it needs.
+        """
+        words = self.__words
+        namespace = dict()
+        lines = ["def block(ram, a, d):"]
+        known_a = None  # the value of A, if an A-instruction loaded it
+        pc = address
+        size = 0
+        while True:
+            word = words[pc]
+            size += 1
+            pc = (pc + 1) & 0x7FFF
+            if not word & 0x8000:
+                known_a = word
+                if size < MAX_BLOCK_SIZE and pc != 0:
+                    continue
+                break
+
+            a = "a" if known_a is None else str(known_a)
+            memory = "ram[" + a + "]"
+            comp = _comp_expression(word, memory if word & (1 << 12) else a)
+            if comp is None:
+                name = "_compute_" + str(len(namespace))
+                namespace[name] = self.__functions(word)
+                comp = name + "(d, " + \
+                    (memory if word & (1 << 12) else a) + ")"
+
+            jump = word & 0b111
+            targets = []
+            if jump and word & (1 << 5) and known_a is None:
+                lines.append("    target = a & 32767")
+                target = "target"
+            else:
+                target = "a & 32767" if known_a is None else a
+            if word & (1 << 3):
+                targets.append(memory)
+            if word & (1 << 5):
+                targets.append("a")
+                known_a = None
+            if word & (1 << 4):
+                targets.append("d")
+            if len(targets) == 1 and not jump:
+                lines.append("    " + targets[0] + " = " + comp)
+            elif targets or jump != 0b111:
+                lines.append("    out = " + comp)
+                for destination in targets:
+                    lines.append("    " + destination + " = out")
+
+            a = "a" if known_a is None else str(known_a)
+            if jump == 0b111:
+                lines.append("    return " + target + ", " + a + ", d, " +
+                             str(size))
+                return "\n".join(lines) + "\n", size, namespace
+            if jump:
+                lines.append("    if " + _JUMP_CONDITIONS[jump] + ":")
+                lines.append("        return " + target + ", " + a +
+                             ", d, " + str(size))
+            if size == MAX_BLOCK_SIZE or pc == 0:
+                break
+
+        a = "a" if known_a is None else str(known_a)
+        lines.append("    return " + str(pc) + ", " + a + ", d, " + str(size))
+        return "\n".join(lines) + "\n", size, namespace
+
+    def __compile(self, address: int) -> \
+            typing.Tuple[typing.Callable, int]:
+        source, size, namespace = self.source(address)
+        exec(compile(source, "<block " + str(address) + ">", "exec"),
+             namespace)
+        return namespace["block"], size
@@ -0,0 +1,173 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import glob
+import hashlib
+import os
+import shutil
+import typing
+import uuid
+
+
+def _assembler_version() -> str:
+    """Returns a digest of the assembler's source files, so that any change
+    to the assembler invalidates everything it assembled before.
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for source_path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        with open(source_path, "rb") as source_file:
+            digest.update(os.path.basename(source_path).encode())
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+ASSEMBLER_VERSION = _assembler_version()
+
+
+class BuildCache:
+    """A local directory of assembler outputs, keyed by a hash of the input
+    bytes, the assembler version and the options that change the output.
+
+    Every output is stored as a file named by its key and its extension.
+    The cache is bounded in size: when it grows beyond its limit, the least
+    recently used files (by modification time, which is refreshed on every
+    hit) are evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Opens the cache at the given directory, creating it if needed.
+
+        Args:
+            directory (str): the directory of the cache.
+            max_bytes (int): the total size the cache is allowed to reach.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source: bytes, options: typing.Tuple = ()) -> str:
+        """
+        Args:
+            source (bytes): the contents of the input file.
+            options (typing.Tuple): the options that change the output.
+
+        Returns:
+            str: the cache key of the input.
+        """
+        digest = hashlib.sha256(ASSEMBLER_VERSION.encode())
+        digest.update(repr(options).encode())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def fetch(self, key: str, output_paths: typing.Dict[str, str]) -> bool:
+        """Links (or copies) the cached outputs of the key into place.
+
+        Args:
+            key (str): a cache key.
+            output_paths (typing.Dict[str, str]): maps the extension of every
+                needed output to the path it should be placed at.
+
+        Returns:
+            bool: True if all the outputs were cached and placed, False
+            otherwise, in which case nothing was placed.
+        """
+        cached_paths = {extension: self.__path(key, extension)
+                        for extension in output_paths}
+        try:
+            for cached_path in cached_paths.values():
+                os.utime(cached_path)
+        except FileNotFoundError:
+            return False
+        for extension, output_path in output_paths.items():
+            _place(cached_paths[extension], output_path)
+        return True
+
+    def store(self, key: str, output_paths: typing.Dict[str, str]) -> None:
+        """Adds freshly written outputs to the cache, and evicts the least
+        recently used files if the cache became too large.
+
+        Args:
+            key (str): the cache key of the input the outputs were made from.
+            output_paths (typing.Dict[str, str]): maps the extension of every
+                output to its path.
+        """
+        for extension, output_path in output_paths.items():
+            _place(output_path, self.__path(key, extension))
+        self.__evict()
+
+    def record(self, hit: bool) -> None:
+        """Counts a lookup for the summary.
+
+        Args:
+            hit (bool): whether the lookup was served from the cache.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: a one-line summary of the recorded hits and misses.
+        """
+        return "cache: " + str(self.hits) + " hits, " + \
+            str(self.misses) + " misses"
+
+    def __path(self, key: str, extension: str) -> str:
+        return os.path.join(self.__directory, key + extension)
+
+    def __evict(self) -> None:
+        """Removes the least recently used files until the cache fits."""
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.__directory) as directory_entries:
+            for entry in directory_entries:
+                if not entry.is_file() or entry.name.startswith("."):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total_bytes <= self.__max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue  # already evicted by a concurrent run
+            total_bytes -= size
+
+
+def _place(source_path: str, destination_path: str) -> None:
+    """Atomically replaces the destination with a hard link to the source,
+    or with a copy of it if the two cannot be linked.
+    """
+    # Renaming a link over the same file would do nothing and leave it behind.
+    try:
+        if os.path.samefile(source_path, destination_path):
+            return
+    except FileNotFoundError:
+        pass
+
+    directory, basename = os.path.split(destination_path)
+    temp_path = os.path.join(
+        directory, "." + basename + "." + uuid.uuid4().hex)
+    try:
+        os.link(source_path, temp_path)
+    except OSError:
+        shutil.copyfile(source_path, temp_path)
+    try:
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,108 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import os
+import sys
+from Disassembler import read_words
+from Emulator import Emulator
+import Main
+from ScriptRunner import ScriptRunner
+
+
+class TestScript(ScriptRunner):
+    """Runs a test script (.tst) of the CPU emulator headlessly.
+
+    The commands executing the program are "tick", "tock" and "ticktock",
+    and the variables are RAM[i], A, D and PC, see ScriptRunner.
+    """
+
+    STEP_COMMANDS = {"tick": 0, "tock": 1, "ticktock": 1}
+
+    def __init__(self, path: str, compiled: bool = True,
+                 max_steps: int = 10 ** 7) -> None:
+        """Reads a test script.
+
+        Args:
+            path (str): the path of the .tst file. The files the script
+                names are relative to its directory.
+            compiled (bool): run the program compiled into Python functions.
+            max_steps (int): the number of instructions a "repeat" without a
+                count runs, unless the program halts before.
+        """
+        super().__init__(path, max_steps)
+        self.__compiled = compiled
+        self.__emulator = None
+
+    def _load(self, path: str) -> None:
+        if os.path.splitext(path)[1].lower() == ".asm":
+            with open(path, 'r') as input_file:
+                words = Main.assemble(input_file.read())[0]
+        else:
+            words = read_words(path)[0]
+        self.__emulator = Emulator(words, self.__compiled)
+
+    def _run(self, steps: int) -> None:
+        self.__emulator.run(steps)
+
+    def _set(self, variable: str, value: int) -> None:
+        emulator = self.__emulator
+        if variable.startswith("RAM["):
+            emulator.ram[int(variable[4:-1])] = value
+        elif variable == "PC":
+            emulator.pc = value & 0x7FFF
+        elif variable == "A":
+            emulator.a = value
+        elif variable == "D":
+            emulator.d = value
+        else:
+            raise self._unknown_variable(variable)
+
+    def _get(self, variable: str) -> int:
+        emulator = self.__emulator
+        if variable.startswith("RAM["):
+            return emulator.ram[int(variable[4:-1])]
+        if variable == "PC":
+            return emulator.pc
+        if variable == "A":
+            return emulator.a
+        if variable == "D":
+            return emulator.d
+        raise self._unknown_variable(variable)
+
+
+if "__main__" == __name__:
+    # Runs test scripts, and reports which passed and which failed.
+    argument_parser = argparse.ArgumentParser(
+        prog="CPUEmulator", description="Runs CPU emulator test scripts "
+                                        "(.tst) headlessly.")
+    argument_parser.add_argument(
+        "script_paths", nargs="+", metavar="script_path",
+        help="a test script")
+    argument_parser.add_argument(
+        "--interpreted", action="store_true",
+        help="interpret the program instead of compiling its basic blocks")
+    argument_parser.add_argument(
+        "--max-steps", type=int, default=10 ** 7,
+        help="the instructions a repeat without a count runs at most")
+    arguments = argument_parser.parse_args()
+
+    failed = False
+    for script_path in arguments.script_paths:
+        script = TestScript(script_path, not arguments.interpreted,
+                            arguments.max_steps)
+        try:
+            passed = script.run()
+        except (OSError, ValueError) as error:
+            passed = False
+            script.failure = str(error)
+        if passed:
+            print(script_path + ": passed")
+        else:
+            failed = True
+            print(script_path + ": " + script.failure)
+    sys.exit(1 if failed else 0)
@@ -7,9 +7,89 @@ Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
 
 
+# dest and jump mnemonics, already shifted into their place in the word.
+DEST_BITS = {"null": 0b000 << 3, "M": 0b001 << 3, "D": 0b010 << 3,
+             "MD": 0b011 << 3, "A": 0b100 << 3, "AM": 0b101 << 3,
+             "AD": 0b110 << 3, "AMD": 0b111 << 3}
+
+JUMP_BITS = {"null": 0b000, "JGT": 0b001, "JEQ": 0b010,
+             "JGE": 0b011, "JLT": 0b100, "JNE": 0b101,
+             "JLE": 0b110, "JMP": 0b111}
+
+# the c1..c6 bits of the standard computations, written with A.
+_ALU_BITS = {"0":   0b101010,
+             "1":   0b111111,
+             "-1":  0b111010,
+             "D":   0b001100,
+             "A":   0b110000,
+             "!D":  0b001101,
+             "!A":  0b110001,
+             "-D":  0b001111,
+             "-A":  0b110011,
+             "D+1": 0b011111,
+             "A+1": 0b110111,
+             "D-1": 0b001110,
+             "A-1": 0b110010,
+             "D+A": 0b000010,
+             "D-A": 0b010011,
+             "A-D": 0b000111,
+             "D&A": 0b000000,
+             "D|A": 0b010101}
+
+# the shift computations of the extended ALU, bits 15..6 of the word.
+_SHIFT_BITS = {"A<<": 0b1010100000,
+               "D<<": 0b1010110000,
+               "M<<": 0b1011100000,
+               "A>>": 0b1010000000,
+               "D>>": 0b1010010000,
+               "M>>": 0b1011000000}
+
+
+def _comp_words() -> dict:
+    """Maps every comp mnemonic to bits 15..6 of its C-instruction word."""
+    comp_words = dict()
+    for mnemonic, bits in _ALU_BITS.items():
+        comp_words[mnemonic] = (0b1110 << 6 | bits) << 6
+        if 'A' in mnemonic:
+            comp_words[mnemonic.replace("A", "M")] = (0b1111 << 6 | bits) << 6
+    for mnemonic, bits in _SHIFT_BITS.items():
+        comp_words[mnemonic] = bits << 6
+    # the commutative computations with their operands swapped, such as the
+    # "M+D" the VM translators emit, after the canonical mnemonics.
+    for mnemonic in ("D+A", "D&A", "D|A", "D+M", "D&M", "D|M"):
+        comp_words[mnemonic[::-1]] = comp_words[mnemonic]
+    return comp_words
+
+
+# comp mnemonic -> bits 15..6 of the word, with the other bits cleared.
+COMP_WORDS = _comp_words()
+
+
 class Code:
     """Translates Hack assembly language mnemonics into binary codes."""
-    
+
+    # C-instruction text (without white space and comments) -> word.
+    __c_words = dict()
+
+    @staticmethod
+    def c_instruction(command: str) -> int:
+        """
+        Args:
+            command (str): the text of a C-command, dest=comp;jump.
+
+        Returns:
+            int: the 16-bit instruction word of the given command. Every
+            distinct command text is encoded only once.
+        """
+        word = Code.__c_words.get(command)
+        if word is None:
+            dest, equals, comp = command.rpartition("=")
+            comp, semicolon, jump = comp.partition(";")
+            word = COMP_WORDS[comp] | DEST_BITS[dest or "null"] | \
+                JUMP_BITS[jump or "null"]
+            Code.__c_words[command] = word
+        return word
+
     @staticmethod
     def dest(mnemonic: str) -> str:
         """
@@ -19,10 +99,7 @@ class Code:
         Returns:
             str: 3-bit long binary code of the given mnemonic.
         """
-        dest_keys = {"null": "000", "M": "001", "D": "010", 
-                     "MD": "011", "A": "100", "AM": "101", 
-                     "AD": "110", "AMD": "111"}
-        return dest_keys[mnemonic]
+        return format(DEST_BITS[mnemonic] >> 3, "03b")
 
     @staticmethod
     def comp(mnemonic: str) -> str:
@@ -33,44 +110,7 @@ class Code:
         Returns:
             str: the binary code of the given mnemonic.
         """
-        comp_keys = {"0":   "101010",
-                     "1":   "111111",
-                     "-1":  "111010",
-                     "D":   "001100",
-                     "A":   "110000",
-                     "!D":  "001101",
-                     "!A":  "110001",
-                     "-D":  "001111",
-                     "-A":  "110011",
-                     "D+1": "011111",
-                     "A+1": "110111",
-                     "D-1": "001110",
-                     "A-1": "110010",
-                     "D+A": "000010",
-                     "D-A": "010011",
-                     "A-D": "000111",
-                     "D&A": "000000",
-                     "D|A": "010101"}
-        
-        extended_keys = {"A<<": "1010100000",
-                         "D<<": "1010110000",
-                         "M<<": "1011100000",
-                         "A>>": "1010000000",
-                         "D>>": "1010010000",
-                         "M>>": "1011000000"}
-        
-        # Check if mnemonic is in the extend list:
-        if mnemonic in list(extended_keys.keys()):
-            return extended_keys[mnemonic]
-        
-        # Check if it is in the standard comp list
-        if 'M' in mnemonic:
-            replaced_mnemonic = mnemonic.replace("M", "A")
-            return "1111" + comp_keys[replaced_mnemonic]
-        else:
-            return "1110" + comp_keys[mnemonic]
-
-        
+        return format(COMP_WORDS[mnemonic] >> 6, "010b")
 
     @staticmethod
     def jump(mnemonic: str) -> str:
@@ -81,7 +121,4 @@ class Code:
         Returns:
             str: 3-bit long binary code of the given mnemonic.
         """
-        jump_keys = {"null": "000", "JGT": "001", "JEQ": "010",
-                      "JGE": "011", "JLT": "100", "JNE":"101",
-                      "JLE": "110", "JMP": "111"}
-        return jump_keys[mnemonic]
\ No newline at end of file
+        return format(JUMP_BITS[mnemonic], "03b")
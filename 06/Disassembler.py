@@ -0,0 +1,174 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import functools
+import io
+import os
+import sys
+import typing
+from Code import COMP_WORDS, DEST_BITS, JUMP_BITS
+from RomImage import RomImage
+from SymbolMap import SymbolMap
+
+
+@functools.lru_cache(maxsize=None)
+def decode_table() -> typing.Tuple[typing.Optional[str], ...]:
+    """Builds, once, the mnemonic of every possible 16-bit word.
+
+    Returns:
+        typing.Tuple[typing.Optional[str], ...]: 65536 entries, the entry of
+        a word is its command text, as the Parser would normalize it, or
+        None if the word is not an instruction the assembler can produce.
+    """
+    table = ["@" + str(word) for word in range(1 << 15)] + [None] * (1 << 15)
+    for comp, comp_word in COMP_WORDS.items():
+        for dest, dest_bits in DEST_BITS.items():
+            for jump, jump_bits in JUMP_BITS.items():
+                word = comp_word | dest_bits | jump_bits
+                if table[word] is not None:
+                    continue  # keep the first mnemonic of an encoding
+                command = comp
+                if dest != "null":
+                    command = dest + "=" + command
+                if jump != "null":
+                    command += ";" + jump
+                table[word] = command
+    return tuple(table)
+
+
+class Disassembler:
+    """Translates Hack machine words back into assembly commands, optionally
+    annotated with the symbols of a .map file.
+    """
+
+    def __init__(self, symbol_map: typing.Optional[SymbolMap] = None) -> None:
+        """Gets ready to disassemble.
+
+        Args:
+            symbol_map (typing.Optional[SymbolMap]): the symbols of the
+                program, if they are known. Labels are then written at their
+                addresses, and A-commands are commented with the symbol they
+                probably load: the label, if a jump follows, and otherwise
+                the variable at that address, or the label.
+        """
+        self.__labels = dict()
+        self.__variables = dict()
+        if symbol_map is not None:
+            for address, label in symbol_map.labels:
+                self.__labels.setdefault(address, []).append(label)
+            for address, variable in symbol_map.variables:
+                self.__variables[address] = variable
+
+    @staticmethod
+    def commands(words: typing.Sequence[int]) -> \
+            typing.List[typing.Optional[str]]:
+        """Decodes the words with a single lookup each in the decode table.
+
+        Args:
+            words (typing.Sequence[int]): instruction words.
+
+        Returns:
+            typing.List[typing.Optional[str]]: the command of every word, or
+            None for a word that is not a valid instruction.
+        """
+        return list(map(decode_table().__getitem__, words))
+
+    def disassemble(self, words: typing.Sequence[int]) -> typing.List[str]:
+        """
+        Args:
+            words (typing.Sequence[int]): the words of a ROM.
+
+        Returns:
+            typing.List[str]: the lines of the assembly program. An invalid
+            word is written as a comment holding its binary value.
+        """
+        commands = Disassembler.commands(words)
+        if not self.__labels and not self.__variables:
+            return [command if command is not None else
+                    "// invalid " + format(word, "016b")
+                    for command, word in zip(commands, words)]
+
+        lines = []
+        for address, command in enumerate(commands):
+            for label in self.__labels.get(address, ()):
+                lines.append("(" + label + ")")
+            if command is None:
+                lines.append("// invalid " + format(words[address], "016b"))
+                continue
+            symbol = None
+            if command[0] == "@":
+                symbol = self.__symbol_for(
+                    int(command[1:]), commands[address + 1]
+                    if address + 1 < len(commands) else None)
+            lines.append(command if symbol is None
+                         else command + " // " + symbol)
+        return lines
+
+    def __symbol_for(self, value: int,
+                     following: typing.Optional[str]) -> typing.Optional[str]:
+        labels = self.__labels.get(value)
+        if labels and following is not None and ";" in following:
+            return labels[-1]
+        variable = self.__variables.get(value)
+        if variable is not None:
+            return variable
+        return labels[-1] if labels else None
+
+
+def read_words(input_path: str) -> \
+        typing.Tuple[typing.List[int], typing.Optional[SymbolMap]]:
+    """Reads a .hack file or a packed .rom image.
+
+    Args:
+        input_path (str): the path of the ROM.
+
+    Returns:
+        typing.Tuple[typing.List[int], typing.Optional[SymbolMap]]: the
+        words, and the symbol map embedded in the image, or of the .map file
+        next to the ROM, if there is one.
+    """
+    filename, extension = os.path.splitext(input_path)
+    symbol_map = None
+    if extension.lower() == RomImage.EXTENSION:
+        with RomImage(input_path) as image:
+            words = image.words.tolist()
+            if len(image.symbol_map):
+                symbol_map = SymbolMap.read(
+                    io.StringIO(bytes(image.symbol_map).decode()))
+    else:
+        with open(input_path, 'r') as input_file:
+            words = [int(line, 2) for line in input_file if line.strip()]
+    if symbol_map is None and os.path.exists(filename + SymbolMap.EXTENSION):
+        with open(filename + SymbolMap.EXTENSION, 'r') as map_file:
+            symbol_map = SymbolMap.read(map_file)
+    return words, symbol_map
+
+
+if "__main__" == __name__:
+    # Disassembles a .hack file or a packed .rom image to the standard output.
+    argument_parser = argparse.ArgumentParser(
+        prog="Disassembler",
+        description="Disassembles a .hack file or a packed .rom image.")
+    argument_parser.add_argument("input_path", help="the ROM to disassemble")
+    argument_parser.add_argument(
+        "--map", dest="map_path",
+        help="annotate with this .map file (by default, the one embedded in "
+             "the image or next to the ROM, if any)")
+    argument_parser.add_argument(
+        "--no-symbols", action="store_true",
+        help="do not annotate the output with symbols")
+    arguments = argument_parser.parse_args()
+    rom_words, rom_symbols = read_words(os.path.abspath(arguments.input_path))
+    if arguments.map_path is not None:
+        with open(arguments.map_path, 'r') as map_input:
+            rom_symbols = SymbolMap.read(map_input)
+    if arguments.no_symbols:
+        rom_symbols = None
+    disassembler = Disassembler(rom_symbols)
+    sys.stdout.write("".join(
+        line + "\n" for line in disassembler.disassemble(rom_words)))
@@ -0,0 +1,323 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import array
+import os
+import time
+import typing
+import numpy
+from BlockCompiler import BlockCompiler
+from Disassembler import read_words
+import Framebuffer
+
+
+def _wrap(value: int) -> int:
+    """Truncates a value to a signed 16-bit word."""
+    return ((value + 0x8000) & 0xFFFF) - 0x8000
+
+
+# The c1..c6 bits of the standard computations -> out(D, y), where y is A or
+# M. The values are signed 16-bit words, as the RAM holds them.
+_ALU_FUNCTIONS = {
+    0b101010: lambda d, y: 0,
+    0b111111: lambda d, y: 1,
+    0b111010: lambda d, y: -1,
+    0b001100: lambda d, y: d,
+    0b110000: lambda d, y: y,
+    0b001101: lambda d, y: ~d,
+    0b110001: lambda d, y: ~y,
+    0b001111: lambda d, y: ((0x8000 - d) & 0xFFFF) - 0x8000,
+    0b110011: lambda d, y: ((0x8000 - y) & 0xFFFF) - 0x8000,
+    0b011111: lambda d, y: ((d + 0x8001) & 0xFFFF) - 0x8000,
+    0b110111: lambda d, y: ((y + 0x8001) & 0xFFFF) - 0x8000,
+    0b001110: lambda d, y: ((d + 0x7FFF) & 0xFFFF) - 0x8000,
+    0b110010: lambda d, y: ((y + 0x7FFF) & 0xFFFF) - 0x8000,
+    0b000010: lambda d, y: ((d + y + 0x8000) & 0xFFFF) - 0x8000,
+    0b010011: lambda d, y: ((d - y + 0x8000) & 0xFFFF) - 0x8000,
+    0b000111: lambda d, y: ((y - d + 0x8000) & 0xFFFF) - 0x8000,
+    0b000000: lambda d, y: d & y,
+    0b010101: lambda d, y: d | y,
+}
+
+
+def _alu_function(bits: int) -> typing.Callable[[int, int], int]:
+    """Returns the computation of any c1..c6 bits, as the ALU wires them."""
+    function = _ALU_FUNCTIONS.get(bits)
+    if function is not None:
+        return function
+    zx, nx, zy, ny, f, no = [(bits >> shift) & 1 for shift in range(5, -1, -1)]
+
+    def compute(d: int, y: int) -> int:
+        x = 0 if zx else d
+        x = ~x if nx else x
+        y = 0 if zy else y
+        y = ~y if ny else y
+        out = x + y if f else x & y
+        return _wrap(~out if no else out)
+    return compute
+
+
+def _shift_function(word: int) -> typing.Callable[[int, int], int]:
+    """Returns the computation of an extended ALU word: a shift of D or y
+    to the left, or an arithmetic shift to the right.
+    """
+    left = word & (1 << 11)
+    if word & (1 << 10):
+        if left:
+            return lambda d, y: (((d << 1) + 0x8000) & 0xFFFF) - 0x8000
+        return lambda d, y: d >> 1
+    if left:
+        return lambda d, y: (((y << 1) + 0x8000) & 0xFFFF) - 0x8000
+    return lambda d, y: y >> 1
+
+
+def decode(word: int) -> tuple:
+    """Decodes an instruction word into its handler tuple.
+
+    Args:
+        word (int): the instruction word.
+
+    Returns:
+        tuple: (value,) for an A-instruction, and for a C-instruction
+        (None, out(D, y), reads M, writes A, writes D, writes M, jumps if
+        negative, jumps if zero, jumps if positive).
+    """
+    if not word & 0x8000:
+        return (word,)
+    if word >> 13 & 3 == 3:
+        compute = _alu_function(word >> 6 & 0b111111)
+    else:
+        compute = _shift_function(word)
+    return (None, compute, bool(word & (1 << 12)), bool(word & (1 << 5)),
+            bool(word & (1 << 4)), bool(word & (1 << 3)),
+            word >> 2 & 1, bool(word & 2), bool(word & 1))
+
+
+def halt_addresses(words: typing.Sequence[int]) -> typing.FrozenSet[int]:
+    """Finds the halting loops "(END) @END / 0;JMP" of a program.
+
+    Args:
+        words (typing.Sequence[int]): the instruction words of the ROM.
+
+    Returns:
+        typing.FrozenSet[int]: the addresses of the unconditional jumps back
+        to an A-instruction loading its own address.
+    """
+    return frozenset(address for address in range(1, len(words))
+                     if words[address] & 0x8007 == 0x8007 and
+                     words[address - 1] == address - 1)
+
+
+class Emulator:
+    """Runs a Hack program headlessly.
+
+    The ROM is decoded once: every one of its 32K addresses holds the
+    handler tuple of its word, so executing an instruction is a single
+    lookup. The RAM is an array('h') of the 32K addressable words, holding
+    signed 16-bit values (so the signed value of A indexes the word at its
+    15-bit address), which the caller may read and write between runs,
+    including the screen and keyboard memory maps, as well as the registers
+    a, d and pc. The words of the ROM, padded with zeros, are in words.
+
+    The same RAM is also exposed as NumPy int16 arrays sharing its buffer,
+    without copying: memory for all of it, and screen for the screen memory
+    map, so whole regions are read and compared in a single operation. The
+    instructions themselves access the array('h'), whose single words are
+    faster to read and write, and are Python ints.
+    """
+
+    ROM_SIZE = 1 << 15
+    RAM_SIZE = 1 << 15
+    SCREEN = 16384
+    KBD = 24576
+
+    def __init__(self, words: typing.Sequence[int],
+                 compiled: bool = False) -> None:
+        """Loads a program and resets the computer.
+
+        Args:
+            words (typing.Sequence[int]): the instruction words of the ROM.
+            compiled (bool): run the basic blocks of the program compiled
+                into Python functions (see BlockCompiler), instead of
+                interpreting every instruction.
+        """
+        if len(words) > Emulator.ROM_SIZE:
+            raise ValueError("the program does not fit in the ROM")
+        words = list(words) + [0] * (Emulator.ROM_SIZE - len(words))
+        handlers = dict()
+        self.__rom = []
+        for address, word in enumerate(words):
+            handler = handlers.get(word)
+            if handler is None:
+                handler = handlers[word] = decode(word)
+            self.__rom.append(handler)
+        self.__halt_addresses = halt_addresses(words)
+        self.words = words
+        self.__compiler = None
+        if compiled:
+            self.__compiler = BlockCompiler(
+                words, lambda word: decode(word)[1])
+        self.ram = array.array('h', bytes(2 * Emulator.RAM_SIZE))
+        self.memory = numpy.frombuffer(self.ram, numpy.int16)
+        self.screen = self.memory[Emulator.SCREEN:Emulator.KBD]
+        self.a = 0
+        self.d = 0
+        self.pc = 0
+
+    @staticmethod
+    def load(path: str, compiled: bool = False) -> "Emulator":
+        """
+        Args:
+            path (str): a .hack file, or a packed .rom image.
+            compiled (bool): compile the basic blocks of the program.
+
+        Returns:
+            Emulator: an emulator of the program.
+        """
+        return Emulator(read_words(path)[0], compiled)
+
+    def reset(self) -> None:
+        """Restarts the program, keeping the RAM."""
+        self.a = self.d = self.pc = 0
+
+    @property
+    def halted(self) -> bool:
+        """Is the program in its halting loop, "(END) @END / 0;JMP"?"""
+        return self.pc in self.__halt_addresses or \
+            self.pc + 1 in self.__halt_addresses
+
+    def run(self, max_steps: int = 1 << 62) -> int:
+        """Executes instructions until the program halts, or until the given
+        number of instructions were executed.
+
+        Args:
+            max_steps (int): the maximal number of instructions to execute.
+
+        Returns:
+            int: the number of instructions executed.
+        """
+        if self.__compiler is None:
+            return self.__interpret(max_steps)
+        steps, halted = self.__run_blocks(max_steps)
+        if steps < max_steps and not halted:
+            # the rest of the budget is shorter than the next block
+            steps += self.__interpret(max_steps - steps)
+        return steps
+
+    def __run_blocks(self, max_steps: int) -> typing.Tuple[int, bool]:
+        """Runs whole compiled blocks while they fit in the budget, and
+        until one of them executes the jump of a halting loop, where the
+        interpreter stops too. Returns the number of instructions executed,
+        and whether the program halted.
+        """
+        compiler = self.__compiler
+        blocks = dict()
+        halts = self.__halt_addresses
+        halted = False
+        ram = self.ram
+        a, d, pc = self.a, self.d, self.pc
+        steps = 0
+        while True:
+            block = blocks.get(pc)
+            if block is None:
+                block = blocks[pc] = compiler.block(pc)
+            function, size = block
+            if steps + size > max_steps:
+                break
+            start = pc
+            pc, a, d, executed = function(ram, a, d)
+            steps += executed
+            if start + executed - 1 in halts:
+                halted = True
+                break
+        self.a, self.d, self.pc = a, d, pc
+        return steps, halted
+
+    def __interpret(self, max_steps: int) -> int:
+        """Executes one instruction at a time."""
+        rom = self.__rom
+        ram = self.ram
+        halts = self.__halt_addresses
+        a, d, pc = self.a, self.d, self.pc
+        steps = 0
+        while steps < max_steps:
+            handler = rom[pc]
+            steps += 1
+            value = handler[0]
+            if value is not None:
+                a = value
+                pc = pc + 1 & 0x7FFF
+                continue
+            _, compute, reads_m, writes_a, writes_d, writes_m, \
+                negative, zero, positive = handler
+            out = compute(d, ram[a] if reads_m else a)
+            if writes_m:
+                ram[a] = out
+            address = a & 0x7FFF
+            if writes_a:
+                a = out
+            if writes_d:
+                d = out
+            if (negative and out < 0) or (zero and out == 0) or \
+                    (positive and out > 0):
+                if pc in halts:
+                    pc = address
+                    break
+                pc = address
+            else:
+                pc = pc + 1 & 0x7FFF
+        self.a, self.d, self.pc = a, d, pc
+        return steps
+
+
+def ram_assignment(text: str) -> typing.Tuple[int, int]:
+    address, equals, value = text.partition("=")
+    if not equals:
+        raise argparse.ArgumentTypeError("expected ADDRESS=VALUE")
+    return int(address), _wrap(int(value))
+
+
+if "__main__" == __name__:
+    # Runs a program headlessly and reports its speed.
+    argument_parser = argparse.ArgumentParser(
+        prog="Emulator", description="Runs a Hack program headlessly.")
+    argument_parser.add_argument(
+        "input_path", help="a .hack file or a packed .rom image")
+    argument_parser.add_argument(
+        "--steps", type=int, default=10 ** 7,
+        help="stop after this many instructions, unless the program halts "
+             "before (default: 10000000)")
+    argument_parser.add_argument(
+        "--compiled", action="store_true",
+        help="compile the basic blocks of the program into Python functions")
+    argument_parser.add_argument(
+        "--set", type=ram_assignment, action="append", default=[],
+        metavar="ADDRESS=VALUE", help="set a RAM word before running")
+    argument_parser.add_argument(
+        "--screenshot", metavar="IMAGE",
+        help="write the screen as a .png or .pbm image after running")
+    argument_parser.add_argument(
+        "--print", type=int, nargs="+", default=[], metavar="ADDRESS",
+        dest="addresses", help="print these RAM words after running")
+    arguments = argument_parser.parse_args()
+
+    emulator = Emulator.load(
+        os.path.abspath(arguments.input_path), arguments.compiled)
+    for ram_address, ram_value in arguments.set:
+        emulator.ram[ram_address] = ram_value
+    start = time.perf_counter()
+    executed = emulator.run(arguments.steps)
+    seconds = time.perf_counter() - start
+    print(str(executed) + " instructions in " + format(seconds, ".3f") +
+          "s, " + format(executed / max(seconds, 1e-9), ",.0f") +
+          " instructions/s" + (", halted" if emulator.halted else ""))
+    for ram_address in arguments.addresses:
+        print("RAM[" + str(ram_address) + "] = " +
+              str(emulator.ram[ram_address]))
+    if arguments.screenshot is not None:
+        Framebuffer.write_snapshot(emulator.screen, arguments.screenshot)
@@ -0,0 +1,111 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import struct
+import zlib
+import numpy
+
+
+# The size of the screen, in pixels.
+HEIGHT = 256
+WIDTH = 512
+
+# The header of a binary PBM image of the screen.
+_PBM_HEADER = b"P4\n" + str(WIDTH).encode() + b" " + \
+    str(HEIGHT).encode() + b"\n"
+
+
+def bitmap(screen: numpy.ndarray) -> numpy.ndarray:
+    """Converts the screen memory map into its pixels.
+
+    Row r of the screen is held by the 32 words starting at 32 * r, and the
+    least significant bit of a word is its leftmost pixel. Viewed as little
+    endian bytes, the words of a row are its pixels in order, least
+    significant bit first, so a single unpackbits draws the whole screen.
+
+    Args:
+        screen (numpy.ndarray): the 8K words of the screen, such as
+            Emulator.screen.
+
+    Returns:
+        numpy.ndarray: a 256x512 array of uint8, 1 for a black pixel.
+    """
+    # a view of the words as unsigned, which are little endian already on
+    # a little endian host, so that no copy is made but by unpackbits
+    pixels = screen.view(numpy.uint16).astype("<u2", copy=False).view(
+        numpy.uint8)
+    return numpy.unpackbits(pixels.reshape(HEIGHT, WIDTH // 8), axis=1,
+                            bitorder="little")
+
+
+def write_pbm(pixels: numpy.ndarray, path: str) -> None:
+    """Writes a bitmap as a binary PBM image, where 1 is black as well.
+
+    Args:
+        pixels (numpy.ndarray): the 256x512 bitmap.
+        path (str): the path of the image.
+    """
+    with open(path, 'wb') as output_file:
+        output_file.write(_PBM_HEADER + numpy.packbits(pixels).tobytes())
+
+
+def read_pbm(path: str) -> numpy.ndarray:
+    """Reads a screen snapshot written by write_pbm.
+
+    Args:
+        path (str): the path of the image.
+
+    Returns:
+        numpy.ndarray: the 256x512 bitmap.
+    """
+    with open(path, 'rb') as input_file:
+        data = input_file.read()
+    if not data.startswith(_PBM_HEADER):
+        raise ValueError(path + ": not a 512x256 binary PBM image")
+    packed = numpy.frombuffer(data, numpy.uint8, offset=len(_PBM_HEADER))
+    return numpy.unpackbits(packed)[:HEIGHT * WIDTH].reshape(HEIGHT, WIDTH)
+
+
+def write_png(pixels: numpy.ndarray, path: str) -> None:
+    """Writes a bitmap as a 1-bit grayscale PNG image.
+
+    Args:
+        pixels (numpy.ndarray): the 256x512 bitmap.
+        path (str): the path of the image.
+    """
+    # in grayscale 0 is black, and every row starts with its filter type, 0
+    rows = numpy.packbits(pixels == 0, axis=1)
+    rows = numpy.hstack((numpy.zeros((HEIGHT, 1), numpy.uint8), rows))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + \
+            struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, 'wb') as output_file:
+        output_file.write(
+            b"\x89PNG\r\n\x1a\n" +
+            chunk(b"IHDR", struct.pack(">IIBBBBB", WIDTH, HEIGHT, 1, 0, 0,
+                                       0, 0)) +
+            chunk(b"IDAT", zlib.compress(rows.tobytes())) +
+            chunk(b"IEND", b""))
+
+
+def write_snapshot(screen: numpy.ndarray, path: str) -> None:
+    """Writes the screen as an image, a PNG or a PBM by the extension.
+
+    Args:
+        screen (numpy.ndarray): the 8K words of the screen.
+        path (str): the path of the image, ending with .png or .pbm.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png":
+        write_png(bitmap(screen), path)
+    elif extension == ".pbm":
+        write_pbm(bitmap(screen), path)
+    else:
+        raise ValueError(path + ": snapshots are .png or .pbm images")
@@ -0,0 +1,199 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import json
+import os
+import typing
+from SymbolTable import SymbolTable
+from Parser import Parser
+from Code import Code
+
+
+class ObjectFile:
+    """A separately assembled module of a program, before its code is placed
+    at its final ROM address.
+
+    The module's code words are kept relative to the module's start. Every
+    label the module defines is exported with its offset. A-instructions
+    that load one of the module's own labels are relocations, patched with
+    the module's base address by the linker. A-instructions that load a
+    symbol the module does not define are references: the linker resolves
+    each of them to a label of another module, or, if no module defines it,
+    allocates it as a variable. Numbers and predefined symbols are encoded
+    right away.
+
+    An object file (.hobj) holds these fields as a JSON object.
+    """
+
+    EXTENSION = ".hobj"
+    FORMAT = "hack-object-1"
+
+    def __init__(self, words: typing.List[int], labels: typing.Dict[str, int],
+                 relocations: typing.List[typing.Tuple[int, str]],
+                 references: typing.List[typing.Tuple[int, str]]) -> None:
+        """Creates an object module.
+
+        Args:
+            words (typing.List[int]): the code words, with a placeholder 0
+                at every relocation and reference.
+            labels (typing.Dict[str, int]): the exported labels and their
+                offsets in the module.
+            relocations (typing.List[typing.Tuple[int, str]]): (offset,
+                label) pairs of the words loading a label of the module.
+            references (typing.List[typing.Tuple[int, str]]): (offset,
+                symbol) pairs of the words loading a symbol the module does
+                not define, in order of appearance.
+        """
+        self.words = words
+        self.labels = labels
+        self.relocations = relocations
+        self.references = references
+
+    @staticmethod
+    def assemble(parser: Parser) -> "ObjectFile":
+        """Assembles a module without resolving its external symbols.
+
+        Args:
+            parser (Parser): a parser at the beginning of the module.
+
+        Returns:
+            ObjectFile: the assembled module.
+        """
+        predefined = SymbolTable()
+        words = []
+        labels = dict()
+        symbolic = []
+
+        while parser.has_more_commands():
+            parser.advance()
+            c_type = parser.command_type()
+            if c_type == "L_COMMAND":
+                labels[parser.symbol()] = len(words)
+            elif c_type == "A_COMMAND":
+                ins_symbol = parser.symbol()
+                if ins_symbol.isnumeric():
+                    words.append(int(ins_symbol))
+                else:
+                    symbolic.append((len(words), ins_symbol))
+                    words.append(0)
+            else:
+                words.append(Code.c_instruction(parser.command()))
+
+        # Only now every label of the module is known.
+        relocations = []
+        references = []
+        for offset, ins_symbol in symbolic:
+            if ins_symbol in labels:
+                relocations.append((offset, ins_symbol))
+            elif predefined.contains(ins_symbol):
+                words[offset] = predefined.get_address(ins_symbol)
+            else:
+                references.append((offset, ins_symbol))
+        return ObjectFile(words, labels, relocations, references)
+
+    @staticmethod
+    def read(input_file: typing.TextIO) -> "ObjectFile":
+        """Reads an object file.
+
+        Args:
+            input_file (typing.TextIO): the .hobj file.
+
+        Returns:
+            ObjectFile: the module the file holds.
+        """
+        fields = json.load(input_file)
+        if fields.get("format") != ObjectFile.FORMAT:
+            raise ValueError("not a Hack object file")
+        return ObjectFile(
+            fields["words"], fields["labels"],
+            [tuple(relocation) for relocation in fields["relocations"]],
+            [tuple(reference) for reference in fields["references"]])
+
+    def write(self, output_file: typing.TextIO) -> None:
+        """Writes the module as an object file.
+
+        Args:
+            output_file (typing.TextIO): writes the .hobj file to this file.
+        """
+        json.dump({"format": ObjectFile.FORMAT, "words": self.words,
+                   "labels": self.labels, "relocations": self.relocations,
+                   "references": self.references},
+                  output_file, separators=(",", ":"))
+
+
+def link(objects: typing.Sequence[ObjectFile]) -> \
+        typing.Tuple[typing.List[int], SymbolTable]:
+    """Places the modules one after the other, in the given order, and
+    resolves their symbols into a single program.
+
+    A module's own labels always take precedence for its own code. A
+    reference is resolved to the label of the module defining it, and is an
+    error if several modules define it. The remaining references are
+    variables, allocated in order of first use, exactly as if the modules
+    were assembled together as one program.
+
+    Args:
+        objects (typing.Sequence[ObjectFile]): the modules of the program.
+
+    Returns:
+        typing.Tuple[typing.List[int], SymbolTable]: the instruction words,
+        and the symbol table with all the labels and variables.
+    """
+    symbol_table = SymbolTable()
+
+    # the ROM addresses of every exported label, by name
+    exported = dict()
+    bases = []
+    base = 0
+    for module in objects:
+        bases.append(base)
+        for label, offset in module.labels.items():
+            exported.setdefault(label, []).append(base + offset)
+        base += len(module.words)
+    for label, addresses in exported.items():
+        if len(addresses) == 1:
+            symbol_table.add_entry(label, addresses[0])
+
+    words = []
+    for module, base in zip(objects, bases):
+        module_words = list(module.words)
+        for offset, label in module.relocations:
+            module_words[offset] = base + module.labels[label]
+        for offset, ins_symbol in module.references:
+            if len(exported.get(ins_symbol, ())) > 1:
+                raise ValueError("ambiguous reference to label " + ins_symbol +
+                                 ", which several modules define")
+            if symbol_table.contains(ins_symbol):
+                module_words[offset] = symbol_table.get_address(ins_symbol)
+            else:
+                module_words[offset] = symbol_table.add_variable(ins_symbol)
+        words.extend(module_words)
+    return words, symbol_table
+
+
+if "__main__" == __name__:
+    # Links object files, in the given order, into a single .hack file.
+    argument_parser = argparse.ArgumentParser(
+        prog="Linker", description="Links Hack object files (.hobj), in the "
+                                   "given order, into a .hack file.")
+    argument_parser.add_argument("output_path", help="the .hack file to write")
+    argument_parser.add_argument(
+        "object_paths", nargs="+", metavar="object_path",
+        help="an object file written by 'Assembler --object'")
+    arguments = argument_parser.parse_args()
+    modules = []
+    for object_path in arguments.object_paths:
+        with open(object_path, 'r') as object_file:
+            modules.append(ObjectFile.read(object_file))
+    linked_words, _ = link(modules)
+    # Main imports this module, so it is imported only when linking.
+    import Main
+    with Main._atomic_open(os.path.abspath(arguments.output_path), 'w') \
+            as output_file:
+        output_file.write("".join(
+            format(word, "016b") + "\n" for word in linked_words))
@@ -5,27 +5,42 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import argparse
+import array
+import concurrent.futures
+import contextlib
 import os
 import sys
+import tempfile
+import time
 import typing
 from SymbolTable import SymbolTable
 from Parser import Parser
 from Code import Code
+from RomImage import RomImage
+from BuildCache import BuildCache
+from Optimizer import CALL_OVERHEAD, Optimizer
+from SymbolMap import SymbolMap
+from Linker import ObjectFile
 
 
 def assemble_file(
-        input_file: typing.TextIO, output_file: typing.TextIO) -> None:
+        input_file: typing.TextIO, output_file: typing.TextIO,
+        streaming: bool = False) -> None:
     """Assembles a single file.
 
     Args:
         input_file (typing.TextIO): the file to assemble.
         output_file (typing.TextIO): writes all output to this file.
+        streaming (bool): if this is True, the input is read line-by-line in
+            each pass instead of being held in memory, and only the symbol
+            table stays resident. The input file has to be seekable.
     """
     # initializing the symbol table
     symbol_table = SymbolTable()
 
     # creating the parser object
-    parser = Parser(input_file)
+    parser = Parser(input_file, streaming)
     
     # current available index at the ROM
     rom_index = 0
@@ -43,7 +58,6 @@ def assemble_file(
     parser.reset_to_top()
 
     # second pass
-    address_available = 16
     while parser.has_more_commands():
         parser.advance()
 
@@ -56,27 +70,285 @@ def assemble_file(
                 if symbol_table.contains(ins_symbol):
                     a_address = symbol_table.get_address(ins_symbol)
                 else:
-                    symbol_table.add_entry(ins_symbol, address_available)
-                    a_address = address_available
-                    address_available += 1
+                    a_address = symbol_table.add_variable(ins_symbol)
             else:
                 a_address = ins_symbol
 
             # We write to ROM the binary value of a_address
-            a_address = int(a_address)
-            to_rom = format(a_address, "b").zfill(16)
+            to_rom = int(a_address)
 
         # Parse C-Instruction 
         elif parser.command_type() == "C_COMMAND":
-            to_rom = Code.comp(parser.comp())  # parse the computation
-            to_rom += Code.dest(parser.dest())  # parse the dest
-            to_rom += Code.jump(parser.jump())  # parse the jump
+            to_rom = Code.c_instruction(parser.command())
 
         else:
             continue
-        output_file.write(to_rom + "\n")
+        output_file.write(_word_text(to_rom))
 
 
+def assemble_file_single_pass(
+        input_file: typing.TextIO, output_file: typing.TextIO,
+        streaming: bool = False) -> None:
+    """Assembles a single file while reading it only once.
+
+    Instructions are kept in an in-memory buffer. A-instructions that refer
+    to a symbol which is not a label defined yet, predefined symbols
+    included, get a placeholder and are recorded in a fixup list; once the
+    whole program was read, every fixup is patched with its label or
+    predefined address, and the other symbols are allocated as variables in
+    order of first use. The output is identical to the one of assemble_file,
+    even where a label shadows a predefined symbol.
+
+    Args:
+        input_file (typing.TextIO): the file to assemble.
+        output_file (typing.TextIO): writes all output to this file.
+        streaming (bool): if this is True, the input is read line-by-line
+            instead of being held in memory.
+    """
+    words, symbol_table = _assemble_single_pass(Parser(input_file, streaming))
+    output_file.write("".join(map(_word_text, words)))
+
+
+def assemble(source: typing.Union[str, typing.Iterable[str]],
+             optimize: bool = False) -> typing.Tuple[array.array, SymbolTable]:
+    """Assembles a program held in memory, without any files involved.
+
+    Args:
+        source (typing.Union[str, typing.Iterable[str]]): the assembly
+            program, as a string or as an iterable of lines (such as a list
+            or a generator of lines produced by a translator).
+        optimize (bool): run the peephole optimizer before encoding.
+
+    Returns:
+        typing.Tuple[array.array, SymbolTable]: the instruction words, as an
+        array of unsigned 16-bit integers, and the resolved symbol table.
+    """
+    if isinstance(source, str):
+        source = source.splitlines()
+    parser = Parser(source, streaming=True)
+    if optimize:
+        optimizer = Optimizer(_commands(parser))
+        optimizer.peephole()
+        parser = Parser(optimizer.commands, streaming=True)
+    words, symbol_table = _assemble_single_pass(parser)
+    return array.array("H", words), symbol_table
+
+
+def _assemble_single_pass(
+        parser: Parser) -> typing.Tuple[typing.List[int], SymbolTable]:
+    """Assembles the parser's program in one pass, see
+    assemble_file_single_pass.
+
+    Args:
+        parser (Parser): a parser at the beginning of the program.
+
+    Returns:
+        typing.Tuple[typing.List[int], SymbolTable]: the instruction words,
+        and the symbol table with all the labels and variables.
+    """
+    symbol_table = SymbolTable()
+
+    # the assembled instructions, and (buffer index, symbol) pairs to patch
+    rom = []
+    fixups = []
+
+    # The labels defined so far. A predefined symbol is patched too, since
+    # a label defined later may shadow it, as in assemble_file.
+    labels = set()
+
+    while parser.has_more_commands():
+        parser.advance()
+        c_type = parser.command_type()
+
+        if c_type == "L_COMMAND":
+            labels.add(parser.symbol())
+            symbol_table.add_entry(parser.symbol(), len(rom))
+
+        elif c_type == "A_COMMAND":
+            ins_symbol = parser.symbol()
+            if ins_symbol.isnumeric():
+                rom.append(int(ins_symbol))
+            elif ins_symbol in labels:
+                rom.append(symbol_table.get_address(ins_symbol))
+            else:
+                fixups.append((len(rom), ins_symbol))
+                rom.append(None)
+
+        else:
+            rom.append(Code.c_instruction(parser.command()))
+
+    # patch forward references and predefined symbols, the other symbols
+    # are variables
+    for rom_index, ins_symbol in fixups:
+        if symbol_table.contains(ins_symbol):
+            rom[rom_index] = symbol_table.get_address(ins_symbol)
+        else:
+            rom[rom_index] = symbol_table.add_variable(ins_symbol)
+
+    return rom, symbol_table
+
+
+def assemble_path(input_path: str, single_pass: bool = False,
+                  streaming: bool = False, packed: bool = False,
+                  optimize: bool = False, symbol_map: bool = False,
+                  object_file: bool = False, outline: bool = False,
+                  dead_code: bool = False,
+                  cache: typing.Optional[BuildCache] = None) -> bool:
+    """Assembles the .asm file at the given path into a .hack file with the
+    same name, in the same directory. The outputs are replaced atomically,
+    so a reader never sees a partially written file.
+
+    Args:
+        input_path (str): the path of the file to assemble.
+        single_pass (bool): read the input only once.
+        streaming (bool): never hold the whole input in memory.
+        packed (bool): also write a packed binary ROM image (.rom).
+        optimize (bool): run the peephole optimizer before encoding, and
+            print how many instructions it removed.
+        symbol_map (bool): also write the resolved symbols (.map) and a
+            listing of the program (.lst). The packed image, if written,
+            embeds the symbol map too.
+        object_file (bool): write a relocatable object file (.hobj), to be
+            linked with the other modules of the program, instead of a .hack
+            file. The packed image and the symbol map are not written then,
+            and the program is neither outlined nor stripped of dead code,
+            since the symbols it does not define may be labels of the other
+            modules.
+        outline (bool): move repeated instruction sequences into shared
+            subroutines, after the peephole optimizer if it runs, and print
+            the instructions saved and the call overhead added.
+        dead_code (bool): remove the unreachable instructions and the
+            unused labels first, and print the ROM words reclaimed.
+        cache (typing.Optional[BuildCache]): if given, the outputs are taken
+            from this cache when the input was already assembled, and stored
+            in it otherwise.
+
+    Returns:
+        bool: True if the outputs were taken from the cache, False otherwise.
+    """
+    filename, extension = os.path.splitext(input_path)
+    if object_file:
+        packed = symbol_map = outline = dead_code = False
+        output_path = filename + ObjectFile.EXTENSION
+    else:
+        output_path = filename + ".hack"
+    output_paths = {os.path.splitext(output_path)[1]: output_path}
+    if packed:
+        output_paths[RomImage.EXTENSION] = filename + RomImage.EXTENSION
+    if symbol_map:
+        output_paths[SymbolMap.EXTENSION] = filename + SymbolMap.EXTENSION
+        output_paths[SymbolMap.LISTING_EXTENSION] = \
+            filename + SymbolMap.LISTING_EXTENSION
+
+    if cache is not None:
+        with open(input_path, 'rb') as input_file:
+            key = BuildCache.key(input_file.read(), (
+                optimize, symbol_map, object_file, outline, dead_code))
+        if cache.fetch(key, output_paths):
+            return True
+
+    with open(input_path, 'r') as input_file, \
+            _atomic_open(output_path, 'w') as output_file:
+        if packed or optimize or symbol_map or object_file or outline or \
+                dead_code:
+            # The whole program is in memory anyway, assemble it once for
+            # all the outputs.
+            optimizer = Optimizer(_commands(Parser(input_file, streaming)))
+            if dead_code:
+                reclaimed = optimizer.eliminate_dead_code()
+                print(os.path.basename(input_path) + ": dead code removal "
+                      "reclaimed " + str(reclaimed) + " ROM words")
+            if optimize:
+                removed = optimizer.peephole()
+                print(os.path.basename(input_path) + ": peephole removed " +
+                      str(removed) + " instructions")
+            if outline:
+                saved, calls = optimizer.outline()
+                print(os.path.basename(input_path) + ": outlining saved " +
+                      str(saved) + " instructions with " + str(calls) +
+                      " call sites, each call runs " + str(CALL_OVERHEAD) +
+                      " more instructions")
+            commands = optimizer.commands
+            if object_file:
+                ObjectFile.assemble(
+                    Parser(commands, streaming=True)).write(output_file)
+            else:
+                _write_program(commands, output_paths, output_file)
+        elif single_pass:
+            assemble_file_single_pass(input_file, output_file, streaming)
+        else:
+            assemble_file(input_file, output_file, streaming)
+
+    if cache is not None:
+        cache.store(key, output_paths)
+    return False
+
+
+def _write_program(commands: typing.List[str],
+                   output_paths: typing.Dict[str, str],
+                   output_file: typing.TextIO) -> None:
+    """Assembles the given commands, writes the .hack file to output_file,
+    and the other outputs to their paths in output_paths.
+    """
+    words, symbol_table = _assemble_single_pass(
+        Parser(commands, streaming=True))
+    output_file.write("".join(map(_word_text, words)))
+
+    map_text = ""
+    if SymbolMap.EXTENSION in output_paths:
+        map_text = SymbolMap.from_symbol_table(symbol_table).to_text()
+        with _atomic_open(output_paths[SymbolMap.EXTENSION], 'w') as map_file:
+            map_file.write(map_text)
+        with _atomic_open(output_paths[SymbolMap.LISTING_EXTENSION], 'w') \
+                as listing_file:
+            SymbolMap.write_listing(listing_file, commands, words)
+    if RomImage.EXTENSION in output_paths:
+        with _atomic_open(output_paths[RomImage.EXTENSION], 'wb') as rom_file:
+            RomImage.write(rom_file, words, map_text.encode())
+
+
+def _commands(parser: Parser) -> typing.Iterator[str]:
+    """Yields the text of every remaining command of the parser."""
+    while parser.has_more_commands():
+        parser.advance()
+        yield parser.command()
+
+
+def _timed_assemble_path(
+        input_path: str, **options) -> typing.Tuple[str, bool, float]:
+    """Calls assemble_path, and returns the input path, whether the outputs
+    were taken from the cache, and the wall time it took in seconds.
+    """
+    start = time.perf_counter()
+    cached = assemble_path(input_path, **options)
+    return input_path, cached, time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def _atomic_open(path: str, mode: str) -> typing.Iterator[typing.IO]:
+    """Opens a temporary file next to the given path, and moves it over the
+    path only once it was completely and successfully written.
+    """
+    directory, basename = os.path.split(path)
+    descriptor, temp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + basename + ".")
+    try:
+        with open(descriptor, mode) as temp_file:
+            yield temp_file
+        # mkstemp creates the file as private, use the usual permissions.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _word_text(word: int) -> str:
+    """Returns the line of the .hack file holding the given word."""
+    return format(word, "016b") + "\n"
+
 
 if "__main__" == __name__:
     # Parses the input path and calls assemble_file on each input file.
@@ -84,20 +356,96 @@ if "__main__" == __name__:
     # Both are closed automatically when the code finishes running.
     # If the output file does not exist, it is created automatically in the
     # correct path, using the correct filename.
-    if not len(sys.argv) == 2:
-        sys.exit("Invalid usage, please use: Assembler <input path>")
-    argument_path = os.path.abspath(sys.argv[1])
+    argument_parser = argparse.ArgumentParser(
+        prog="Assembler", description="Assembles Hack .asm files.")
+    argument_parser.add_argument(
+        "input_path", help="an .asm file or a directory of .asm files")
+    argument_parser.add_argument(
+        "--single-pass", action="store_true",
+        help="read every input file only once")
+    argument_parser.add_argument(
+        "--streaming", action="store_true",
+        help="never hold a whole input file in memory")
+    argument_parser.add_argument(
+        "--packed", action="store_true",
+        help="also write a packed binary ROM image (.rom)")
+    argument_parser.add_argument(
+        "--optimize", "-O", action="store_true",
+        help="remove redundant instructions with the peephole optimizer")
+    argument_parser.add_argument(
+        "--dead-code", action="store_true",
+        help="remove unreachable instructions and unused labels")
+    argument_parser.add_argument(
+        "--outline", action="store_true",
+        help="shrink the ROM by moving repeated instruction sequences into "
+             "shared subroutines")
+    argument_parser.add_argument(
+        "--map", action="store_true", dest="symbol_map",
+        help="also write the resolved symbols (.map) and a listing (.lst)")
+    argument_parser.add_argument(
+        "--object", action="store_true", dest="object_file",
+        help="write relocatable object files (.hobj) for the Linker instead "
+             "of .hack files")
+    argument_parser.add_argument(
+        "--jobs", "-j", type=int, metavar="N",
+        help="assemble the files in N worker processes (0 for one per core) "
+             "and report the wall time of every file")
+    argument_parser.add_argument(
+        "--cache", metavar="DIR",
+        help="reuse the outputs of unchanged inputs from this directory")
+    argument_parser.add_argument(
+        "--cache-size", type=int, default=256, metavar="MB",
+        help="evict the least recently used cache entries beyond this size")
+    arguments = argument_parser.parse_args()
+    argument_path = os.path.abspath(arguments.input_path)
     if os.path.isdir(argument_path):
         files_to_assemble = [
             os.path.join(argument_path, filename)
             for filename in os.listdir(argument_path)]
     else:
         files_to_assemble = [argument_path]
-    for input_path in files_to_assemble:
-        filename, extension = os.path.splitext(input_path)
-        if extension.lower() != ".asm":
-            continue
-        output_path = filename + ".hack"
-        with open(input_path, 'r') as input_file, \
-                open(output_path, 'w') as output_file:
-            assemble_file(input_file, output_file)
+    files_to_assemble = [
+        input_path for input_path in files_to_assemble
+        if os.path.splitext(input_path)[1].lower() == ".asm"]
+    cache = None
+    if arguments.cache is not None:
+        cache = BuildCache(arguments.cache, arguments.cache_size * 1024 ** 2)
+    options = dict(single_pass=arguments.single_pass,
+                   streaming=arguments.streaming, packed=arguments.packed,
+                   optimize=arguments.optimize,
+                   symbol_map=arguments.symbol_map,
+                   object_file=arguments.object_file,
+                   outline=arguments.outline,
+                   dead_code=arguments.dead_code, cache=cache)
+
+    failed = False
+    if arguments.jobs is None:
+        for input_path in files_to_assemble:
+            cached = assemble_path(input_path, **options)
+            if cache is not None:
+                cache.record(cached)
+    else:
+        # Every file is assembled in a worker process, and reported with its
+        # wall time as soon as it is done.
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=arguments.jobs or None) as executor:
+            futures = {
+                executor.submit(_timed_assemble_path, input_path, **options):
+                    input_path for input_path in files_to_assemble}
+            for future in concurrent.futures.as_completed(futures):
+                input_name = os.path.basename(futures[future])
+                try:
+                    input_path, cached, seconds = future.result()
+                except Exception as error:
+                    failed = True
+                    print(input_name + ": failed: " + repr(error),
+                          file=sys.stderr)
+                else:
+                    if cache is not None:
+                        cache.record(cached)
+                    print(input_name + ": " + format(seconds, ".3f") + "s" +
+                          (" (cached)" if cached else ""))
+    if cache is not None:
+        print(cache.summary())
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,655 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+from SymbolTable import SymbolTable
+
+
+# The sizes of the outliner's call sequence, "@ret / D=A / @R / M=D /
+# @OUTLINE$n / 0;JMP / (ret)", and return sequence, "@R / A=M / 0;JMP", in
+# instructions, where R holds the return address.
+CALL_SIZE = 6
+RETURN_SIZE = 3
+
+# The instructions every call of an outlined sequence adds to the run time.
+CALL_OVERHEAD = CALL_SIZE + RETURN_SIZE
+
+# Pairs of adjacent C-commands that cancel each other out.
+_CANCELLING_PAIRS = {("M=M+1", "M=M-1"), ("M=M-1", "M=M+1"),
+                     ("D=D+1", "D=D-1"), ("D=D-1", "D=D+1"),
+                     ("M=!M", "M=!M"), ("D=!D", "D=!D"),
+                     ("M=-M", "M=-M"), ("D=-D", "D=-D")}
+
+
+class Optimizer:
+    """Rewrites a Hack assembly program, given as a list of commands without
+    white space and comments, into a shorter program with the same behavior.
+    The commands are the ones the Parser yields: "@Xxx", "(Xxx)" or
+    "dest=comp;jump".
+    """
+
+    def __init__(self, commands: typing.Iterable[str]) -> None:
+        """Gets ready to optimize the given commands.
+
+        Args:
+            commands (typing.Iterable[str]): the commands of the program.
+        """
+        self.__commands = list(commands)
+
+        # Variables may be pinned to their addresses by a pass, the next
+        # free address is then at least this one.
+        self.__variables_end = 16
+
+    @property
+    def commands(self) -> typing.List[str]:
+        """The commands of the program, as optimized so far."""
+        return self.__commands
+
+    def peephole(self) -> int:
+        """Applies the peephole rewrite rules until none of them applies.
+        A label may be jumped to, so no rule looks across a label, except for
+        the one removing a jump to the label that immediately follows it.
+
+        - An A-command loading the value A already holds is removed. This
+          covers the repeated "@SP" and "@SP / A=M" reloads: A is known to
+          hold the address "@X", or the value "*X" that "A=M" loaded from
+          it as long as no command wrote to the memory since then.
+        - An A-command immediately followed by another one is removed,
+          unless it is the first use of a variable, since variables are
+          allocated in order of first use.
+        - Adjacent commands that cancel each other out, such as "M=M+1"
+          followed by "M=M-1", are removed.
+        - "@L / 0;JMP" immediately followed by "(L)" is removed.
+
+        The numeric ROM addresses jumped to are replaced by labels first
+        (see _label_numeric_jumps), and a program with a jump that may still
+        target a number is left unchanged (see _has_unknown_jumps).
+
+        Returns:
+            int: the number of instructions removed.
+        """
+        commands = _label_numeric_jumps(self.__commands)
+        if _has_unknown_jumps(commands):
+            return 0  # removing instructions may move a jump target
+        original, self.__commands = self.__commands, commands
+        while self.__peephole_pass():
+            pass
+        removed = len(commands) - len(self.__commands)
+        if not removed:
+            self.__commands = original
+        return removed
+
+    def __peephole_pass(self) -> bool:
+        """Applies every rule once, and returns whether anything changed."""
+        commands = self.__commands
+        optimized = []
+        labels = {command[1:-1] for command in commands if command[0] == "("}
+        variables = set(_variables(commands, labels, SymbolTable()))
+        used = set()  # the variables used so far
+
+        # What A is known to hold: ("@", X) for the address X, ("*", X) for
+        # the value loaded from the address X, or None.
+        a_value = None
+
+        i = 0
+        while i < len(commands):
+            command = commands[i]
+            following = commands[i + 1] if i + 1 < len(commands) else None
+
+            if command[0] == "(":
+                a_value = None
+                optimized.append(command)
+                i += 1
+                continue
+
+            if command[0] == "@":
+                symbol = command[1:]
+                first_use = symbol in variables and symbol not in used
+                if first_use:
+                    used.add(symbol)
+                if a_value == ("@", symbol):
+                    i += 1
+                    continue
+                if a_value == ("*", symbol) and following == "A=M":
+                    i += 2
+                    continue
+                if following is not None and following[0] == "@" and \
+                        not first_use:
+                    i += 1
+                    continue
+                if following == "0;JMP" and i + 2 < len(commands) and \
+                        commands[i + 2] == "(" + symbol + ")":
+                    i += 2
+                    continue
+                a_value = ("@", symbol)
+                optimized.append(command)
+                i += 1
+                continue
+
+            if (command, following) in _CANCELLING_PAIRS:
+                i += 2
+                continue
+
+            dest = command.partition("=")[0] if "=" in command else ""
+            if "M" in dest and a_value is not None and a_value[0] == "*":
+                a_value = None
+            if "A" in dest:
+                if command == "A=M" and a_value is not None and \
+                        a_value[0] == "@":
+                    a_value = ("*", a_value[1])
+                else:
+                    a_value = None
+            optimized.append(command)
+            i += 1
+
+        changed = len(optimized) != len(commands)
+        self.__commands = optimized
+        return changed
+
+    def eliminate_dead_code(self) -> int:
+        """Removes the instructions no execution can reach, and the labels
+        nothing loads.
+
+        Execution starts at the first instruction and falls through every
+        instruction except an unconditional jump. A label is a possible jump
+        target as soon as a reachable instruction loads its address, which
+        covers the computed jumps, such as VM returns. The numeric ROM
+        addresses jumped to are replaced by labels first (see
+        _label_numeric_jumps), and a program with a jump that may still
+        target a number is left unchanged (see _has_unknown_jumps), since
+        removing instructions moves its target.
+
+        Variables are allocated in order of first use, so a variable that
+        would change address, because its first use was removed, is loaded
+        by its original address instead.
+
+        Returns:
+            int: the number of ROM words reclaimed.
+        """
+        commands = _label_numeric_jumps(self.__commands)
+        if _has_unknown_jumps(commands):
+            return 0
+        labels = {command[1:-1]: index for index, command in
+                  enumerate(commands) if command[0] == "("}
+        symbol_table = SymbolTable()
+        variables = _variables(commands, labels, symbol_table)
+
+        reachable = [False] * len(commands)
+        pending = [0] if commands else []
+        while pending:
+            index = pending.pop()
+            while index < len(commands) and not reachable[index]:
+                reachable[index] = True
+                command = commands[index]
+                if command[0] == "@":
+                    target = labels.get(command[1:])
+                    if target is not None:
+                        pending.append(target)
+                elif command.endswith(";JMP"):
+                    break
+                index += 1
+
+        loaded = {command[1:] for command, live in zip(commands, reachable)
+                  if live and command[0] == "@"}
+        live_commands = [
+            command for command, live in zip(commands, reachable)
+            if live and (command[0] != "(" or command[1:-1] in loaded)]
+        removed = _instruction_count(commands) - \
+            _instruction_count(live_commands)
+        if removed == 0:
+            return 0
+
+        # Keep the addresses of the variables, as first allocated.
+        kept = _variables(live_commands, labels, symbol_table)
+        prefix = 0
+        while prefix < len(kept) and kept[prefix] == variables[prefix]:
+            prefix += 1
+        pinned = {variable: "@" + str(16 + address) for address, variable in
+                  enumerate(variables) if address >= prefix}
+        self.__commands = [
+            pinned.get(command[1:], command) if command[0] == "@" else command
+            for command in live_commands]
+        self.__variables_end = max(self.__variables_end, 16 + len(variables))
+        return removed
+
+    def outline(self, min_length: int = CALL_SIZE + 1,
+                max_length: int = 64) -> typing.Tuple[int, int]:
+        """Turns repeated instruction sequences into shared subroutines, to
+        make the program smaller at the cost of a call overhead.
+
+        The repeats are found with a suffix array of the program. A sequence
+        may be outlined if it contains neither labels nor jumps, starts with
+        an A-command, and writes D before reading it, since the call
+        sequence passes the return address in D. Every call site must also
+        be followed by an A-command, since the return sequence leaves the
+        return address in A. The profitable sequences are chosen greedily,
+        by the number of instructions they save, and appended after the
+        program, each followed by the return sequence, after a halting loop
+        if the program may run off its end. The return address is
+        kept in the RAM word right after the program's variables, so that
+        the variables keep their addresses. The numeric ROM addresses jumped
+        to are replaced by labels first (see _label_numeric_jumps), and a
+        program with a jump that may still target a number is left
+        unchanged (see _has_unknown_jumps).
+
+        Args:
+            min_length (int): the length of the shortest sequence considered.
+            max_length (int): the length of the longest sequence considered.
+
+        Returns:
+            typing.Tuple[int, int]: the number of instructions saved, and the
+            number of call sites, each of which executes CALL_OVERHEAD more
+            instructions than before.
+        """
+        commands = _label_numeric_jumps(self.__commands)
+        if _has_unknown_jumps(commands):
+            return 0, 0  # moving instructions may move a jump target
+        tokens, is_a_command = _tokenize(commands)
+        suffix_array = _suffix_array(tokens)
+        lcp = _lcp_array(tokens, suffix_array)
+
+        candidates = []
+        for length, parent_length, first, last in _lcp_intervals(lcp):
+            if length < min_length:
+                continue
+            positions = sorted(suffix_array[first:last + 1])
+            candidate = self.__outline_candidate(
+                commands, tokens, is_a_command, positions, min(length, max_length),
+                max(parent_length, min_length - 1), length)
+            if candidate is not None:
+                candidates.append(candidate)
+
+        # The most profitable sequences first, each position is outlined once.
+        candidates.sort(key=lambda candidate: -candidate[0])
+        used = [False] * len(tokens)
+        calls = dict()
+        bodies = []
+        for _, length, positions in candidates:
+            chosen = []
+            for position in positions:
+                if any(used[position:position + length]) or \
+                        (chosen and chosen[-1] + length > position):
+                    continue
+                chosen.append(position)
+            if _outline_savings(length, len(chosen)) <= 0:
+                continue
+            name = "OUTLINE$" + str(len(bodies))
+            bodies.append((name, commands[chosen[0]:chosen[0] + length]))
+            for position in chosen:
+                used[position:position + length] = [True] * length
+                calls[position] = (name, length)
+
+        if not bodies:
+            return 0, 0
+        return_address = "@" + str(max(_next_variable_address(commands),
+                                       self.__variables_end))
+
+        outlined = []
+        i = 0
+        while i < len(commands):
+            if i not in calls:
+                outlined.append(commands[i])
+                i += 1
+                continue
+            name, length = calls[i]
+            return_label = name + "$ret." + str(i)
+            outlined.extend(["@" + return_label, "D=A",
+                             return_address, "M=D",
+                             "@" + name, "0;JMP", "(" + return_label + ")"])
+            i += length
+        if not commands[-1].endswith(";JMP"):
+            # the program may run off its end, which must not call a body
+            outlined.extend(["(OUTLINE$end)", "@OUTLINE$end", "0;JMP"])
+        for name, body in bodies:
+            outlined.append("(" + name + ")")
+            outlined.extend(body)
+            outlined.extend([return_address, "A=M", "0;JMP"])
+
+        saved = _instruction_count(commands) - _instruction_count(outlined)
+        if saved <= 0:
+            return 0, 0
+        self.__commands = outlined
+        return saved, len(calls)
+
+    @staticmethod
+    def __outline_candidate(
+            commands: typing.List[str], tokens: typing.List[int], is_a_command: typing.List[bool],
+            positions: typing.List[int], longest: int, shortest: int,
+            repeat_length: int) -> typing.Optional[
+                typing.Tuple[int, int, typing.List[int]]]:
+        """Picks the longest length, between shortest (exclusive) and longest,
+        of the sequence repeated at the given positions which can be
+        outlined.
+
+        Returns:
+            typing.Optional[typing.Tuple[int, int, typing.List[int]]]: the
+            estimated savings, the length and the positions of the sequence
+            to outline, or None if it cannot be outlined profitably.
+        """
+        start = positions[0]
+        if not is_a_command[tokens[start]]:
+            return None
+        d_written = _first_d_write(commands, start, longest)
+        if d_written is None:
+            return None
+
+        for length in range(longest, max(shortest, d_written), -1):
+            if length < repeat_length:
+                # the command after the sequence is part of the repeat too
+                if not is_a_command[tokens[start + length]]:
+                    continue
+                valid = positions
+            else:
+                valid = [position for position in positions
+                         if position + length < len(tokens) and
+                         is_a_command[tokens[position + length]]]
+            savings = _outline_savings(length, len(valid))
+            if savings > 0:
+                return savings, length, valid
+        return None
+
+
+def _tokenize(commands: typing.List[str]) -> \
+        typing.Tuple[typing.List[int], typing.List[bool]]:
+    """Maps every command to an integer token, equal commands sharing their
+    token, except for labels and jumps, which never repeat. Returns the
+    tokens, and which tokens are A-commands.
+    """
+    token_of = dict()
+    tokens = []
+    is_a_command = []
+    for command in commands:
+        if command[0] == "(" or ";" in command:
+            token = len(is_a_command)
+        else:
+            token = token_of.get(command)
+            if token is None:
+                token = token_of[command] = len(is_a_command)
+        if token == len(is_a_command):
+            is_a_command.append(command[0] == "@")
+        tokens.append(token)
+    return tokens, is_a_command
+
+
+def _first_d_write(commands: typing.List[str], start: int,
+                   length: int) -> typing.Optional[int]:
+    """Returns the index, in the sequence, of the first command writing D,
+    or None if D is read before that, or not written at all.
+    """
+    for index in range(length):
+        command = commands[start + index]
+        if command[0] == "@":
+            continue
+        dest, equals, comp = command.rpartition("=")
+        if "D" in comp:
+            return None
+        if "D" in dest:
+            return index
+    return None
+
+
+def _suffix_array(tokens: typing.List[int]) -> typing.List[int]:
+    """Sorts the suffixes of the tokens by prefix doubling."""
+    n = len(tokens)
+    rank = list(tokens)
+    suffix_array = list(range(n))
+    step = 1
+    while True:
+        def key(i: int, rank: typing.List[int] = rank) -> \
+                typing.Tuple[int, int]:
+            return rank[i], rank[i + step] if i + step < n else -1
+        suffix_array.sort(key=key)
+        new_rank = [0] * n
+        for index in range(1, n):
+            new_rank[suffix_array[index]] = new_rank[
+                suffix_array[index - 1]] + \
+                (key(suffix_array[index - 1]) < key(suffix_array[index]))
+        rank = new_rank
+        if n == 0 or rank[suffix_array[-1]] == n - 1:
+            return suffix_array
+        step *= 2
+
+
+def _lcp_array(tokens: typing.List[int],
+               suffix_array: typing.List[int]) -> typing.List[int]:
+    """Kasai's algorithm: lcp[i] is the length of the longest common prefix
+    of the suffixes suffix_array[i - 1] and suffix_array[i] (lcp[0] = 0).
+    """
+    n = len(tokens)
+    rank = [0] * n
+    for index, suffix in enumerate(suffix_array):
+        rank[suffix] = index
+    lcp = [0] * n
+    common = 0
+    for suffix in range(n):
+        if rank[suffix] == 0:
+            common = 0
+            continue
+        previous = suffix_array[rank[suffix] - 1]
+        while suffix + common < n and previous + common < n and \
+                tokens[suffix + common] == tokens[previous + common]:
+            common += 1
+        lcp[rank[suffix]] = common
+        if common:
+            common -= 1
+    return lcp
+
+
+def _lcp_intervals(lcp: typing.List[int]) -> \
+        typing.Iterator[typing.Tuple[int, int, int, int]]:
+    """Yields the internal nodes of the suffix tree as (length, length of
+    the parent node, first index, last index) in the suffix array: the
+    suffixes from the first to the last index share their first length
+    tokens, and no other suffix does.
+    """
+    stack = [(0, 0)]  # (length, first index)
+    for index in range(1, len(lcp) + 1):
+        current = lcp[index] if index < len(lcp) else 0
+        first = index - 1
+        while current < stack[-1][0]:
+            length, first = stack.pop()
+            yield length, max(current, stack[-1][0]), first, index - 1
+        if current > stack[-1][0]:
+            stack.append((current, first))
+
+
+def _label_numeric_jumps(commands: typing.List[str]) -> typing.List[str]:
+    """Replaces every numeric ROM address loaded right before a jump, as in
+    "@133 / 0;JMP", by a label of the instruction at that address, so that
+    the label follows it when a pass moves it. A label the program already
+    has at that address is reused, a new one is named ROM$<address>.
+
+    Args:
+        commands (typing.List[str]): the commands of the program.
+
+    Returns:
+        typing.List[str]: the commands with their jump targets labeled, the
+        given list if no jump targets a numeric address.
+    """
+    size = _instruction_count(commands)
+    targets = {int(command[1:]) for command, following in
+               zip(commands, commands[1:]) if command[0] == "@" and
+               command[1:].isdigit() and _is_jump(following)}
+    targets = {address for address in targets if address <= size}
+    if not targets:
+        return commands
+
+    names = dict()
+    address = 0
+    for command in commands:
+        if command[0] == "(":
+            names.setdefault(address, command[1:-1])
+        else:
+            address += 1
+    new_labels = {address for address in targets if address not in names}
+    for address in new_labels:
+        names[address] = "ROM$" + str(address)
+
+    labeled = []
+    address = 0
+    for index, command in enumerate(commands):
+        if command[0] != "(":
+            if address in new_labels:
+                labeled.append("(" + names[address] + ")")
+            address += 1
+        if command[0] == "@" and command[1:].isdigit() and \
+                int(command[1:]) in targets and \
+                index + 1 < len(commands) and _is_jump(commands[index + 1]):
+            command = "@" + names[int(command[1:])]
+        labeled.append(command)
+    if size in new_labels:
+        labeled.append("(" + names[size] + ")")
+    return labeled
+
+
+def _has_unknown_jumps(commands: typing.List[str]) -> bool:
+    """Can a jump of the program target anything but a label?
+
+    Every pass moves instructions, and so the ROM addresses after them,
+    which only the labels follow. A forward data-flow analysis tracks
+    whether A, D, and the RAM words the A-commands name, may hold a number
+    which is not the address of a label: a numeric or predefined constant,
+    the address of a variable, or a value computed from one. A jump is
+    unknown if A may hold such a number there, as in "@6 / D=A / ... / A=D
+    / 0;JMP" (see _label_numeric_jumps for "@6 / 0;JMP").
+
+    The other jumps target labels. A computed one, such as the "@R14 / A=M
+    / 0;JMP" of a VM return, may target any label the program loads as a
+    value, as in "@RET / D=A". The words read through computed addresses,
+    such as the stack, are assumed to hold label addresses when they are
+    jumped to, and not to alias the named words.
+
+    Args:
+        commands (typing.List[str]): the commands of the program.
+
+    Returns:
+        bool: True if a pass must leave the program unchanged.
+    """
+    labels = {command[1:-1]: index for index, command in enumerate(commands)
+              if command[0] == "("}
+    # the labels loaded as values, and not only jumped to right away
+    loaded = {labels[command[1:]] for command, following in
+              zip(commands, commands[1:]) if command[0] == "@" and
+              command[1:] in labels and following[0] not in "@(" and
+              "A" in following.rpartition("=")[2].partition(";")[0]}
+    symbol_table = SymbolTable()
+
+    def word(symbol: str) -> typing.Union[int, str]:
+        """The RAM word an A-command names."""
+        if symbol.isdigit():
+            return int(symbol)
+        if symbol_table.contains(symbol):
+            return symbol_table.get_address(symbol)
+        return symbol
+
+    # A state is (A may be a number, the symbol A was loaded with or None,
+    # D may be a number, the named words which may hold a number).
+    entries = {0: (False, None, False, frozenset())} if commands else {}
+    computed = None  # the join of the states after all computed jumps
+    pending = list(entries)
+
+    def enter(index: int, state: tuple) -> None:
+        """Joins a state into the entry state of the command at index."""
+        entry = entries.get(index)
+        if entry is not None:
+            state = (entry[0] or state[0],
+                     entry[1] if entry[1] == state[1] else None,
+                     entry[2] or state[2], entry[3] | state[3])
+            if state == entry:
+                return
+        entries[index] = state
+        pending.append(index)
+
+    while pending:
+        index = pending.pop()
+        a_number, a_symbol, d_number, numbers = entries[index]
+        if commands[index][0] == "(":
+            index += 1
+        while index < len(commands):
+            command = commands[index]
+            if command[0] == "(":
+                enter(index, (a_number, a_symbol, d_number, numbers))
+                break
+            index += 1
+            if command[0] == "@":
+                a_symbol = command[1:]
+                a_number = a_symbol not in labels
+                continue
+
+            dest, equals, comp = command.rpartition("=")
+            comp, semicolon, jump = comp.partition(";")
+            target_number, target = a_number, a_symbol
+            number = comp in ("0", "1", "-1") or \
+                ("A" in comp and a_number) or ("D" in comp and d_number) or \
+                ("M" in comp and a_symbol is not None and
+                 word(a_symbol) in numbers)
+            if "M" in dest and a_symbol is not None:
+                if number:
+                    numbers = numbers | {word(a_symbol)}
+                else:
+                    numbers = numbers - {word(a_symbol)}
+            if "A" in dest:
+                a_number, a_symbol = number, None
+            if "D" in dest:
+                d_number = number
+            if not jump or jump == "null":
+                continue
+
+            if target_number:
+                return True
+            state = (a_number, a_symbol, d_number, numbers)
+            if target in labels:
+                enter(labels[target], state)
+            else:
+                joined = state if computed is None else (
+                    computed[0] or state[0], None,
+                    computed[2] or state[2], computed[3] | state[3])
+                if joined != computed:
+                    computed = joined
+                    for label_index in loaded:
+                        enter(label_index, computed)
+            if jump == "JMP":
+                break
+    return False
+
+
+def _is_jump(command: str) -> bool:
+    """Is the command a C-command with a jump?"""
+    return command[0] not in "@(" and \
+        command.partition(";")[2] not in ("", "null")
+
+
+def _variables(commands: typing.List[str], labels: typing.Container[str],
+               symbol_table: SymbolTable) -> typing.List[str]:
+    """Returns the variables of the program, in order of allocation."""
+    variables = dict()
+    for command in commands:
+        if command[0] == "@":
+            symbol = command[1:]
+            if symbol not in labels and not symbol.isnumeric() and \
+                    not symbol_table.contains(symbol):
+                variables[symbol] = None
+    return list(variables)
+
+
+def _next_variable_address(commands: typing.List[str]) -> int:
+    """Returns the address the assembler would give a new variable of the
+    program.
+    """
+    labels = {command[1:-1] for command in commands if command[0] == "("}
+    return 16 + len(_variables(commands, labels, SymbolTable()))
+
+
+def _outline_savings(length: int, count: int) -> int:
+    """The instructions saved by outlining a sequence of the given length
+    that appears count times.
+    """
+    return count * length - (count * CALL_SIZE + length + RETURN_SIZE)
+
+
+def _instruction_count(commands: typing.List[str]) -> int:
+    return sum(1 for command in commands if command[0] != "(")
@@ -5,9 +5,77 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import functools
+import operator
+import re
 import typing
 
 
+# A command, after its spaces are removed, and an optional comment.
+_COMMAND_PATTERN = re.compile(
+    r"(?P<text>@(?P<address>[^/]*)"
+    r"|\((?P<label>[^/]*)\)"
+    r"|(?:(?P<dest>[^=;/]*)=)?(?P<comp>[^;/]+)(?:;(?P<jump>[^/]*))?)?"
+    r"(?://.*)?")
+
+# The number of distinct commands whose decoded records are kept, so that
+# the memory of a streaming parser stays bounded.
+_DECODED_COMMANDS = 1024
+
+
+class Command(tuple):
+    """A decoded command of the program: an immutable record of its text,
+    kind ("A_COMMAND", "C_COMMAND" or "L_COMMAND"), the symbol or decimal of
+    an A- or L-command, and the dest, comp and jump mnemonics of a
+    C-command, where a missing dest or jump is "null". The fields a command
+    does not have are None.
+    """
+
+    __slots__ = ()
+
+    text = property(operator.itemgetter(0))
+    kind = property(operator.itemgetter(1))
+    symbol = property(operator.itemgetter(2))
+    dest = property(operator.itemgetter(3))
+    comp = property(operator.itemgetter(4))
+    jump = property(operator.itemgetter(5))
+
+    def __repr__(self) -> str:
+        return "Command(" + repr(self.text) + ")"
+
+    @staticmethod
+    def decode(line: str) -> typing.Optional["Command"]:
+        """Decodes a line of the program.
+
+        Args:
+            line (str): the line, possibly with white space and a comment.
+
+        Returns:
+            typing.Optional[Command]: the command of the line, or None if the
+            line holds no command.
+        """
+        match = _COMMAND_PATTERN.fullmatch(line.replace(" ", "").rstrip("\n"))
+        if match is None:
+            raise ValueError("invalid command: " + line.strip())
+        text, address, label, dest, comp, jump = match.groups()
+        if not text:
+            return None
+        if address is not None:
+            fields = (text, "A_COMMAND", address, None, None, None)
+        elif label is not None:
+            fields = (text, "L_COMMAND", label, None, None, None)
+        else:
+            fields = (text, "C_COMMAND", None, dest or "null", comp,
+                      jump or "null")
+        return tuple.__new__(Command, fields)
+
+
+@functools.lru_cache(maxsize=_DECODED_COMMANDS)
+def _decode_text(text: str) -> typing.Optional[Command]:
+    """Decodes the text of a command, without white space and comments."""
+    return Command.decode(text)
+
+
 class Parser:
     """Encapsulates access to the input code. Reads an assembly program
     by reading each command line-by-line, parses the current command,
@@ -15,25 +83,56 @@ class Parser:
     and symbols). In addition, removes all white space and comments.
     """
 
-    def __init__(self, input_file: typing.TextIO) -> None:
+    def __init__(
+            self, input_file: typing.TextIO, streaming: bool = False) -> None:
         """Opens the input file and gets ready to parse it.
 
         Args:
             input_file (typing.TextIO): input file.
+            streaming (bool): if this is True, the input is read lazily,
+                line-by-line, instead of being held in memory. Any iterable
+                of lines may then be given instead of a file. Resetting a
+                streaming parser re-reads the input from its beginning, so it
+                has to be a seekable file.
         """
-        self.__input_lines = input_file.read().splitlines()
-        for i in range(len(self.__input_lines)):
-
-            # Remove any space in the line.
-            self.__input_lines[i] = self.__input_lines[i].replace(" ", "")
+        self.__input_file = input_file
+        self.__streaming = streaming
+        if streaming:
+            self.__start(self.__read_commands(input_file))
+        else:
+            # Only the non-empty commands are kept, already decoded.
+            self.__input_lines = list(
+                self.__read_commands(input_file.read().splitlines()))
+            self.__start(iter(self.__input_lines))
 
-            # Check for a comment in the line, and remove starting from it.
-            comment_index = self.__input_lines[i].find("//")
-            if comment_index != -1:
-                self.__input_lines[i] = self.__input_lines[i][:comment_index] # excludes the //
+    @staticmethod
+    def __read_commands(
+            lines: typing.Iterable[str]) -> typing.Iterator[Command]:
+        """Yields the commands of the given lines, one at a time.
 
-        # A pointer to which line in the file we are in.
-        self.__reached = -1
+        Args:
+            lines (typing.Iterable[str]): the lines of the program.
+
+        Yields:
+            Command: every non-empty command, decoded. Commands are
+            immutable, so the most recently used commands are kept by their
+            text, without white space and comments, and a command repeated
+            in the program is decoded once while it is kept, all its
+            occurrences sharing the same record.
+        """
+        for line in lines:
+            command = _decode_text(
+                line.partition("//")[0].replace(" ", "").strip())
+            if command is not None:
+                yield command
+
+    def __start(self, commands: typing.Iterator[Command]) -> None:
+        """Starts reading from the given commands, one command ahead so that
+        has_more_commands() is known without consuming any input.
+        """
+        self.__commands = commands
+        self.__next_command = next(commands, None)
+        self.__current_command = None
 
     def has_more_commands(self) -> bool:
         """Are there more commands in the input?
@@ -41,31 +140,30 @@ class Parser:
         Returns:
             bool: True if there are more commands, False otherwise.
         """
-        for n in range(self.__reached+1, len(self.__input_lines)):
-
-            # Empty line check
-            if len(self.__input_lines[n]) == 0:
-                continue
-
-            return True
-        return False
+        return self.__next_command is not None
 
     def advance(self) -> None:
         """Reads the next command from the input and makes it the current command.
         Should be called only if has_more_commands() is true.
         """
-        n = self.__reached
-        while True:
-            n += 1
-            if len(self.__input_lines[n]) == 0:
-                continue
-            if self.__input_lines[n][0:2] == "//":
-                continue
-            break
-        self.__reached = n
+        self.__current_command = self.__next_command
+        self.__next_command = next(self.__commands, None)
 
     def reset_to_top(self) -> None:
-        self.__reached = -1
+        """Goes back to the beginning of the program."""
+        if self.__streaming:
+            self.__input_file.seek(0)
+            self.__start(self.__read_commands(self.__input_file))
+        else:
+            self.__start(iter(self.__input_lines))
+
+    def command(self) -> str:
+        """
+        Returns:
+            str: the text of the current command, without white space and
+            comments.
+        """
+        return self.__current_command.text
 
     def command_type(self) -> str:
         """
@@ -75,67 +173,37 @@ class Parser:
             "C_COMMAND" for dest=comp;jump
             "L_COMMAND" (actually, pseudo-command) for (Xxx) where Xxx is a symbol
         """
-        cur_cmd = self.__input_lines[self.__reached]
-        if cur_cmd[0] == '@':
-            return "A_COMMAND"
-        if cur_cmd[0] == '(':
-            return "L_COMMAND"
-        else:
-            return "C_COMMAND"
-
+        return self.__current_command.kind
 
     def symbol(self) -> str:
         """
         Returns:
             str: the symbol or decimal Xxx of the current command @Xxx or
-            (Xxx). Should be called only when command_type() is "A_COMMAND" or 
+            (Xxx). Should be called only when command_type() is "A_COMMAND" or
             "L_COMMAND".
         """
-        cur_cmd = self.__input_lines[self.__reached]
-        if self.command_type() == "A_COMMAND":
-            return cur_cmd[1:]
-        else:
-            return cur_cmd[1:-1]
-        
+        return self.__current_command.symbol
 
     def dest(self) -> str:
         """
         Returns:
-            str: the dest mnemonic in the current C-command. Should be called 
+            str: the dest mnemonic in the current C-command. Should be called
             only when commandType() is "C_COMMAND".
         """
-        cur_cmd = self.__input_lines[self.__reached]
-        if '=' not in cur_cmd:
-            return "null"
-        
-        index = cur_cmd.find("=")
-        return cur_cmd[0:index]
-        
+        return self.__current_command.dest
 
     def comp(self) -> str:
         """
         Returns:
-            str: the comp mnemonic in the current C-command. Should be called 
+            str: the comp mnemonic in the current C-command. Should be called
             only when commandType() is "C_COMMAND".
         """
-        cur_cmd = self.__input_lines[self.__reached]
-        start_index = cur_cmd.find("=") + 1
-        comma_index = cur_cmd.find(";")
-
-        if comma_index != -1:
-            return cur_cmd[start_index:comma_index]
-        else:
-            return cur_cmd[start_index:]
+        return self.__current_command.comp
 
     def jump(self) -> str:
         """
         Returns:
-            str: the jump mnemonic in the current C-command. Should be called 
+            str: the jump mnemonic in the current C-command. Should be called
             only when commandType() is "C_COMMAND".
         """
-        cur_cmd = self.__input_lines[self.__reached]
-        comma_index = cur_cmd.find(";")
-        if comma_index == -1:
-            return "null"
-        return cur_cmd[comma_index+1:]
-
+        return self.__current_command.jump
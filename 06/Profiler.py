@@ -0,0 +1,311 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import os
+import sys
+import typing
+import numpy
+from BlockCompiler import BlockCompiler
+from Disassembler import read_words
+from Emulator import Emulator, ram_assignment, decode, halt_addresses
+import Main
+from SymbolMap import SymbolMap
+
+
+# The frame of the code running before the first call.
+ROOT = "<root>"
+
+
+def is_function(label: str) -> bool:
+    """Does the label mark the entry point of a VM function?
+
+    The VM translator labels a function "Xxx.foo" (every Jack subroutine is
+    named after its class), and the labels inside it "Xxx.foo$bar", so a
+    function label has a "." and no "$".
+    """
+    return "." in label and "$" not in label
+
+
+class Profiler:
+    """Counts the cycles a Hack program spends at every ROM address and in
+    every VM function.
+
+    The program runs compiled into blocks (see BlockCompiler), and the
+    profiler counts the entries of every block and the instructions each
+    entry executed, which are consecutive. Since every call and return of
+    the VM translator ends with an unconditional jump, it ends a block too,
+    so calls and returns are found between blocks, at no cost per
+    instruction:
+
+    * a call is "@Xxx.foo / 0;JMP" to a function label, and it returns to
+      the address following the jump, where the translator places its
+      return label (which may also be the label of the next function).
+      A block of the jump alone is a call only if the block before it ran
+      into it, ending with the A-instruction, as when MAX_BLOCK_SIZE
+      splits the two; otherwise A was loaded elsewhere;
+    * a return is any other jump to the return address of the innermost
+      call.
+
+    Every cycle is then attributed to the stack of the functions active
+    when it ran, in the folded format of flamegraph.pl, from which the
+    exclusive and inclusive cycles of every function are summed up.
+    """
+
+    def __init__(self, emulator: Emulator, symbol_map: SymbolMap) -> None:
+        """Gets ready to profile the program of an emulator.
+
+        Args:
+            emulator (Emulator): the emulator of the program, in the state
+                to start profiling from.
+            symbol_map (SymbolMap): the labels of the program.
+        """
+        self.__emulator = emulator
+        self.__symbol_map = symbol_map
+        self.__compiler = BlockCompiler(
+            emulator.words, lambda word: decode(word)[1])
+        self.__functions = {address: label
+                            for address, label in symbol_map.labels
+                            if is_function(label)}
+        self.__halts = halt_addresses(emulator.words)
+        self.__entries = dict()  # start << 9 | executed -> count
+        self.__stacks = [(ROOT,)]  # the stacks of functions, by their index
+        self.__stack_indices = {(ROOT,): 0}
+        self.__stack_cycles = [0]  # the exclusive cycles of every stack
+        self.__calls = dict()  # function -> number of calls
+        self.__frames = []  # (return address, stack index of the caller)
+        self.__stack_index = 0
+
+    def run(self, max_steps: int = 1 << 62) -> int:
+        """Runs the program until it halts, or until the next block would
+        exceed the given number of instructions. It halts after the jump of
+        its halting loop, where Emulator.run stops too.
+
+        Args:
+            max_steps (int): the maximal number of instructions to execute.
+
+        Returns:
+            int: the number of instructions executed.
+        """
+        emulator = self.__emulator
+        compiler = self.__compiler
+        functions = self.__functions
+        halts = self.__halts
+        entries = self.__entries
+        stack_cycles = self.__stack_cycles
+        frames = self.__frames
+        words = emulator.words
+        blocks = dict()
+        ram = emulator.ram
+        a, d, pc = emulator.a, emulator.d, emulator.pc
+        stack_index = self.__stack_index
+        return_address = frames[-1][0] if frames else None
+        end = None  # the address following the previous block
+        steps = 0
+        while True:
+            block = blocks.get(pc)
+            if block is None:
+                block = blocks[pc] = compiler.block(pc)
+            function, size = block
+            if steps + size > max_steps:
+                break
+            start = pc
+            pc, a, d, executed = function(ram, a, d)
+            steps += executed
+            key = start << 9 | executed
+            entries[key] = entries.get(key, 0) + 1
+            stack_cycles[stack_index] += executed
+            # the A-instruction before the jump is in the block, unless
+            # the jump is all of it
+            if pc in functions and words[start + executed - 2] == pc and \
+                    (executed > 1 or end == start):
+                return_address = start + executed
+                frames.append((return_address, stack_index))
+                stack_index = self.__enter(stack_index, functions[pc])
+            elif pc == return_address:
+                stack_index = frames.pop()[1]
+                return_address = frames[-1][0] if frames else None
+            end = start + executed
+            if end - 1 in halts:
+                break
+        emulator.a, emulator.d, emulator.pc = a, d, pc
+        self.__stack_index = stack_index
+        return steps
+
+    def __enter(self, caller_index: int, function: str) -> int:
+        """Counts a call, and returns the index of the callee's stack."""
+        self.__calls[function] = self.__calls.get(function, 0) + 1
+        stack = self.__stacks[caller_index] + (function,)
+        index = self.__stack_indices.get(stack)
+        if index is None:
+            index = self.__stack_indices[stack] = len(self.__stacks)
+            self.__stacks.append(stack)
+            self.__stack_cycles.append(0)
+        return index
+
+    @property
+    def hits(self) -> numpy.ndarray:
+        """The number of times every ROM address was executed, as an array
+        of 32K uint64 counters.
+        """
+        keys = numpy.fromiter(self.__entries.keys(), numpy.int64,
+                              len(self.__entries))
+        counts = numpy.fromiter(self.__entries.values(), numpy.int64,
+                                len(self.__entries))
+        starts = keys >> 9
+        # every entry adds its count to the addresses from its start up to
+        # its end, which the running sum of the differences spreads
+        differences = numpy.zeros(Emulator.ROM_SIZE + 1, numpy.int64)
+        numpy.add.at(differences, starts, counts)
+        numpy.add.at(differences, starts + (keys & 511), -counts)
+        return numpy.cumsum(differences[:-1]).astype(numpy.uint64)
+
+    def label_cycles(self) -> typing.Dict[str, int]:
+        """
+        Returns:
+            typing.Dict[str, int]: the cycles spent in the code of every
+            label, from the label up to the next one, for the labels that
+            were executed. Code before the first label counts for ROOT, and
+            code with several labels counts for its function label, if it
+            has one.
+        """
+        hits = self.hits
+        boundaries = [0]
+        names = [ROOT]
+        for address, label in self.__symbol_map.labels:
+            if address == boundaries[-1]:
+                if not is_function(names[-1]):
+                    names[-1] = label  # the same code, by its function
+            else:
+                boundaries.append(address)
+                names.append(label)
+        sums = numpy.add.reduceat(hits, boundaries)
+        return {name: int(cycles) for name, cycles in zip(names, sums)
+                if cycles}
+
+    def folded_stacks(self) -> typing.Dict[typing.Tuple[str, ...], int]:
+        """
+        Returns:
+            typing.Dict[typing.Tuple[str, ...], int]: the exclusive cycles of
+            every stack of functions that ran, outermost first.
+        """
+        return {stack: cycles
+                for stack, cycles in zip(self.__stacks, self.__stack_cycles)
+                if cycles}
+
+    def write_folded(self, output_file: typing.TextIO) -> None:
+        """Writes the stacks in the folded format of flamegraph.pl and
+        speedscope: "outer;...;inner cycles" per line.
+
+        Args:
+            output_file (typing.TextIO): writes the stacks to this file.
+        """
+        for stack, cycles in self.folded_stacks().items():
+            output_file.write(";".join(stack) + " " + str(cycles) + "\n")
+
+    def function_report(self, by_class: bool = False) -> \
+            typing.List[typing.Tuple[str, int, int, int]]:
+        """Sums up the cycles of every function.
+
+        Args:
+            by_class (bool): sum up the functions of every class, that is,
+                of every Jack class or VM file, instead.
+
+        Returns:
+            typing.List[typing.Tuple[str, int, int, int]]: the name, calls,
+            inclusive cycles and exclusive cycles of every function, most
+            inclusive cycles first. The cycles of a recursive function are
+            counted once per stack.
+        """
+        def name(function: str) -> str:
+            return function.split(".", 1)[0] if by_class else function
+
+        calls = dict()
+        for function, count in self.__calls.items():
+            calls[name(function)] = calls.get(name(function), 0) + count
+        inclusive = dict()
+        exclusive = dict()
+        for stack, cycles in self.folded_stacks().items():
+            innermost = name(stack[-1])
+            exclusive[innermost] = exclusive.get(innermost, 0) + cycles
+            for function in set(map(name, stack)):
+                inclusive[function] = inclusive.get(function, 0) + cycles
+        return sorted(((function, calls.get(function, 0), cycles,
+                        exclusive.get(function, 0))
+                       for function, cycles in inclusive.items()),
+                      key=lambda row: (-row[2], row[0]))
+
+
+def _print_table(rows: typing.Sequence[typing.Sequence], total: int,
+                 headers: typing.Sequence[str]) -> None:
+    width = max([len(headers[0])] + [len(row[0]) for row in rows])
+    print(headers[0].ljust(width) + "".join(
+        header.rjust(14) for header in headers[1:]) + "       %")
+    for row in rows:
+        print(row[0].ljust(width) + "".join(
+            str(value).rjust(14) for value in row[1:]) +
+            format(100 * row[-1] / max(total, 1), "8.2f"))
+
+
+if "__main__" == __name__:
+    # Profiles a program, and reports where its cycles went.
+    argument_parser = argparse.ArgumentParser(
+        prog="Profiler", description="Counts the cycles a Hack program "
+                                     "spends in every function and label.")
+    argument_parser.add_argument(
+        "input_path", help="an .asm file, or a .hack file with a .map file "
+                           "next to it (see Main.py --map)")
+    argument_parser.add_argument(
+        "--steps", type=int, default=10 ** 8,
+        help="stop after this many instructions, unless the program halts "
+             "before (default: 100000000)")
+    argument_parser.add_argument(
+        "--set", type=ram_assignment, action="append", default=[],
+        metavar="ADDRESS=VALUE", help="set a RAM word before running")
+    argument_parser.add_argument(
+        "--by", choices=("function", "class", "label"), default="function",
+        help="sum up the cycles of every function (the default), Jack "
+             "class, or label")
+    argument_parser.add_argument(
+        "--top", type=int, default=30, metavar="N",
+        help="report only the N costliest entries (default: 30)")
+    argument_parser.add_argument(
+        "--folded", metavar="FILE",
+        help="write the stacks of functions for flamegraph.pl to this file")
+    arguments = argument_parser.parse_args()
+
+    input_path = os.path.abspath(arguments.input_path)
+    if os.path.splitext(input_path)[1].lower() == ".asm":
+        with open(input_path, 'r') as program_file:
+            program_words, program_symbols = Main.assemble(program_file.read())
+        program_map = SymbolMap.from_symbol_table(program_symbols)
+    else:
+        map_path = os.path.splitext(input_path)[0] + SymbolMap.EXTENSION
+        if not os.path.exists(map_path):
+            sys.exit(map_path + " is missing, assemble the program with --map")
+        program_words = read_words(input_path)[0]
+        with open(map_path, 'r') as map_file:
+            program_map = SymbolMap.read(map_file)
+
+    emulator = Emulator(program_words)
+    for ram_address, ram_value in arguments.set:
+        emulator.ram[ram_address] = ram_value
+    profiler = Profiler(emulator, program_map)
+    executed = profiler.run(arguments.steps)
+    print(str(executed) + " cycles" + (", halted" if emulator.halted else ""))
+    if arguments.by == "label":
+        label_rows = sorted(profiler.label_cycles().items(),
+                            key=lambda row: (-row[1], row[0]))
+        _print_table(label_rows[:arguments.top], executed,
+                     ("label", "cycles"))
+    else:
+        _print_table(profiler.function_report(arguments.by == "class")
+                     [:arguments.top], executed,
+                     (arguments.by, "calls", "inclusive", "exclusive"))
+    if arguments.folded is not None:
+        with open(arguments.folded, 'w') as folded_file:
+            profiler.write_folded(folded_file)
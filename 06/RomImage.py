@@ -0,0 +1,111 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import array
+import mmap
+import struct
+import sys
+import typing
+
+
+class RomImage:
+    """A packed binary ROM image, an alternative to the textual .hack format.
+
+    The file starts with a 16-byte little-endian header: the magic b"HROM",
+    the format version, a reserved field, the number of instruction words
+    and the byte offset of an optional symbol map (0 if there is none).
+    The instruction words follow the header as little-endian unsigned 16-bit
+    integers, and the symbol map, if any, follows the words.
+
+    Opening an image maps the file into memory, and the words are exposed as
+    a memoryview on the mapping, so no copy is made on little-endian hosts.
+    """
+
+    MAGIC = b"HROM"
+    VERSION = 1
+    EXTENSION = ".rom"
+
+    # magic, version, reserved, word count, symbol map offset
+    __HEADER = struct.Struct("<4sHHII")
+
+    def __init__(self, path: str) -> None:
+        """Maps the image at the given path into memory.
+
+        Args:
+            path (str): the path of the image.
+        """
+        with open(path, "rb") as image_file:
+            self.__mmap = mmap.mmap(
+                image_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, reserved, word_count, symbol_map_offset = \
+            RomImage.__HEADER.unpack_from(self.__mmap)
+        if magic != RomImage.MAGIC or version != RomImage.VERSION:
+            self.__mmap.close()
+            raise ValueError(path + " is not a packed ROM image")
+
+        data = memoryview(self.__mmap)
+        words_end = RomImage.__HEADER.size + 2 * word_count
+        if sys.byteorder == "little":
+            self.__words = data[RomImage.__HEADER.size:words_end].cast("H")
+        else:
+            swapped = array.array(
+                "H", data[RomImage.__HEADER.size:words_end].tobytes())
+            swapped.byteswap()
+            self.__words = memoryview(swapped)
+        if symbol_map_offset:
+            self.__symbol_map = data[symbol_map_offset:]
+        else:
+            self.__symbol_map = data[0:0]
+        self.__data = data
+
+    @property
+    def words(self) -> memoryview:
+        """The instruction words of the image, as unsigned 16-bit integers."""
+        return self.__words
+
+    @property
+    def symbol_map(self) -> memoryview:
+        """The raw bytes of the symbol map, empty if the image has none."""
+        return self.__symbol_map
+
+    def close(self) -> None:
+        """Releases the views and unmaps the file."""
+        self.__words.release()
+        self.__symbol_map.release()
+        self.__data.release()
+        self.__mmap.close()
+
+    def __enter__(self) -> "RomImage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def write(output_file: typing.BinaryIO, words: typing.Iterable[int],
+              symbol_map: bytes = b"") -> None:
+        """Writes a packed ROM image.
+
+        Args:
+            output_file (typing.BinaryIO): writes the image to this file.
+            words (typing.Iterable[int]): the instruction words.
+            symbol_map (bytes): an optional symbol map, stored after the words.
+        """
+        packed = array.array("H", words)
+        if sys.byteorder != "little":
+            packed.byteswap()
+
+        symbol_map_offset = 0
+        if symbol_map:
+            symbol_map_offset = RomImage.__HEADER.size + 2 * len(packed)
+
+        output_file.write(RomImage.__HEADER.pack(
+            RomImage.MAGIC, RomImage.VERSION, 0, len(packed),
+            symbol_map_offset))
+        output_file.write(packed.tobytes())
+        output_file.write(symbol_map)
@@ -0,0 +1,256 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import abc
+import os
+import re
+import typing
+
+
+# The tokens of a script: strings, punctuation, and words.
+_TOKEN_PATTERN = re.compile(r'"[^"]*"|[{},;]|[^\s{},;"]+')
+
+# The comments of a script.
+_COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# An output-list column: the variable, its format, and its paddings.
+_COLUMN_PATTERN = re.compile(
+    r"(?P<variable>[^%]+)%(?P<format>[BDXS])"
+    r"(?P<left>\d+)\.(?P<width>\d+)\.(?P<right>\d+)")
+
+
+class ScriptRunner(abc.ABC):
+    """Runs a test script (.tst) of one of the emulators headlessly.
+
+    The script language is the one the emulators share: commands separated
+    by "," or ";", with "load", "output-file", "compare-to", "output-list",
+    "set", "output", "echo" (ignored), "repeat [N] { ... }", and the
+    commands executing the program, which the emulator defines in
+    STEP_COMMANDS. Every output line is compared to the matching line of the
+    compare file as soon as it is written, and the script stops at the first
+    mismatch, as the emulators do.
+
+    A "repeat" of step commands only runs the program once for all the
+    iterations, which stops as soon as the program halts, so the generous
+    step counts of the scripts cost nothing.
+
+    The emulator is a subclass, which loads the program, runs it, and reads
+    and writes its variables, by implementing _load, _run, _set and _get.
+    The VM emulator of project 08 imports this module through a symbolic
+    link in its directory.
+    """
+
+    # The commands executing the program, and the steps each one executes.
+    STEP_COMMANDS: typing.Dict[str, int] = dict()
+
+    def __init__(self, path: str, max_steps: int) -> None:
+        """Reads a test script.
+
+        Args:
+            path (str): the path of the .tst file. The files the script
+                names are relative to its directory.
+            max_steps (int): the number of steps a "repeat" without a count
+                runs, unless the program halts before.
+        """
+        self.path = path
+        self.__directory = os.path.dirname(os.path.abspath(path))
+        self.__max_steps = max_steps
+        with open(path, 'r') as script_file:
+            tokens = _TOKEN_PATTERN.findall(
+                _COMMENT_PATTERN.sub(" ", script_file.read()))
+        self.__commands = self.__parse(iter(tokens), None)
+
+        self.__output_path = None
+        self.__compare_lines = None
+        self.__columns = []
+        self.output_lines = []
+        self.failure = None
+
+    @abc.abstractmethod
+    def _load(self, path: str) -> None:
+        """Loads the program of the given path, the directory of the script
+        if the "load" command names no file.
+        """
+
+    @abc.abstractmethod
+    def _run(self, steps: int) -> None:
+        """Runs the program for the given number of steps, or until it
+        halts.
+        """
+
+    @abc.abstractmethod
+    def _set(self, variable: str, value: int) -> None:
+        """Sets a variable of the script to a signed 16-bit word."""
+
+    @abc.abstractmethod
+    def _get(self, variable: str) -> int:
+        """Returns the value of a variable of the script."""
+
+    def _unknown_variable(self, variable: str) -> ValueError:
+        return ValueError(self.path + ": unknown variable " + variable)
+
+    def __parse(self, tokens: typing.Iterator[str],
+                closing: typing.Optional[str]) -> list:
+        """Parses commands up to the given closing token (None for the end
+        of the script) into lists of words, and ("repeat", count, commands)
+        tuples.
+        """
+        commands = []
+        words = []
+        for token in tokens:
+            if token == closing:
+                break
+            if token in (",", ";"):
+                if words:
+                    commands.append(words)
+                words = []
+            elif token == "{":
+                if not words or words[0] != "repeat":
+                    raise ValueError(self.path + ": unexpected {")
+                count = int(words[1]) if len(words) > 1 else None
+                commands.append(("repeat", count, self.__parse(tokens, "}")))
+                words = []
+            elif token == "}":
+                raise ValueError(self.path + ": unexpected }")
+            else:
+                words.append(token)
+        else:
+            if closing is not None:
+                raise ValueError(self.path + ": missing " + closing)
+        if words:
+            commands.append(words)
+        return commands
+
+    def run(self) -> bool:
+        """Runs the script, and writes its output file, if it names one.
+
+        Returns:
+            bool: True if every output line matched the compare file (or if
+            there is none), False otherwise, and then failure describes the
+            first mismatch.
+        """
+        try:
+            self.__execute(self.__commands)
+        except _ComparisonFailure:
+            pass
+        if self.__output_path is not None:
+            with open(self.__output_path, 'w') as output_file:
+                output_file.write("".join(
+                    line + "\n" for line in self.output_lines))
+        return self.failure is None
+
+    def __execute(self, commands: list) -> None:
+        for command in commands:
+            if command[0] == "repeat":
+                self.__repeat(command[1], command[2])
+                continue
+            name, arguments = command[0], command[1:]
+            if name in self.STEP_COMMANDS:
+                self._run(self.STEP_COMMANDS[name])
+            elif name == "set":
+                self._set(arguments[0], _parse_value(arguments[1]))
+            elif name == "output":
+                self.__write("|" + "|".join(
+                    column.value(self._get(column.variable))
+                    for column in self.__columns) + "|")
+            elif name == "output-list":
+                self.__columns = [_Column(column) for column in arguments]
+                self.__write("|" + "|".join(
+                    column.header() for column in self.__columns) + "|")
+            elif name == "load":
+                self._load(self.__file(arguments[0]) if arguments
+                           else self.__directory)
+            elif name == "output-file":
+                self.__output_path = self.__file(arguments[0])
+            elif name == "compare-to":
+                with open(self.__file(arguments[0]), 'r') as compare_file:
+                    self.__compare_lines = compare_file.read().splitlines()
+            elif name not in ("echo", "clear-echo"):
+                raise ValueError(self.path + ": unsupported command " + name)
+
+    def __repeat(self, count: typing.Optional[int], body: list) -> None:
+        if all(command[0] in self.STEP_COMMANDS for command in body):
+            steps = sum(self.STEP_COMMANDS[command[0]] for command in body)
+            self._run(self.__max_steps if count is None else count * steps)
+            return
+        iteration = 0
+        while (count is None and iteration < self.__max_steps) or \
+                (count is not None and iteration < count):
+            self.__execute(body)
+            iteration += 1
+
+    def __file(self, name: str) -> str:
+        return os.path.join(self.__directory, name)
+
+    def __write(self, line: str) -> None:
+        """Writes an output line, and compares it to the compare file."""
+        self.output_lines.append(line)
+        if self.__compare_lines is None:
+            return
+        number = len(self.output_lines)
+        expected = self.__compare_lines[number - 1] \
+            if number <= len(self.__compare_lines) else None
+        if expected is None or not _matches(line, expected):
+            self.failure = "comparison failure at line " + str(number) + \
+                ": expected " + repr(expected) + ", got " + repr(line)
+            raise _ComparisonFailure()
+
+
+class _ComparisonFailure(Exception):
+    """Stops a script at its first mismatching output line."""
+
+
+class _Column:
+    """A column of an output list, such as RAM[0]%D2.6.2."""
+
+    def __init__(self, text: str) -> None:
+        match = _COLUMN_PATTERN.fullmatch(text)
+        if match is None:
+            raise ValueError("invalid output-list column " + text)
+        self.variable = match.group("variable")
+        self.format = match.group("format")
+        self.left = int(match.group("left"))
+        self.width = int(match.group("width"))
+        self.right = int(match.group("right"))
+
+    def header(self) -> str:
+        """The name of the variable, centered in the column."""
+        size = self.left + self.width + self.right
+        name = self.variable[:size]
+        left = (size - len(name)) // 2
+        return " " * left + name + " " * (size - len(name) - left)
+
+    def value(self, value: int) -> str:
+        """The value of the variable, right-aligned in the column."""
+        if self.format == "B":
+            text = format(value & 0xFFFF, "016b")[-self.width:]
+        elif self.format == "X":
+            text = format(value & 0xFFFF, "04X")
+        else:
+            text = str(value)
+        return " " * self.left + text.rjust(self.width)[-self.width:] + \
+            " " * self.right
+
+
+def _parse_value(text: str) -> int:
+    """Parses a value of a script, decimal or with a %B, %X or %D prefix,
+    into a signed 16-bit word.
+    """
+    base = 10
+    if text[:2] in ("%B", "%X", "%D"):
+        base = {"%B": 2, "%X": 16, "%D": 10}[text[:2]]
+        text = text[2:]
+    return ((int(text, base) + 0x8000) & 0xFFFF) - 0x8000
+
+
+def _matches(line: str, expected: str) -> bool:
+    """Compares an output line to a compare line, where "*" matches any
+    character.
+    """
+    line, expected = line.rstrip(), expected.rstrip()
+    return len(line) == len(expected) and all(
+        want == "*" or want == got for got, want in zip(line, expected))
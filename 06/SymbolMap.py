@@ -0,0 +1,158 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import bisect
+import typing
+from SymbolTable import SymbolTable
+
+
+class SymbolMap:
+    """The resolved symbols of an assembled program, as written to a .map
+    file for emulators and profilers.
+
+    A .map file holds one symbol per line: its kind ("L" for a label and its
+    ROM address, "V" for a variable and its RAM address), the address as a
+    5-digit decimal number, and the symbol itself, separated by a single
+    space. The labels come first, then the variables, each sorted by
+    address, so a reader can binary-search either part.
+    """
+
+    EXTENSION = ".map"
+    LISTING_EXTENSION = ".lst"
+
+    def __init__(self, labels: typing.Dict[str, int],
+                 variables: typing.Dict[str, int]) -> None:
+        """Creates a symbol map.
+
+        Args:
+            labels (typing.Dict[str, int]): the labels and their ROM addresses.
+            variables (typing.Dict[str, int]): the variables and their RAM
+                addresses.
+        """
+        self.__labels = sorted(
+            (address, label) for label, address in labels.items())
+        self.__variables = sorted(
+            (address, variable) for variable, address in variables.items())
+        self.__label_addresses = [address for address, _ in self.__labels]
+        self.__variable_addresses = [
+            address for address, _ in self.__variables]
+
+    @staticmethod
+    def from_symbol_table(symbol_table: SymbolTable) -> "SymbolMap":
+        """
+        Args:
+            symbol_table (SymbolTable): the symbol table of an assembled
+                program.
+
+        Returns:
+            SymbolMap: the symbol map of the program.
+        """
+        return SymbolMap(symbol_table.labels(), symbol_table.variables())
+
+    @staticmethod
+    def read(input_file: typing.TextIO) -> "SymbolMap":
+        """Reads a .map file.
+
+        Args:
+            input_file (typing.TextIO): the .map file.
+
+        Returns:
+            SymbolMap: the symbol map the file holds.
+        """
+        labels = dict()
+        variables = dict()
+        for line in input_file:
+            kind, address, symbol = line.rstrip("\n").split(" ", 2)
+            if kind == "L":
+                labels[symbol] = int(address)
+            else:
+                variables[symbol] = int(address)
+        return SymbolMap(labels, variables)
+
+    @property
+    def labels(self) -> typing.List[typing.Tuple[int, str]]:
+        """The (ROM address, label) pairs, sorted by address."""
+        return self.__labels
+
+    @property
+    def variables(self) -> typing.List[typing.Tuple[int, str]]:
+        """The (RAM address, variable) pairs, sorted by address."""
+        return self.__variables
+
+    def label_at(self, address: int) -> typing.Optional[str]:
+        """
+        Args:
+            address (int): a ROM address.
+
+        Returns:
+            typing.Optional[str]: the closest label at or before the address,
+            that is, the label whose code the address belongs to, or None if
+            there is no such label. Of several labels at the same address,
+            the last one in sorted order is returned.
+        """
+        index = bisect.bisect_right(self.__label_addresses, address)
+        if index == 0:
+            return None
+        return self.__labels[index - 1][1]
+
+    def variable_at(self, address: int) -> typing.Optional[str]:
+        """
+        Args:
+            address (int): a RAM address.
+
+        Returns:
+            typing.Optional[str]: the variable allocated at the address, or
+            None if there is none.
+        """
+        index = bisect.bisect_left(self.__variable_addresses, address)
+        if index < len(self.__variables) and \
+                self.__variables[index][0] == address:
+            return self.__variables[index][1]
+        return None
+
+    def write(self, output_file: typing.TextIO) -> None:
+        """Writes the symbol map in the .map format.
+
+        Args:
+            output_file (typing.TextIO): writes the map to this file.
+        """
+        output_file.write(self.to_text())
+
+    def to_text(self) -> str:
+        """
+        Returns:
+            str: the symbol map in the .map format.
+        """
+        return "".join(
+            [kind + " " + format(address, "05d") + " " + symbol + "\n"
+             for kind, pairs in (("L", self.__labels),
+                                 ("V", self.__variables))
+             for address, symbol in pairs])
+
+    @staticmethod
+    def write_listing(output_file: typing.TextIO,
+                      commands: typing.Iterable[str],
+                      words: typing.Sequence[int]) -> None:
+        """Writes a .lst listing: every command of the program next to its ROM
+        address, and for instructions, the word it was assembled to.
+
+        Args:
+            output_file (typing.TextIO): writes the listing to this file.
+            commands (typing.Iterable[str]): the commands of the program,
+                without white space and comments, as the Parser yields them.
+            words (typing.Sequence[int]): the words the program assembled to.
+        """
+        rom_address = 0
+        for command in commands:
+            if command[0] == "(":
+                output_file.write(format(rom_address, "05d") + " " * 18 +
+                                  command + "\n")
+            else:
+                output_file.write(format(rom_address, "05d") + " " +
+                                  format(words[rom_address], "016b") + " " +
+                                  command + "\n")
+                rom_address += 1
@@ -5,6 +5,34 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import sys
+import types
+import typing
+
+
+def _predefined_symbols() -> typing.Mapping[str, int]:
+    """Builds the predefined symbols and their pre-allocated RAM addresses,
+    according to section 6.2.3 of the book. The names are interned, since
+    they are looked up for almost every A-instruction.
+    """
+    predefined = dict()
+    for i in range(16):
+        predefined["R" + str(i)] = i
+
+    predefined["SCREEN"] = 16384
+    predefined["KBD"] = 24576
+    predefined["SP"] = 0
+    predefined["LCL"] = 1
+    predefined["ARG"] = 2
+    predefined["THIS"] = 3
+    predefined["THAT"] = 4
+
+    return types.MappingProxyType(
+        {sys.intern(symbol): address for symbol, address in predefined.items()})
+
+
+# Built once and shared, read-only, by every SymbolTable.
+_PREDEFINED_SYMBOLS = _predefined_symbols()
 
 
 class SymbolTable:
@@ -18,19 +46,14 @@ class SymbolTable:
         and their pre-allocated RAM addresses, according to section 6.2.3 of the
         book.
         """
+        # Only the program's own symbols are stored here, the predefined ones
+        # are looked up in the shared table. An entry added here under a
+        # predefined name shadows it.
         self.__dict = dict()
-        
-        for i in range(16):
-            self.__dict["R" + str(i)] = i
-
-        self.__dict["SCREEN"] = 16384
-        self.__dict["KBD"] = 24576
-        self.__dict["SP"] = 0
-        self.__dict["LCL"] = 1
-        self.__dict["ARG"] = 2 
-        self.__dict["THIS"] = 3
-        self.__dict["THAT"] = 4
 
+        # The symbols allocated as variables, and the next free RAM address.
+        self.__variables = dict()
+        self.__next_variable_address = 16
 
     def add_entry(self, symbol: str, address: int) -> None:
         """Adds the pair (symbol, address) to the table.
@@ -41,6 +64,39 @@ class SymbolTable:
         """
         self.__dict[symbol] = address
 
+    def add_variable(self, symbol: str) -> int:
+        """Allocates the next free RAM address, starting at 16, to the given
+        variable symbol.
+
+        Args:
+            symbol (str): the variable to add.
+
+        Returns:
+            int: the address allocated to the variable.
+        """
+        address = self.__next_variable_address
+        self.__next_variable_address += 1
+        self.__dict[symbol] = address
+        self.__variables[symbol] = address
+        return address
+
+    def labels(self) -> typing.Dict[str, int]:
+        """
+        Returns:
+            typing.Dict[str, int]: the program's labels and their ROM
+            addresses.
+        """
+        return {symbol: address for symbol, address in self.__dict.items()
+                if symbol not in self.__variables}
+
+    def variables(self) -> typing.Dict[str, int]:
+        """
+        Returns:
+            typing.Dict[str, int]: the program's variables and their RAM
+            addresses, in order of allocation.
+        """
+        return dict(self.__variables)
+
     def contains(self, symbol: str) -> bool:
         """Does the symbol table contain the given symbol?
 
@@ -50,7 +106,7 @@ class SymbolTable:
         Returns:
             bool: True if the symbol is contained, False otherwise.
         """
-        return symbol in list(self.__dict.keys())
+        return symbol in self.__dict or symbol in _PREDEFINED_SYMBOLS
 
     def get_address(self, symbol: str) -> int:
         """Returns the address associated with the symbol.
@@ -61,4 +117,7 @@ class SymbolTable:
         Returns:
             int: the address associated with the symbol.
         """
-        return self.__dict[symbol]
+        address = self.__dict.get(symbol)
+        if address is None:
+            return _PREDEFINED_SYMBOLS[symbol]
+        return address
@@ -0,0 +1,402 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+import xml.etree.ElementTree as ElementTree
+from BuildCache import ASSEMBLER_VERSION
+from CPUEmulator import TestScript
+
+
+# The file a script loads, if any.
+_LOAD_PATTERN = re.compile(r"^\s*load\b\s*([^\s,;]*)", re.MULTILINE)
+
+# The outcomes of a test.
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+UNCHANGED = "unchanged"
+
+# The scripts that need tools this suite cannot run, by the extension of
+# the file they load.
+_UNSUPPORTED = {".hdl": "needs the hardware simulator"}
+
+# The scripts of the VM emulator, by the extension of the file they load
+# ("" for a script loading its directory), and what runs them.
+_VM_EXTENSIONS = ("", ".vm")
+_VM_INTERPRETER = os.path.join("08", "VMInterpreter.py")
+
+# The runner of the scripts of both emulators.
+_SCRIPT_RUNNER = os.path.join("06", "ScriptRunner.py")
+
+
+class TestResult(typing.NamedTuple):
+    """The outcome of a test script."""
+
+    path: str
+    outcome: str
+    seconds: float
+    message: str = ""
+
+
+class _Timeout(Exception):
+    """Raised in a worker when its test runs out of time."""
+
+
+def discover(root: str) -> typing.List[str]:
+    """Finds every test script under the given directory.
+
+    Args:
+        root (str): the directory to search.
+
+    Returns:
+        typing.List[str]: the paths of the .tst files, sorted.
+    """
+    scripts = []
+    for directory, directories, filenames in os.walk(root):
+        directories[:] = sorted(name for name in directories
+                                if not name.startswith("."))
+        scripts.extend(os.path.join(directory, filename)
+                       for filename in sorted(filenames)
+                       if filename.lower().endswith(".tst"))
+    return scripts
+
+
+def _loaded_file(script_path: str) -> typing.Optional[str]:
+    """Returns the name of the file the script loads, "" if it loads its
+    directory, or None if it loads nothing.
+    """
+    with open(script_path, 'r') as script_file:
+        source = re.sub(r"//[^\n]*", "", script_file.read())
+    match = _LOAD_PATTERN.search(source)
+    return None if match is None else match.group(1)
+
+
+def _translator(root: str, script_path: str) -> typing.Optional[str]:
+    """Returns the VM translator of the project the script belongs to, if
+    the script tests a translated program.
+    """
+    directory = os.path.dirname(script_path)
+    if not glob.glob(os.path.join(directory, "*.vm")):
+        return None
+    project = os.path.relpath(script_path, root).split(os.sep)[0]
+    translator = os.path.join(root, project, "Main.py")
+    return translator if os.path.exists(translator) else None
+
+
+def _tools(root: str, script_path: str) -> typing.List[str]:
+    """Returns the sources of the tools a script needs besides the
+    assembler: the script runner, the VM translator of a translated program,
+    and the VM interpreter of a VM emulator script.
+    """
+    runner = [os.path.join(root, _SCRIPT_RUNNER)]
+    loaded = _loaded_file(script_path)
+    if loaded is not None and \
+            os.path.splitext(loaded)[1].lower() in _VM_EXTENSIONS:
+        tool = os.path.join(root, _VM_INTERPRETER)
+    else:
+        tool = _translator(root, script_path)
+        if tool is None:
+            return runner
+    return runner + sorted(
+        glob.glob(os.path.join(os.path.dirname(tool), "*.py")))
+
+
+def input_digest(root: str, script_path: str) -> str:
+    """Hashes everything the outcome of a script depends on: the files of
+    its directory, except the outputs, and the tools that build and run it.
+    The files are named by their paths relative to the root, so a copy of
+    the projects elsewhere has the same digests.
+
+    Args:
+        root (str): the root directory of the projects.
+        script_path (str): the test script.
+
+    Returns:
+        str: the digest of the inputs.
+    """
+    digest = hashlib.sha256(ASSEMBLER_VERSION.encode())
+    directory = os.path.dirname(script_path)
+    translator = _translator(root, script_path)
+    tool_paths = _tools(root, script_path)
+    for filename in sorted(os.listdir(directory)):
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == ".out" or (extension == ".asm" and translator):
+            continue  # written by the test, or by the translator
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            tool_paths.append(path)
+    for path in tool_paths:
+        with open(path, 'rb') as input_file:
+            digest.update(os.path.relpath(path, root).replace(
+                os.sep, "/").encode())
+            digest.update(input_file.read())
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def _scratch_copy(script_path: str) -> typing.Iterator[str]:
+    """Copies the files of the directory of a script to a temporary
+    directory of the same name, removed afterwards, so that the outputs of
+    the test and of the translator never touch the tree, and yields the path
+    of the copied script.
+    """
+    directory = os.path.dirname(os.path.abspath(script_path))
+    with tempfile.TemporaryDirectory(prefix="testsuite-") as scratch:
+        copy = os.path.join(scratch, os.path.basename(directory))
+        os.mkdir(copy)
+        for filename in os.listdir(directory):
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                shutil.copy2(path, copy)
+        yield os.path.join(copy, os.path.basename(script_path))
+
+
+def run_test(root: str, script_path: str, timeout: float) -> TestResult:
+    """Runs a test script, translating its VM program first if needed. The
+    test runs in a copy of its directory, see _scratch_copy.
+
+    Args:
+        root (str): the root directory of the projects.
+        script_path (str): the test script.
+        timeout (float): the seconds the test may take, 0 for no limit.
+
+    Returns:
+        TestResult: the outcome of the test.
+    """
+    start = time.perf_counter()
+    loaded = _loaded_file(script_path)
+    if loaded is None:
+        return TestResult(script_path, SKIPPED, 0.0, "loads no program")
+    extension = os.path.splitext(loaded)[1].lower()
+    if extension in _UNSUPPORTED:
+        return TestResult(script_path, SKIPPED, 0.0, _UNSUPPORTED[extension])
+    if extension in _VM_EXTENSIONS:
+        return _run_vm_test(root, script_path, timeout)
+
+    use_alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        translator = _translator(root, script_path)
+        with _scratch_copy(script_path) as copied_script:
+            if translator is not None and extension == ".asm":
+                subprocess.run(
+                    [sys.executable, translator,
+                     os.path.dirname(copied_script)],
+                    check=True, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE, timeout=timeout or None)
+            script = TestScript(copied_script)
+            passed = script.run()
+        outcome, message = (PASSED, "") if passed else \
+            (FAILED, script.failure)
+    except (_Timeout, subprocess.TimeoutExpired):
+        outcome, message = FAILED, "timed out after " + str(timeout) + "s"
+    except subprocess.CalledProcessError as error:
+        outcome, message = FAILED, "translation failed: " + \
+            error.stderr.decode(errors="replace").strip()
+    except (OSError, ValueError) as error:
+        outcome, message = FAILED, str(error)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return TestResult(script_path, outcome, time.perf_counter() - start,
+                      message)
+
+
+def _run_vm_test(root: str, script_path: str, timeout: float) -> TestResult:
+    """Runs a test script of the VM emulator with the VM interpreter."""
+    start = time.perf_counter()
+    interpreter = os.path.join(root, _VM_INTERPRETER)
+    if not os.path.exists(interpreter):
+        return TestResult(script_path, SKIPPED, 0.0, "needs the VM emulator")
+    if not glob.glob(os.path.join(os.path.dirname(script_path), "*.vm")):
+        return TestResult(script_path, SKIPPED, 0.0,
+                          "needs the compiled .vm files")
+    with _scratch_copy(script_path) as copied_script:
+        try:
+            process = subprocess.run(
+                [sys.executable, interpreter, copied_script],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                timeout=timeout or None)
+        except subprocess.TimeoutExpired:
+            return TestResult(script_path, FAILED,
+                              time.perf_counter() - start,
+                              "timed out after " + str(timeout) + "s")
+    output = process.stdout.decode(errors="replace").strip()
+    if process.returncode == 0:
+        return TestResult(script_path, PASSED, time.perf_counter() - start)
+    return TestResult(script_path, FAILED, time.perf_counter() - start,
+                      output.rpartition(copied_script + ": ")[2] or output)
+
+
+def _raise_timeout(signal_number: int, frame: typing.Any) -> None:
+    raise _Timeout()
+
+
+def write_junit(results: typing.Sequence[TestResult], root: str,
+                output_path: str) -> None:
+    """Writes the results as a JUnit XML report.
+
+    Args:
+        results (typing.Sequence[TestResult]): the results of the tests.
+        root (str): the root directory, test names are relative to it.
+        output_path (str): the path of the report.
+    """
+    suite = ElementTree.Element(
+        "testsuite", name="nand2tetris", tests=str(len(results)),
+        failures=str(sum(result.outcome == FAILED for result in results)),
+        skipped=str(sum(result.outcome in (SKIPPED, UNCHANGED)
+                        for result in results)),
+        time=format(sum(result.seconds for result in results), ".3f"))
+    for result in results:
+        relative = os.path.relpath(result.path, root)
+        case = ElementTree.SubElement(
+            suite, "testcase",
+            classname=os.path.dirname(relative).replace(os.sep, "."),
+            name=os.path.basename(relative),
+            time=format(result.seconds, ".3f"))
+        if result.outcome == FAILED:
+            ElementTree.SubElement(case, "failure", message=result.message)
+        elif result.outcome in (SKIPPED, UNCHANGED):
+            ElementTree.SubElement(
+                case, "skipped", message=result.message or result.outcome)
+    suites = ElementTree.Element("testsuites")
+    suites.append(suite)
+    ElementTree.ElementTree(suites).write(
+        output_path, encoding="utf-8", xml_declaration=True)
+
+
+def run_suite(root: str, jobs: typing.Optional[int] = None,
+              timeout: float = 60.0, state_path: typing.Optional[str] = None,
+              run_all: bool = False,
+              report: typing.Callable[[TestResult], None] = lambda _: None) \
+        -> typing.List[TestResult]:
+    """Runs every test script under the root directory in a process pool.
+
+    Args:
+        root (str): the root directory of the projects.
+        jobs (typing.Optional[int]): the number of worker processes, None
+            for one per core.
+        timeout (float): the seconds every test may take, 0 for no limit.
+        state_path (typing.Optional[str]): if given, a JSON file recording
+            the inputs of every test that passed. Tests whose inputs did not
+            change since they passed are not run again, and are reported as
+            unchanged. The file is updated after the run.
+        run_all (bool): run the unchanged tests too, but still update the
+            state file.
+        report (typing.Callable[[TestResult], None]): called with every
+            result as soon as it is known.
+
+    Returns:
+        typing.List[TestResult]: the results, in the order of the scripts.
+    """
+    scripts = discover(root)
+    green = dict()
+    if state_path is not None and os.path.exists(state_path):
+        with open(state_path, 'r') as state_file:
+            green = json.load(state_file)
+    digests = {script: input_digest(root, script) for script in scripts}
+
+    results = dict()
+    to_run = []
+    for script in scripts:
+        key = os.path.relpath(script, root)
+        if not run_all and green.get(key) == digests[script]:
+            results[script] = TestResult(
+                script, UNCHANGED, 0.0, "unchanged since it last passed")
+            report(results[script])
+        else:
+            to_run.append(script)
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs) as executor:
+        futures = {executor.submit(run_test, root, script, timeout): script
+                   for script in to_run}
+        for future in concurrent.futures.as_completed(futures):
+            script = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:
+                result = TestResult(script, FAILED, 0.0, repr(error))
+            results[script] = result
+            report(result)
+
+    if state_path is not None:
+        for script, result in results.items():
+            key = os.path.relpath(script, root)
+            if result.outcome == PASSED:
+                green[key] = digests[script]
+            elif result.outcome == FAILED:
+                green.pop(key, None)
+        with open(state_path, 'w') as state_file:
+            json.dump(green, state_file, indent=1, sort_keys=True)
+    return [results[script] for script in scripts]
+
+
+if "__main__" == __name__:
+    # Runs the test scripts of all the projects, and prints a summary.
+    default_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    argument_parser = argparse.ArgumentParser(
+        prog="TestSuite", description="Runs every test script (.tst) of the "
+                                      "projects in parallel.")
+    argument_parser.add_argument(
+        "root", nargs="?", default=default_root,
+        help="the directory of the projects (default: the repository)")
+    argument_parser.add_argument(
+        "--jobs", "-j", type=int, metavar="N",
+        help="the number of worker processes (default: one per core)")
+    argument_parser.add_argument(
+        "--timeout", type=float, default=60.0, metavar="SECONDS",
+        help="fail a test running longer than this (0 for no limit)")
+    argument_parser.add_argument(
+        "--junit", metavar="FILE", help="also write a JUnit XML report")
+    argument_parser.add_argument(
+        "--state", metavar="FILE",
+        help="skip the tests whose inputs did not change since they passed, "
+             "as recorded in this file (default: .testsuite.json in root)")
+    argument_parser.add_argument(
+        "--all", action="store_true",
+        help="run every test, even the unchanged ones")
+    arguments = argument_parser.parse_args()
+
+    suite_root = os.path.abspath(arguments.root)
+    state = arguments.state or os.path.join(suite_root, ".testsuite.json")
+
+    def print_result(result: TestResult) -> None:
+        print(result.outcome.upper().ljust(9) +
+              os.path.relpath(result.path, suite_root) + "  " +
+              format(result.seconds, ".3f") + "s" +
+              ("  " + result.message if result.message else ""))
+
+    suite_start = time.perf_counter()
+    suite_results = run_suite(
+        suite_root, arguments.jobs or None, arguments.timeout, state,
+        arguments.all, print_result)
+    if arguments.junit is not None:
+        write_junit(suite_results, suite_root, arguments.junit)
+    counts = {outcome: sum(result.outcome == outcome
+                           for result in suite_results)
+              for outcome in (PASSED, FAILED, SKIPPED, UNCHANGED)}
+    print(", ".join(str(count) + " " + outcome
+                    for outcome, count in counts.items()) +
+          " in " + format(time.perf_counter() - suite_start, ".2f") + "s")
+    sys.exit(1 if counts[FAILED] else 0)
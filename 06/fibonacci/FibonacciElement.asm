@@ -0,0 +1,531 @@
+// This file is part of www.nand2tetris.org
+// and the book "The Elements of Computing Systems"
+// by Nisan and Schocken, MIT Press.
+// File name: projects/08/FunctionCalls/FibonacciElement
+
+// The FibonacciElement program of project 08, Main.vm and Sys.vm, with an
+// additional function which nothing calls:
+//     function Main.unused 0
+//     push constant 0
+//     return
+// translated by the VM translator of project 08 into the Hack assembly code
+// shown here. Sys.init leaves the 4th Fibonacci element, 3, in RAM[261].
+
+@256
+D=A
+@SP
+M=D
+@Sys$returnAddress0
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@ARG
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THIS
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THAT
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+D=M
+@5
+D=D-A
+@ARG
+M=D
+@SP
+D=M
+@LCL
+M=D
+@Sys.init
+0;JMP
+(Sys$returnAddress0)
+(Sys.init)
+@4
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@Sys.init$returnAddress1
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@ARG
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THIS
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THAT
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+D=M
+@6
+D=D-A
+@ARG
+M=D
+@SP
+D=M
+@LCL
+M=D
+@Main.fibonacci
+0;JMP
+(Sys.init$returnAddress1)
+(Sys.init$WHILE)
+@Sys.init$WHILE
+0;JMP
+(Main.fibonacci)
+@0
+D=A
+@ARG
+A=M+D
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@2
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+M=M-1
+A=M
+D=M
+@R15
+M=D
+@SP
+M=M-1
+@R15
+D=M
+@YPos_0
+D;JGT
+@SP
+D=M
+@YNegXPos_0
+D;JGT
+@R15
+D=M
+@SP
+A=M
+D=D-M
+@CHECK_0
+0;JMP
+(YNegXPos_0)
+D=1
+@CHECK_0
+0;JMP
+(YPos_0)
+@SP
+A=M
+D=M
+@YPosXPos_0
+D;JGT
+D=-1
+@CHECK_0
+0;JMP
+(YPosXPos_0)
+@R15
+D=M
+@SP
+A=M
+D=M-D
+@CHECK_0
+0;JMP
+(CHECK_0)
+@COND_TRUE_0
+D;JLT
+@SP
+A=M
+M=0
+@FINISH_0
+0;JMP
+(COND_TRUE_0)
+@SP
+A=M
+M=-1
+@FINISH_0
+0;JMP
+(FINISH_0)
+@SP
+M=M+1
+@SP
+AM=M-1
+D=M
+@Main.fibonacci$IF_TRUE
+D;JNE
+@Main.fibonacci$IF_FALSE
+0;JMP
+(Main.fibonacci$IF_TRUE)
+@0
+D=A
+@ARG
+A=M+D
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@R13
+M=D
+@R13
+D=M
+@5
+A=D-A
+D=M
+@R14
+M=D
+@SP
+AM=M-1
+D=M
+@ARG
+A=M
+M=D
+@ARG
+D=M+1
+@SP
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THAT
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THIS
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@ARG
+M=D
+@R13
+A=M-1
+D=M
+@LCL
+M=D
+@R14
+A=M
+0;JMP
+(Main.fibonacci$IF_FALSE)
+@0
+D=A
+@ARG
+A=M+D
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@2
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+M=M-1
+A=M
+D=M
+@SP
+M=M-1
+A=M
+M=M-D
+@SP
+M=M+1
+@Main.fibonacci$returnAddress2
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@ARG
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THIS
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THAT
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+D=M
+@6
+D=D-A
+@ARG
+M=D
+@SP
+D=M
+@LCL
+M=D
+@Main.fibonacci
+0;JMP
+(Main.fibonacci$returnAddress2)
+@0
+D=A
+@ARG
+A=M+D
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@1
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+M=M-1
+A=M
+D=M
+@SP
+M=M-1
+A=M
+M=M-D
+@SP
+M=M+1
+@Main.fibonacci$returnAddress4
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@ARG
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THIS
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@THAT
+D=M
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@SP
+D=M
+@6
+D=D-A
+@ARG
+M=D
+@SP
+D=M
+@LCL
+M=D
+@Main.fibonacci
+0;JMP
+(Main.fibonacci$returnAddress4)
+@SP
+M=M-1
+A=M
+D=M
+@SP
+M=M-1
+A=M
+M=M+D
+@SP
+M=M+1
+@LCL
+D=M
+@R13
+M=D
+@R13
+D=M
+@5
+A=D-A
+D=M
+@R14
+M=D
+@SP
+AM=M-1
+D=M
+@ARG
+A=M
+M=D
+@ARG
+D=M+1
+@SP
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THAT
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THIS
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@ARG
+M=D
+@R13
+A=M-1
+D=M
+@LCL
+M=D
+@R14
+A=M
+0;JMP
+(Main.unused)
+@0
+D=A
+@SP
+A=M
+M=D
+@SP
+M=M+1
+@LCL
+D=M
+@R13
+M=D
+@R13
+D=M
+@5
+A=D-A
+D=M
+@R14
+M=D
+@SP
+AM=M-1
+D=M
+@ARG
+A=M
+M=D
+@ARG
+D=M+1
+@SP
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THAT
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@THIS
+M=D
+@R13
+M=M-1
+A=M
+D=M
+@ARG
+M=D
+@R13
+A=M-1
+D=M
+@LCL
+M=D
+@R14
+A=M
+0;JMP
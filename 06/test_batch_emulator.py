@@ -0,0 +1,69 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import random
+import numpy
+import pytest
+from BatchEmulator import BatchEmulator
+from Code import COMP_WORDS, DEST_BITS, JUMP_BITS
+from Disassembler import read_words
+from Emulator import Emulator
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def _assert_lanes_match(batch: BatchEmulator, programs: list,
+                        inputs: numpy.ndarray, max_steps: int) -> None:
+    """Runs every lane on an Emulator, and compares their states."""
+    for lane in range(batch.lanes):
+        emulator = Emulator(programs[lane % len(programs)])
+        emulator.memory[:] = inputs[lane]
+        steps = emulator.run(max_steps)
+        assert steps == batch.steps[lane]
+        assert (emulator.a, emulator.d, emulator.pc) == \
+            (batch.a[lane], batch.d[lane], batch.pc[lane])
+        assert emulator.halted == batch.halted[lane]
+        assert (emulator.memory == batch.ram[lane]).all()
+
+
+@pytest.mark.parametrize("name", [os.path.join("max", "Max.hack"),
+                                  os.path.join("rect", "Rect.hack"),
+                                  os.path.join("pong", "Pong.hack")])
+def test_lanes_match_emulator(name: str) -> None:
+    words = read_words(os.path.join(_DIRECTORY, name))[0]
+    batch = BatchEmulator([words], 32)
+    generator = numpy.random.default_rng(0)
+    batch.ram[:, 0] = generator.integers(0, 40, batch.lanes)
+    batch.ram[:, 1] = generator.integers(-100, 100, batch.lanes)
+    inputs = batch.ram.copy()
+    batch.run(20000)
+    _assert_lanes_match(batch, [words], inputs, 20000)
+
+
+def test_divergent_programs_match_emulator() -> None:
+    generator = random.Random(1)
+    c_words = [comp | dest | jump for comp in COMP_WORDS.values()
+               for dest in DEST_BITS.values() for jump in JUMP_BITS.values()]
+    programs = [[generator.randrange(300) if generator.random() < 0.4
+                 else generator.choice(c_words) for _ in range(200)]
+                for _ in range(16)]
+    batch = BatchEmulator(programs, 32)
+    batch.ram[:, :300] = numpy.random.default_rng(1).integers(
+        -300, 300, (batch.lanes, 300))
+    inputs = batch.ram.copy()
+    batch.run(2000)
+    _assert_lanes_match(batch, programs, inputs, 2000)
+
+
+def test_halted_lanes_run_their_loop_again() -> None:
+    words = read_words(os.path.join(_DIRECTORY, "max", "Max.hack"))[0]
+    batch = BatchEmulator([words], 2)
+    batch.run()
+    assert batch.halted.all()
+    assert batch.run() == 2
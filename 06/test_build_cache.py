@@ -0,0 +1,59 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import pathlib
+import shutil
+import Main
+from BuildCache import BuildCache
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_hit_after_miss(tmp_path: pathlib.Path) -> None:
+    cache = BuildCache(str(tmp_path / "cache"), 1 << 20)
+    path = tmp_path / "Max.asm"
+    shutil.copy(os.path.join(_DIRECTORY, "max", "Max.asm"), path)
+    assert not Main.assemble_path(str(path), cache=cache)
+    assembled = (tmp_path / "Max.hack").read_text()
+    (tmp_path / "Max.hack").unlink()
+    assert Main.assemble_path(str(path), cache=cache)
+    assert (tmp_path / "Max.hack").read_text() == assembled
+    # other options make other outputs
+    assert not Main.assemble_path(str(path), optimize=True, cache=cache)
+    # and so does another input
+    path.write_text(path.read_text() + "@0\n")
+    assert not Main.assemble_path(str(path), cache=cache)
+
+
+def test_key_depends_on_source_and_options() -> None:
+    key = BuildCache.key(b"@0\n")
+    assert BuildCache.key(b"@0\n") == key
+    assert BuildCache.key(b"@1\n") != key
+    assert BuildCache.key(b"@0\n", (True,)) != key
+
+
+def test_least_recently_used_is_evicted(tmp_path: pathlib.Path) -> None:
+    cache = BuildCache(str(tmp_path / "cache"), 250)
+    keys = [BuildCache.key(bytes([n])) for n in range(3)]
+    output_path = tmp_path / "Program.hack"
+    # two outputs of 100 bytes, the first one used longest ago
+    for age, key in enumerate(keys[:2]):
+        output_path.write_bytes(b"0" * 100)
+        cache.store(key, {".hack": str(output_path)})
+        output_path.unlink()
+        cached_path = tmp_path / "cache" / (key + ".hack")
+        os.utime(cached_path, (1000 + age, 1000 + age))
+    # a third one does not fit
+    output_path.write_bytes(b"0" * 100)
+    cache.store(keys[2], {".hack": str(output_path)})
+    output_path.unlink()
+    assert not cache.fetch(keys[0], {".hack": str(output_path)})
+    for key in keys[1:]:
+        assert cache.fetch(key, {".hack": str(output_path)})
+        assert output_path.read_bytes() == b"0" * 100
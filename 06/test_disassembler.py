@@ -0,0 +1,44 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import io
+import os
+import pathlib
+import shutil
+import pytest
+import Main
+from Code import Code
+from Disassembler import Disassembler, decode_table, read_words
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_every_command_assembles_to_its_word() -> None:
+    for word, command in enumerate(decode_table()):
+        if command is None:
+            assert word & 0x8000  # only C-instructions can be invalid
+        elif command[0] == "@":
+            assert int(command[1:]) == word
+        else:
+            assert Code.c_instruction(command) == word
+
+
+@pytest.mark.parametrize("name", ["add", "max", "rect", "pong", "shift"])
+def test_disassembly_assembles_back(tmp_path: pathlib.Path, name: str) -> None:
+    filename = name.capitalize()
+    source_path = tmp_path / (filename + ".asm")
+    shutil.copy(os.path.join(_DIRECTORY, name, filename + ".asm"),
+                source_path)
+    Main.assemble_path(str(source_path), symbol_map=True)
+    words, symbol_map = read_words(str(tmp_path / (filename + ".hack")))
+    for disassembler in (Disassembler(), Disassembler(symbol_map)):
+        lines = disassembler.disassemble(words)
+        assembled = io.StringIO()
+        Main.assemble_file(io.StringIO("\n".join(lines) + "\n"), assembled)
+        assert [int(line, 2) for line in assembled.getvalue().split()] == \
+            words
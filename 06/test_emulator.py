@@ -0,0 +1,75 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import numpy
+import pytest
+import BlockCompiler
+from Emulator import Emulator
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load(name: str, compiled: bool) -> Emulator:
+    emulator = Emulator.load(os.path.join(_DIRECTORY, name), compiled)
+    emulator.ram[0] = 7  # the inputs of Max, and the height of Rect
+    emulator.ram[1] = 3
+    return emulator
+
+
+@pytest.mark.parametrize("name", [os.path.join("max", "Max.hack"),
+                                  os.path.join("rect", "Rect.hack")])
+def test_compiled_steps_match_interpreter(name: str) -> None:
+    for max_steps in list(range(1, 40)) + [10 ** 6]:
+        interpreted = _load(name, False)
+        compiled = _load(name, True)
+        assert compiled.run(max_steps) == interpreted.run(max_steps)
+        assert (compiled.a, compiled.d, compiled.pc) == \
+            (interpreted.a, interpreted.d, interpreted.pc)
+        assert compiled.halted == interpreted.halted
+        assert (compiled.memory == interpreted.memory).all()
+        # a halted program runs its halting loop once more
+        assert compiled.run(max_steps) == interpreted.run(max_steps)
+
+
+def test_compiled_roms_are_bounded() -> None:
+    # "@n / D=A / (END) / @END / 0;JMP" for as many ROMs as the cache keeps,
+    # and then some
+    programs = [[n, 0xEC10, 2, 0xEA87]
+                for n in range(BlockCompiler.MAX_CACHED_ROMS + 4)]
+    for words in programs:
+        emulator = Emulator(words, compiled=True)
+        emulator.run(10)
+        assert emulator.d == words[0]
+    assert len(BlockCompiler._compiled_roms) <= BlockCompiler.MAX_CACHED_ROMS
+    # the most recent ROMs are kept, and shared by their next emulators
+    cached = set(BlockCompiler._compiled_roms)
+    Emulator(programs[-1], compiled=True)
+    assert set(BlockCompiler._compiled_roms) == cached
+    # the oldest one was evicted
+    Emulator(programs[0], compiled=True)
+    assert set(BlockCompiler._compiled_roms) != cached
+
+
+def test_memory_views_share_the_ram() -> None:
+    emulator = _load(os.path.join("rect", "Rect.hack"), True)
+    assert numpy.shares_memory(
+        emulator.memory, numpy.frombuffer(emulator.ram, numpy.int16))
+    assert numpy.shares_memory(emulator.memory, emulator.screen)
+    # a write through any of them is seen by the others
+    emulator.ram[Emulator.SCREEN + 1] = -1
+    assert emulator.memory[Emulator.SCREEN + 1] == -1
+    assert emulator.screen[1] == -1
+    emulator.screen[1] = 0
+    assert emulator.ram[Emulator.SCREEN + 1] == 0
+    # and so are the writes of the program: Rect draws 7 rows of 16 pixels
+    screen = emulator.screen
+    emulator.run()
+    assert emulator.screen is screen
+    assert list(screen[0:32 * 8:32]) == [-1] * 7 + [0]
+    assert int(screen.sum()) == -7  # and nothing else
@@ -0,0 +1,60 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import io
+import os
+import pathlib
+import subprocess
+import sys
+from Linker import ObjectFile, link
+import Main
+from Parser import Parser
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Two modules calling each other's labels, with shared and own variables.
+_FIRST = ["@i", "M=1", "(LOOP)", "@i", "D=M", "@Second.add", "0;JMP",
+          "(First.back)", "@LOOP", "D;JGT", "(END)", "@END", "0;JMP"]
+_SECOND = ["(Second.add)", "@sum", "M=D+M", "@i", "M=M-1", "@SCREEN",
+           "D=A", "@First.back", "0;JMP"]
+
+
+def _round_trip(commands: list) -> ObjectFile:
+    """Assembles a module, and writes and reads its object file."""
+    object_file = io.StringIO()
+    ObjectFile.assemble(Parser(commands, streaming=True)).write(object_file)
+    object_file.seek(0)
+    return ObjectFile.read(object_file)
+
+
+def test_link_equals_assembling_the_concatenation() -> None:
+    words, symbol_table = link([_round_trip(_FIRST), _round_trip(_SECOND)])
+    expected, expected_table = Main.assemble(_FIRST + _SECOND)
+    assert words == list(expected)
+    for symbol in ("i", "sum", "LOOP", "Second.add", "First.back"):
+        assert symbol_table.get_address(symbol) == \
+            expected_table.get_address(symbol)
+
+
+def test_cli_writes_the_linked_program(tmp_path: pathlib.Path) -> None:
+    object_paths = []
+    for name, commands in (("First", _FIRST), ("Second", _SECOND)):
+        path = tmp_path / (name + ObjectFile.EXTENSION)
+        with open(path, 'w') as object_file:
+            ObjectFile.assemble(Parser(commands, streaming=True)).write(
+                object_file)
+        object_paths.append(str(path))
+    output_path = tmp_path / "Program.hack"
+    subprocess.run([sys.executable, os.path.join(_DIRECTORY, "Linker.py"),
+                    str(output_path)] + object_paths, check=True)
+    assert output_path.read_text() == "".join(
+        format(word, "016b") + "\n"
+        for word in Main.assemble(_FIRST + _SECOND)[0])
+    # no temporary file is left behind
+    assert sorted(os.listdir(tmp_path)) == \
+        ["First.hobj", "Program.hack", "Second.hobj"]
@@ -0,0 +1,41 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import io
+import pathlib
+import pytest
+import Main
+from Linker import ObjectFile
+
+
+def test_object_keeps_external_references(tmp_path: pathlib.Path) -> None:
+    # Other.f is a label of another module, and must not become a variable
+    path = tmp_path / "Module.asm"
+    path.write_text("@END\n0;JMP\n@x\nM=1\n(END)\n@Other.f\nD=A\n@y\nM=D\n"
+                    "@END\n0;JMP\n")
+    Main.assemble_path(str(path), object_file=True, dead_code=True)
+    with open(tmp_path / ("Module" + ObjectFile.EXTENSION), 'r') as input_file:
+        module = ObjectFile.read(input_file)
+    assert [symbol for offset, symbol in module.references] == \
+        ["x", "Other.f", "y"]
+    assert len(module.words) == 10  # the unreachable code is kept
+
+
+@pytest.mark.parametrize("source, first_word", [
+    # a label shadowing a predefined symbol, used before its definition
+    ("@R0\nD=A\n(R0)\n@R0\n0;JMP\n", 2),
+    # forward references, variables, and predefined symbols
+    ("@END\nD;JGT\n@x\nM=D\n@SCREEN\nD=A\n@y\nM=D\n@x\nD=M\n(END)\n"
+     "@END\n0;JMP\n@R1\nM=1\n", 10),
+])
+def test_single_pass_matches_two_passes(source: str, first_word: int) -> None:
+    two_passes = io.StringIO()
+    single_pass = io.StringIO()
+    Main.assemble_file(io.StringIO(source), two_passes)
+    Main.assemble_file_single_pass(io.StringIO(source), single_pass)
+    assert single_pass.getvalue() == two_passes.getvalue()
+    assert two_passes.getvalue().splitlines()[0] == format(first_word, "016b")
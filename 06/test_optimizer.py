@@ -0,0 +1,131 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import typing
+from Emulator import Emulator
+import Main
+from Optimizer import Optimizer
+from Parser import Parser
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# A program repeating an outlinable sequence, whose jumps all target labels.
+_REPEATS = ["@count", "M=1", "(LOOP)"] + [
+    "@x", "M=M+1", "@y", "D=M", "@z", "M=D", "D=D+1", "@w", "M=D"] * 4 + [
+    "@count", "MD=M-1", "@LOOP", "D;JGE", "(END)", "@END", "0;JMP"]
+
+
+def _program(name: str) -> typing.List[str]:
+    with open(os.path.join(_DIRECTORY, name), 'r') as input_file:
+        return list(Main._commands(Parser(input_file)))
+
+
+# A program of the VM translator of project 08, with calls and returns.
+_FIBONACCI = os.path.join("fibonacci", "FibonacciElement.asm")
+
+
+def _run(commands: typing.List[str], steps: int) -> Emulator:
+    emulator = Emulator(Main.assemble(commands)[0])
+    emulator.run(steps)
+    return emulator
+
+
+def test_outline_shrinks_pong() -> None:
+    commands = _program(os.path.join("pong", "Pong.asm"))
+    optimizer = Optimizer(commands)
+    saved, calls = optimizer.outline()
+    assert saved > 0 and calls > 0
+    assert len(Main.assemble(optimizer.commands)[0]) == \
+        len(Main.assemble(commands)[0]) - saved
+
+
+def test_outline_keeps_translated_behavior() -> None:
+    commands = _program(_FIBONACCI)
+    optimizer = Optimizer(commands)
+    saved, calls = optimizer.outline()
+    assert saved > 0 and calls > 0
+    expected = _run(commands, 10 ** 6)
+    outlined = _run(optimizer.commands, 10 ** 6)
+    assert expected.halted and outlined.halted
+    assert (outlined.ram[0], outlined.ram[261]) == \
+        (expected.ram[0], expected.ram[261]) == (262, 3)
+
+
+def test_outline_leaves_computed_numeric_jumps() -> None:
+    # jumps back to the numeric address of (LOOP), through D
+    commands = _REPEATS[:-5] + ["@END", "D;JLT", "@2", "D=A", "A=D",
+                                "0;JMP"] + _REPEATS[-3:]
+    optimizer = Optimizer(commands)
+    assert optimizer.outline() == (0, 0)
+    assert optimizer.commands == commands
+
+
+def test_outline_keeps_behavior() -> None:
+    optimizer = Optimizer(_REPEATS)
+    saved, calls = optimizer.outline()
+    assert saved > 0 and calls > 0
+    expected = _run(_REPEATS, 10 ** 4)
+    outlined = _run(optimizer.commands, 10 ** 4)
+    assert expected.halted and outlined.halted
+    # the registers and the variables count, x, y, z and w
+    assert (expected.memory[:21] == outlined.memory[:21]).all()
+
+
+def test_peephole_keeps_translated_behavior() -> None:
+    commands = _program(_FIBONACCI)
+    optimizer = Optimizer(commands)
+    assert optimizer.peephole() > 0
+    optimized = _run(optimizer.commands, 10 ** 6)
+    assert optimized.halted
+    assert (optimized.ram[0], optimized.ram[261]) == (262, 3)
+
+
+def test_peephole_labels_numeric_jumps() -> None:
+    optimizer = Optimizer(["@R1", "@y", "M=1", "@0", "0;JMP"])
+    assert optimizer.peephole() == 1
+    assert optimizer.commands == ["(ROM$0)", "@y", "M=1", "@ROM$0", "0;JMP"]
+
+
+def test_peephole_leaves_computed_numeric_jumps() -> None:
+    # jumps to the numeric address of (TARGET), through D
+    commands = ["@5", "D=A", "A=D", "0;JMP", "@x", "(TARGET)", "@y", "M=1",
+                "(END)", "@END", "0;JMP"]
+    optimizer = Optimizer(commands)
+    assert optimizer.peephole() == 0
+    assert optimizer.commands == commands
+
+
+def test_peephole_keeps_variable_addresses() -> None:
+    commands = ["@a", "@b", "M=1", "@a", "M=0"]
+    symbols = Main.assemble(commands, optimize=True)[1]
+    assert symbols.get_address("a") == 16
+    assert symbols.get_address("b") == 17
+
+
+def test_dead_code_leaves_computed_jumps() -> None:
+    # jumps to the numeric address of (TARGET), through D
+    commands = ["@6", "D=A", "@END", "D;JLT", "A=D", "0;JMP", "(TARGET)",
+                "@x", "M=1", "(END)", "@END", "0;JMP", "@unreachable",
+                "M=0"]
+    optimizer = Optimizer(commands)
+    assert optimizer.eliminate_dead_code() == 0
+    assert optimizer.commands == commands
+
+
+def test_dead_code_removes_uncalled_functions() -> None:
+    commands = _program(_FIBONACCI)
+    optimizer = Optimizer(commands)
+    assert optimizer.eliminate_dead_code() > 0
+    assert "(Main.unused)" not in optimizer.commands
+    # the same instructions run, only the unreachable ones are gone
+    expected = Emulator(Main.assemble(commands)[0])
+    optimized = Emulator(Main.assemble(optimizer.commands)[0])
+    assert optimized.run() == expected.run()
+    assert optimized.halted
+    assert (optimized.ram[0], optimized.ram[261]) == (262, 3)
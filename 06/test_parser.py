@@ -0,0 +1,49 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import pathlib
+import tracemalloc
+from Parser import Parser, _decode_text
+
+
+def test_streaming_memory_is_bounded(tmp_path: pathlib.Path) -> None:
+    # 2.5MB of distinct lines, which a parser holding them would keep
+    path = tmp_path / "Large.asm"
+    with open(path, 'w') as output_file:
+        for index in range(100000):
+            output_file.write("@variable" + str(index) + "  // line " +
+                              str(index) + "\n" + "M=M+1\n")
+    with open(path, 'r') as input_file:
+        tracemalloc.start()
+        try:
+            parser = Parser(input_file, streaming=True)
+            count = 0
+            while parser.has_more_commands():
+                parser.advance()
+                count += 1
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    assert count == 200000
+    assert peak < 1 << 20
+
+
+def test_comments_and_spaces_share_a_record() -> None:
+    _decode_text.cache_clear()
+    parser = Parser(["@SP  // the stack", "@ SP", "D=M  "], streaming=True)
+    texts = []
+    while parser.has_more_commands():
+        parser.advance()
+        texts.append(parser.command())
+    assert texts == ["@SP", "@SP", "D=M"]
+    # the second "@SP" was not decoded again, but shares the first record
+    info = _decode_text.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+    first = _decode_text("@SP")
+    second = _decode_text("@SP")
+    assert first is second
+    assert _decode_text.cache_info().hits == 3
@@ -0,0 +1,39 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+from BlockCompiler import MAX_BLOCK_SIZE
+from Emulator import Emulator
+from Profiler import Profiler
+from SymbolMap import SymbolMap
+
+
+_JUMP = 0xEA87  # 0;JMP
+_NOTHING = 0xEA80  # 0, with no destination and no jump
+
+
+def _calls(words: list, labels: dict, max_steps: int) -> dict:
+    profiler = Profiler(Emulator(words, compiled=True),
+                        SymbolMap(labels, dict()))
+    profiler.run(max_steps)
+    return {name: calls
+            for name, calls, _, _ in profiler.function_report()}
+
+
+def test_jump_alone_after_a_jump_is_not_a_call() -> None:
+    # "@Main.f / (Main.f) 0;JMP": the call runs once, and then the jump at
+    # Main.f, a block of its own, loops with the word of the call before it
+    assert _calls([1, _JUMP], {"Main.f": 1}, 10) == {"<root>": 0, "Main.f": 1}
+
+
+def test_jump_alone_after_a_full_block_is_a_call() -> None:
+    # the call "@Main.f / 0;JMP" split by the end of a full block, into
+    # "(Main.f) 0 / (END) @END / 0;JMP"
+    function = MAX_BLOCK_SIZE + 1
+    words = [_NOTHING] * (MAX_BLOCK_SIZE - 1) + \
+        [function, _JUMP, _NOTHING, function + 1, _JUMP]
+    assert _calls(words, {"Main.f": function}, 1000) == \
+        {"<root>": 0, "Main.f": 1}
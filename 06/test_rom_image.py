@@ -0,0 +1,45 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import pathlib
+import shutil
+import pytest
+import Main
+from RomImage import RomImage
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.mark.parametrize("symbol_map", [b"", b"L 00002 LOOP\n"])
+def test_image_round_trip(tmp_path: pathlib.Path, symbol_map: bytes) -> None:
+    words = [0, 1, 0x7FFF, 0x8000, 0xFFFF, 0xEA87]
+    path = tmp_path / ("Program" + RomImage.EXTENSION)
+    with open(path, 'wb') as output_file:
+        RomImage.write(output_file, words, symbol_map)
+    assert os.path.getsize(path) == 16 + 2 * len(words) + len(symbol_map)
+    with RomImage(str(path)) as image:
+        assert image.words.tolist() == words
+        assert bytes(image.symbol_map) == symbol_map
+
+
+def test_packed_matches_hack(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "Max.asm"
+    shutil.copy(os.path.join(_DIRECTORY, "max", "Max.asm"), path)
+    Main.assemble_path(str(path), packed=True)
+    with open(tmp_path / "Max.hack", 'r') as hack_file:
+        words = [int(line, 2) for line in hack_file]
+    with RomImage(str(tmp_path / ("Max" + RomImage.EXTENSION))) as image:
+        assert image.words.tolist() == words
+
+
+def test_other_files_are_rejected(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "Max.hack"
+    path.write_text("0000000000000010\n" * 8)
+    with pytest.raises(ValueError):
+        RomImage(str(path))
@@ -0,0 +1,65 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import pathlib
+import pytest
+from ScriptRunner import ScriptRunner
+
+
+class _Registers(ScriptRunner):
+    """A machine of named registers, whose steps increment the counter."""
+
+    STEP_COMMANDS = {"step": 1}
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path, 10)
+        self.registers = {"counter": 0}
+
+    def _load(self, path: str) -> None:
+        self.registers["counter"] = 0
+
+    def _run(self, steps: int) -> None:
+        self.registers["counter"] += steps
+
+    def _set(self, variable: str, value: int) -> None:
+        self.registers[variable] = value
+
+    def _get(self, variable: str) -> int:
+        if variable not in self.registers:
+            raise self._unknown_variable(variable)
+        return self.registers[variable]
+
+
+def test_hooks_are_abstract(tmp_path: pathlib.Path) -> None:
+    class Incomplete(ScriptRunner):
+        def _load(self, path: str) -> None:
+            pass
+
+    script = tmp_path / "Empty.tst"
+    script.write_text("")
+    with pytest.raises(TypeError):
+        Incomplete(str(script), 10)
+
+
+def test_compares_every_output_line(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "Count.cmp").write_text(
+        "|counter|\n|     3 |\n|    -2 |\n")
+    script = tmp_path / "Count.tst"
+    script.write_text(
+        "load, output-file Count.out, compare-to Count.cmp,\n"
+        "output-list counter%D1.5.1;\n"
+        "repeat 3 { step; } output;\n"
+        "set counter %XFFFE, output;\n")
+    runner = _Registers(str(script))
+    assert runner.run()
+    assert (tmp_path / "Count.out").read_text().splitlines() == \
+        ["|counter|", "|     3 |", "|    -2 |"]
+
+    (tmp_path / "Count.cmp").write_text("|counter|\n|     4 |\n")
+    runner = _Registers(str(script))
+    assert not runner.run()
+    assert "line 2" in runner.failure
@@ -0,0 +1,46 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import io
+import pathlib
+import Main
+from SymbolMap import SymbolMap
+
+
+def test_map_and_listing(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "Loop.asm"
+    path.write_text("// counts forever\n@i\nM=1\n(LOOP)\n@LOOP\n0;JMP\n")
+    Main.assemble_path(str(path), symbol_map=True)
+    assert (tmp_path / ("Loop" + SymbolMap.EXTENSION)).read_text() == \
+        "L 00002 LOOP\nV 00016 i\n"
+    assert (tmp_path / ("Loop" + SymbolMap.LISTING_EXTENSION)).read_text() \
+        == ("00000 0000000000010000 @i\n"
+            "00001 1110111111001000 M=1\n"
+            "00002                  (LOOP)\n"
+            "00002 0000000000000010 @LOOP\n"
+            "00003 1110101010000111 0;JMP\n")
+
+
+def test_read_round_trip() -> None:
+    symbol_map = SymbolMap({"LOOP": 2, "END": 7, "Main.main": 2},
+                           {"i": 16, "sum": 17})
+    text = symbol_map.to_text()
+    assert text == "L 00002 LOOP\nL 00002 Main.main\nL 00007 END\n" \
+                   "V 00016 i\nV 00017 sum\n"
+    read = SymbolMap.read(io.StringIO(text))
+    assert read.labels == symbol_map.labels
+    assert read.variables == symbol_map.variables
+
+
+def test_lookups() -> None:
+    symbol_map = SymbolMap({"LOOP": 2, "END": 7}, {"i": 16})
+    assert symbol_map.label_at(1) is None
+    assert symbol_map.label_at(2) == "LOOP"
+    assert symbol_map.label_at(6) == "LOOP"
+    assert symbol_map.label_at(100) == "END"
+    assert symbol_map.variable_at(16) == "i"
+    assert symbol_map.variable_at(17) is None
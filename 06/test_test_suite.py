@@ -0,0 +1,31 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import pathlib
+import shutil
+from TestSuite import input_digest
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A test of project 8, whose digest covers its translator and the runner.
+_SCRIPT = os.path.join("08", "FunctionCalls", "FibonacciElement",
+                       "FibonacciElement.tst")
+
+
+def test_digest_does_not_depend_on_the_root(tmp_path: pathlib.Path) -> None:
+    copy = tmp_path / "nand2tetris"
+    for project in ("06", "08"):
+        shutil.copytree(os.path.join(_ROOT, project), copy / project,
+                        symlinks=True)
+    assert input_digest(str(copy), str(copy / _SCRIPT)) == \
+        input_digest(_ROOT, os.path.join(_ROOT, _SCRIPT))
+    # but it does depend on the files
+    (copy / _SCRIPT).write_text("output;\n")
+    assert input_digest(str(copy), str(copy / _SCRIPT)) != \
+        input_digest(_ROOT, os.path.join(_ROOT, _SCRIPT))
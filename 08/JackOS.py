@@ -0,0 +1,290 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import array
+import math
+import typing
+
+
+# The heap, as the Jack OS lays out the RAM.
+HEAP_BASE = 2048
+HEAP_END = 16384
+
+# The error codes of Sys.error, as the Jack OS defines them.
+ARRAY_SIZE_NOT_POSITIVE = 2
+DIVIDE_BY_ZERO = 3
+SQRT_OF_NEGATIVE = 4
+ALLOC_SIZE_NOT_POSITIVE = 5
+STRING_LENGTH_NEGATIVE = 14
+STRING_INDEX_OUT_OF_BOUNDS = 15
+STRING_SET_INDEX_OUT_OF_BOUNDS = 16
+STRING_FULL = 17
+STRING_EMPTY = 18
+STRING_TOO_SHORT = 19
+WAIT_DURATION_NEGATIVE = 1
+
+
+def _wrap(value: int) -> int:
+    """Truncates a value to a signed 16-bit word."""
+    return ((value + 0x8000) & 0xFFFF) - 0x8000
+
+
+class Halt(Exception):
+    """Raised by Sys.halt and Sys.error, to stop the program."""
+
+    def __init__(self, error: typing.Optional[int] = None) -> None:
+        """
+        Args:
+            error (typing.Optional[int]): the error code of Sys.error, or
+                None for Sys.halt.
+        """
+        super().__init__("ERR" + str(error) if error is not None else "halt")
+        self.error = error
+
+
+class JackOS:
+    """Native implementations of the Jack OS classes Math, Memory, Array
+    and String, and of Sys.halt, Sys.wait and Sys.error, for the VM
+    interpreter.
+
+    Every class is implemented as a whole, since its functions share state,
+    and as the Jack OS implements it, so their memory effects are those of
+    the OS: objects are allocated on the heap by the same algorithm, and
+    have the same fields. The heap is laid out as 12/Memory.jack lays it
+    out: a list of free segments, each holding its length, in words, and
+    the address of the next free segment in its first two words. Memory.alloc
+    carves the block it returns from the end of the first segment longer
+    than the block, or takes the whole segment if the rest would be too
+    short to be a segment, and writes the length of the block plus one
+    right before it (block[-1] = size + 1). It returns -1 if no segment is
+    long enough. Memory.deAlloc returns the block, as the segment starting
+    at o - 1, to the head of the list. The heap is initialized by
+    Memory.init, or by the first allocation if the program did not call
+    it. A String has the fields
+    chars (an Array of maxLength words, or null), length and maxLength, in
+    this order.
+
+    The arguments of a function are its parameters, "this" first for a
+    method, and its result is returned. A void function returns 0, as its
+    Jack implementation would.
+    """
+
+    def __init__(self, ram: array.array) -> None:
+        """
+        Args:
+            ram (array.array): the RAM of the interpreter.
+        """
+        self.__ram = ram
+        self.__free_list = None  # until the heap is initialized
+
+    def functions(self) -> typing.Dict[str, typing.Callable[..., int]]:
+        """
+        Returns:
+            typing.Dict[str, typing.Callable[..., int]]: the native functions,
+            by their VM names.
+        """
+        return {
+            "Math.init": self.math_init,
+            "Math.abs": self.math_abs,
+            "Math.multiply": self.math_multiply,
+            "Math.divide": self.math_divide,
+            "Math.sqrt": self.math_sqrt,
+            "Math.max": self.math_max,
+            "Math.min": self.math_min,
+            "Memory.init": self.memory_init,
+            "Memory.peek": self.memory_peek,
+            "Memory.poke": self.memory_poke,
+            "Memory.alloc": self.memory_alloc,
+            "Memory.deAlloc": self.memory_de_alloc,
+            "Memory.max": self.memory_max,
+            "Array.new": self.array_new,
+            "Array.dispose": self.memory_de_alloc,
+            "String.new": self.string_new,
+            "String.dispose": self.string_dispose,
+            "String.length": self.string_length,
+            "String.charAt": self.string_char_at,
+            "String.setCharAt": self.string_set_char_at,
+            "String.appendChar": self.string_append_char,
+            "String.eraseLastChar": self.string_erase_last_char,
+            "String.intValue": self.string_int_value,
+            "String.setInt": self.string_set_int,
+            "String.newLine": lambda: 128,
+            "String.backSpace": lambda: 129,
+            "String.doubleQuote": lambda: 34,
+            "Sys.halt": self.sys_halt,
+            "Sys.error": self.sys_error,
+            "Sys.wait": self.sys_wait,
+        }
+
+    # Math
+
+    def math_init(self) -> int:
+        return 0
+
+    def math_abs(self, x: int) -> int:
+        return _wrap(abs(x))
+
+    def math_multiply(self, x: int, y: int) -> int:
+        return _wrap(x * y)
+
+    def math_divide(self, x: int, y: int) -> int:
+        if y == 0:
+            raise Halt(DIVIDE_BY_ZERO)
+        quotient = abs(x) // abs(y)  # rounded towards zero
+        return _wrap(quotient if (x < 0) == (y < 0) else -quotient)
+
+    def math_sqrt(self, x: int) -> int:
+        if x < 0:
+            raise Halt(SQRT_OF_NEGATIVE)
+        return math.isqrt(x)
+
+    def math_max(self, a: int, b: int) -> int:
+        return max(a, b)
+
+    def math_min(self, a: int, b: int) -> int:
+        return min(a, b)
+
+    # Memory
+
+    def memory_init(self) -> int:
+        self.__free_list = HEAP_BASE
+        self.__ram[HEAP_BASE] = HEAP_END - HEAP_BASE  # the length
+        self.__ram[HEAP_BASE + 1] = 0  # the next segment
+        return 0
+
+    def memory_peek(self, address: int) -> int:
+        return self.__ram[address]
+
+    def memory_poke(self, address: int, value: int) -> int:
+        self.__ram[address] = value
+        return 0
+
+    def memory_alloc(self, size: int) -> int:
+        if size <= 0:
+            raise Halt(ALLOC_SIZE_NOT_POSITIVE)
+        if self.__free_list is None:
+            self.memory_init()
+        ram = self.__ram
+        previous = None
+        segment = self.__free_list
+        while segment and ram[segment] <= size:
+            previous, segment = segment, ram[segment + 1]
+        if not segment:
+            return -1
+        if ram[segment] - (size + 1) >= 2:
+            # carve the block from the end of the segment
+            ram[segment] -= size + 1
+            block = segment + ram[segment] + 1
+            ram[block - 1] = size + 1
+            return block
+        # the rest would be too short for a segment, take all of it
+        if previous is None:
+            self.__free_list = ram[segment + 1]
+        else:
+            ram[previous + 1] = ram[segment + 1]
+        return segment + 1
+
+    def memory_de_alloc(self, o: int) -> int:
+        if self.__free_list is None:
+            self.memory_init()
+        segment = o - 1
+        self.__ram[segment + 1] = self.__free_list
+        self.__free_list = segment
+        return 0
+
+    def memory_max(self, o: int) -> int:
+        # the length of a block is in the word right before it
+        elements = self.__ram[o:o + self.__ram[o - 1] - 1]
+        return max(elements) if elements else 0
+
+    # Array
+
+    def array_new(self, size: int) -> int:
+        if size <= 0:
+            raise Halt(ARRAY_SIZE_NOT_POSITIVE)
+        return self.memory_alloc(size)
+
+    # String: this[0] is chars, this[1] is length and this[2] is maxLength.
+
+    def string_new(self, max_length: int) -> int:
+        if max_length < 0:
+            raise Halt(STRING_LENGTH_NEGATIVE)
+        this = self.memory_alloc(3)
+        self.__ram[this] = self.memory_alloc(max_length) if max_length else 0
+        self.__ram[this + 1] = 0
+        self.__ram[this + 2] = max_length
+        return this
+
+    def string_dispose(self, this: int) -> int:
+        if self.__ram[this]:
+            self.memory_de_alloc(self.__ram[this])
+        return self.memory_de_alloc(this)
+
+    def string_length(self, this: int) -> int:
+        return self.__ram[this + 1]
+
+    def string_char_at(self, this: int, j: int) -> int:
+        if not 0 <= j < self.__ram[this + 1]:
+            raise Halt(STRING_INDEX_OUT_OF_BOUNDS)
+        return self.__ram[self.__ram[this] + j]
+
+    def string_set_char_at(self, this: int, j: int, c: int) -> int:
+        if not 0 <= j < self.__ram[this + 1]:
+            raise Halt(STRING_SET_INDEX_OUT_OF_BOUNDS)
+        self.__ram[self.__ram[this] + j] = c
+        return 0
+
+    def string_append_char(self, this: int, c: int) -> int:
+        ram = self.__ram
+        length = ram[this + 1]
+        if length >= ram[this + 2]:
+            raise Halt(STRING_FULL)
+        ram[ram[this] + length] = c
+        ram[this + 1] = length + 1
+        return this
+
+    def string_erase_last_char(self, this: int) -> int:
+        if self.__ram[this + 1] == 0:
+            raise Halt(STRING_EMPTY)
+        self.__ram[this + 1] -= 1
+        return 0
+
+    def string_int_value(self, this: int) -> int:
+        ram = self.__ram
+        chars, length = ram[this], ram[this + 1]
+        negative = length > 0 and ram[chars] == ord("-")
+        value = 0
+        for j in range(1 if negative else 0, length):
+            digit = ram[chars + j] - ord("0")
+            if not 0 <= digit <= 9:
+                break
+            value = _wrap(value * 10 + digit)
+        return _wrap(-value) if negative else value
+
+    def string_set_int(self, this: int, value: int) -> int:
+        ram = self.__ram
+        text = str(value)
+        if len(text) > ram[this + 2]:
+            raise Halt(STRING_TOO_SHORT)
+        chars = ram[this]
+        for j, character in enumerate(text):
+            ram[chars + j] = ord(character)
+        ram[this + 1] = len(text)
+        return 0
+
+    # Sys
+
+    def sys_halt(self) -> int:
+        raise Halt()
+
+    def sys_error(self, error_code: int) -> int:
+        raise Halt(error_code)
+
+    def sys_wait(self, duration: int) -> int:
+        if duration < 0:
+            raise Halt(WAIT_DURATION_NEGATIVE)
+        return 0
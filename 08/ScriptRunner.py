@@ -0,0 +1 @@
+../06/ScriptRunner.py
\ No newline at end of file
@@ -0,0 +1,515 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import array
+import io
+import os
+import re
+import sys
+import time
+import typing
+from JackOS import JackOS, Halt
+from Parser import Parser
+from ScriptRunner import ScriptRunner
+
+
+# The opcodes of the resolved commands, and the operands they use.
+PUSH_CONSTANT = 0    # value
+PUSH_SEGMENT = 1     # base register, index: local, argument, this, that
+PUSH_ADDRESS = 2     # address: temp, pointer, static
+POP_SEGMENT = 3      # base register, index
+POP_ADDRESS = 4      # address
+ADD = 5
+SUB = 6
+NEG = 7
+EQ = 8
+GT = 9
+LT = 10
+AND = 11
+OR = 12
+NOT = 13
+SHIFT_LEFT = 14
+SHIFT_RIGHT = 15
+GOTO = 16            # target
+IF_GOTO = 17         # target
+FUNCTION = 18        # number of local variables, name
+CALL = 19            # target or None, number of arguments, name
+RETURN = 20
+END = 21             # the end of the program
+NATIVE = 22          # native function, number of arguments, name
+
+_ARITHMETIC = {"add": ADD, "sub": SUB, "neg": NEG, "eq": EQ, "gt": GT,
+               "lt": LT, "and": AND, "or": OR, "not": NOT,
+               "shiftleft": SHIFT_LEFT, "shiftright": SHIFT_RIGHT}
+
+# The registers holding the bases of the segments, as in CodeWriter.
+_SEGMENT_REGISTERS = {"local": 1, "argument": 2, "this": 3, "that": 4}
+
+# The RAM addresses of the fixed segments.
+_TEMP = 5
+_POINTER = 3
+_STATIC = 16
+_STATIC_END = 256
+
+# The Sys.init of a program without one, when the OS is native: it
+# initializes the OS classes that have an init and are native, as Sys.init
+# of the Jack OS does, and runs Main.main.
+_NATIVE_SYS_INIT = """
+function Sys.init 0
+call Memory.init 0
+pop temp 0
+call Math.init 0
+pop temp 0
+call Main.main 0
+pop temp 0
+call Sys.halt 0
+"""
+
+
+def _wrap(value: int) -> int:
+    """Truncates a value to a signed 16-bit word."""
+    return ((value + 0x8000) & 0xFFFF) - 0x8000
+
+
+class VMInterpreter:
+    """Runs VM programs directly, without translating them to assembly.
+
+    The commands of all the files are resolved once, when loaded: labels
+    and functions into the indices of the commands they name, segments into
+    the RAM addresses or base registers they use, and the whole program
+    into a list of (opcode, operand, operand, name) tuples.
+    Labels are not commands, so jumping to one continues at the command
+    following it.
+
+    The memory is a RAM of 32K signed words, array('h'), laid out as the
+    translated program lays it out, including the stack at SP, so the
+    memory effects of every command are those of its translation by
+    CodeWriter: the frames of calls, temp at RAM[5..12], and static i of
+    Xxx.vm at the address the assembler allocates to "Xxx.i", in the order
+    of the first use of each variable. The return address a call pushes is
+    the index of the command following it, instead of a ROM address.
+
+    By default, the functions of JackOS (the classes Math, Memory, Array and
+    String, and Sys.halt, Sys.wait and Sys.error) run natively, whether the
+    program has their .vm files or not, as the VM emulator runs its builtin
+    OS: a call to one of them pops its arguments and pushes its result in a
+    single step, without a frame. Their effects on the heap and on the
+    objects they return are those of the Jack OS, see JackOS. Sys.halt and
+    Sys.error halt the program, and the code of Sys.error is kept in error.
+    A program with Main.main and without Sys.init, such as the compiled
+    classes of a Jack program without the OS, starts with SP at 256, at a
+    Sys.init that initializes the native OS, runs Main.main and halts.
+    """
+
+    RAM_SIZE = 1 << 15
+
+    def __init__(self, files: typing.Iterable[typing.Tuple[str, Parser]],
+                 native_os: bool = True) -> None:
+        """Loads a program.
+
+        Args:
+            files (typing.Iterable[typing.Tuple[str, Parser]]): the name of
+                every .vm file of the program, without its extension, and a
+                parser of the file, in the order of translation.
+            native_os (bool): run the functions of JackOS natively, instead of
+                the functions of the program's .vm files.
+        """
+        self.ram = array.array('h', bytes(2 * VMInterpreter.RAM_SIZE))
+        natives = JackOS(self.ram).functions() if native_os else dict()
+        commands = []
+        labels = dict()  # scoped label -> command index
+        self.functions = dict()  # function name -> command index
+        self.__statics = dict()  # "Xxx.i" -> RAM address
+        for file_name, parser in files:
+            self.__read(file_name, parser, commands, labels)
+        if native_os and "Main.main" in self.functions and \
+                "Sys.init" not in self.functions:
+            self.__read("Sys", Parser(io.StringIO(_NATIVE_SYS_INIT)),
+                        commands, labels)
+            self.ram[0] = 256
+        if len(commands) > 0xFFFF:
+            raise ValueError("the program has more than 65535 commands")
+
+        for index, command in enumerate(commands):
+            if command[0] in (GOTO, IF_GOTO):
+                if command[1] not in labels:
+                    raise ValueError("undefined label " + command[1])
+                commands[index] = (command[0], labels[command[1]], None, None)
+            elif command[0] == CALL and command[1] in natives:
+                commands[index] = (NATIVE, natives[command[1]], command[2],
+                                   command[3])
+            elif command[0] == CALL:
+                commands[index] = (CALL, self.functions.get(command[1]),
+                                   command[2], command[3])
+        self.commands = commands
+        self.__program = commands + [(END, None, None, None)]
+        self.reset()
+
+    def __read(self, file_name: str, parser: Parser, commands: list,
+               labels: typing.Dict[str, int]) -> None:
+        """Appends the commands of a file to the program, with the labels of
+        the calls and jumps still unresolved.
+        """
+        scope = file_name  # labels are scoped as CodeWriter scopes them
+        while parser.has_more_commands():
+            parser.advance()
+            command_type = parser.command_type()
+            if command_type == "C_ARITHMETIC":
+                commands.append(
+                    (_ARITHMETIC[parser.arg1()], None, None, None))
+            elif command_type in ("C_PUSH", "C_POP"):
+                commands.append(self.__push_pop(
+                    command_type, parser.arg1(), int(parser.arg2()),
+                    file_name))
+            elif command_type == "C_LABEL":
+                labels[scope + "$" + parser.arg1()] = len(commands)
+            elif command_type in ("C_GOTO", "C_IF"):
+                commands.append((GOTO if command_type == "C_GOTO"
+                                 else IF_GOTO,
+                                 scope + "$" + parser.arg1(), None, None))
+            elif command_type == "C_FUNCTION":
+                scope = parser.arg1()
+                self.functions[scope] = len(commands)
+                commands.append((FUNCTION, int(parser.arg2()), None, scope))
+            elif command_type == "C_CALL":
+                commands.append((CALL, parser.arg1(), int(parser.arg2()),
+                                 parser.arg1()))
+            else:
+                commands.append((RETURN, None, None, None))
+
+    def __push_pop(self, command_type: str, segment: str, index: int,
+                   file_name: str) -> tuple:
+        """Resolves a push or pop command."""
+        push = command_type == "C_PUSH"
+        if segment == "constant":
+            if not push:
+                raise ValueError("cannot pop to the constant segment")
+            return PUSH_CONSTANT, _wrap(index), None, None
+        if segment in _SEGMENT_REGISTERS:
+            return PUSH_SEGMENT if push else POP_SEGMENT, \
+                _SEGMENT_REGISTERS[segment], index, None
+        if segment == "temp":
+            address = _TEMP + index
+        elif segment == "pointer":
+            address = _POINTER + (1 if index else 0)
+        elif segment == "static":
+            variable = file_name + "." + str(index)
+            address = self.__statics.get(variable)
+            if address is None:
+                address = self.__statics[variable] = \
+                    _STATIC + len(self.__statics)
+                if address >= _STATIC_END:
+                    raise ValueError("too many static variables")
+        else:
+            raise ValueError("unknown segment " + segment)
+        return PUSH_ADDRESS if push else POP_ADDRESS, address, None, None
+
+    @staticmethod
+    def load(path: str, native_os: bool = True) -> "VMInterpreter":
+        """Loads a .vm file, or all the .vm files of a directory, in the same
+        order the VM translator translates them.
+
+        Args:
+            path (str): a .vm file or a directory.
+            native_os (bool): run the functions of JackOS natively.
+
+        Returns:
+            VMInterpreter: an interpreter of the program.
+        """
+        if os.path.isdir(path):
+            paths = [os.path.join(path, filename)
+                     for filename in os.listdir(path)
+                     if os.path.splitext(filename)[1].lower() == ".vm"]
+        else:
+            paths = [path]
+        if not paths:
+            raise ValueError(path + ": no .vm files")
+        files = []
+        for vm_path in paths:
+            with open(vm_path, 'r') as input_file:
+                files.append((os.path.splitext(os.path.basename(vm_path))[0],
+                              Parser(input_file)))
+        return VMInterpreter(files, native_os)
+
+    def reset(self) -> None:
+        """Restarts the program, keeping the RAM: at Sys.init if the program
+        has it, as the VM emulator does, and otherwise at its first command.
+        """
+        self.pc = self.functions.get("Sys.init", 0)
+        self.halted = False
+        self.error = None
+
+    def bootstrap(self) -> None:
+        """Starts the program as its translation does: sets SP to 256, and
+        calls Sys.init, which returns to the end of the program.
+        """
+        ram = self.ram
+        ram[0] = 256
+        for register in (len(self.commands), ram[1], ram[2], ram[3], ram[4]):
+            ram[ram[0]] = _wrap(register)
+            ram[0] += 1
+        ram[2] = ram[0] - 5
+        ram[1] = ram[0]
+        self.reset()
+
+    def run(self, max_steps: int = 1 << 62) -> int:
+        """Executes commands until the program halts, or until the given
+        number of commands were executed. The program halts when it runs
+        past its last command, when it jumps to the goto it is at, as
+        Sys.halt of the Jack OS does, or when it calls the native Sys.halt or
+        Sys.error.
+
+        Args:
+            max_steps (int): the maximal number of commands to execute.
+
+        Returns:
+            int: the number of commands executed.
+        """
+        commands = self.__program
+        ram = self.ram
+        pc = self.pc
+        sp = ram[0]
+        steps = 0
+        while steps < max_steps:
+            op, x, y, name = commands[pc]
+            steps += 1
+            pc += 1
+            # The opcodes are literals, which are faster to compare than
+            # globals. SP is written back to the RAM only when the command
+            # may access it, that is, by a segment, and when the run ends.
+            if op == 1:  # PUSH_SEGMENT
+                ram[0] = sp
+                ram[sp] = ram[ram[x] + y]
+                sp += 1
+            elif op == 0:  # PUSH_CONSTANT
+                ram[sp] = x
+                sp += 1
+            elif op == 3:  # POP_SEGMENT
+                sp -= 1
+                ram[0] = sp
+                ram[ram[x] + y] = ram[sp]
+                sp = ram[0]  # in case the segment overlapped SP
+            elif op == 2:  # PUSH_ADDRESS
+                ram[sp] = ram[x]
+                sp += 1
+            elif op == 4:  # POP_ADDRESS
+                sp -= 1
+                ram[x] = ram[sp]
+            elif op == 5:  # ADD
+                sp -= 1
+                ram[sp - 1] = ((ram[sp - 1] + ram[sp] + 0x8000) & 0xFFFF) - \
+                    0x8000
+            elif op == 6:  # SUB
+                sp -= 1
+                ram[sp - 1] = ((ram[sp - 1] - ram[sp] + 0x8000) & 0xFFFF) - \
+                    0x8000
+            elif op == 17:  # IF_GOTO
+                sp -= 1
+                if ram[sp]:
+                    pc = x
+            elif op == 16:  # GOTO
+                if x == pc - 1:
+                    pc = x
+                    self.halted = True
+                    break
+                pc = x
+            elif op == 8:  # EQ
+                sp -= 1
+                ram[sp - 1] = -1 if ram[sp - 1] == ram[sp] else 0
+            elif op == 9:  # GT
+                sp -= 1
+                ram[sp - 1] = -1 if ram[sp - 1] > ram[sp] else 0
+            elif op == 10:  # LT
+                sp -= 1
+                ram[sp - 1] = -1 if ram[sp - 1] < ram[sp] else 0
+            elif op == 13:  # NOT
+                ram[sp - 1] = ~ram[sp - 1]
+            elif op == 11:  # AND
+                sp -= 1
+                ram[sp - 1] &= ram[sp]
+            elif op == 12:  # OR
+                sp -= 1
+                ram[sp - 1] |= ram[sp]
+            elif op == 7:  # NEG
+                ram[sp - 1] = ((0x8000 - ram[sp - 1]) & 0xFFFF) - 0x8000
+            elif op == 14:  # SHIFT_LEFT
+                ram[sp - 1] = (((ram[sp - 1] << 1) + 0x8000) & 0xFFFF) - 0x8000
+            elif op == 15:  # SHIFT_RIGHT
+                ram[sp - 1] >>= 1
+            elif op == 19:  # CALL
+                if x is None:
+                    pc -= 1
+                    steps -= 1
+                    self.pc = pc
+                    ram[0] = sp
+                    raise ValueError("undefined function " + name)
+                ram[sp] = ((pc + 0x8000) & 0xFFFF) - 0x8000
+                ram[sp + 1] = ram[1]
+                ram[sp + 2] = ram[2]
+                ram[sp + 3] = ram[3]
+                ram[sp + 4] = ram[4]
+                sp += 5
+                ram[2] = sp - 5 - y
+                ram[1] = sp
+                pc = x
+            elif op == 22:  # NATIVE
+                sp -= y
+                ram[0] = sp
+                try:
+                    value = x(*ram[sp:sp + y])
+                except Halt as halt:  # at the call, as if it never ran
+                    sp += y
+                    pc -= 1
+                    steps -= 1
+                    self.halted = True
+                    self.error = halt.error
+                    break
+                sp = ram[0]  # in case the function poked SP
+                ram[sp] = ((value + 0x8000) & 0xFFFF) - 0x8000
+                sp += 1
+            elif op == 18:  # FUNCTION
+                for _ in range(x):
+                    ram[sp] = 0
+                    sp += 1
+            elif op == 20:  # RETURN
+                frame = ram[1]
+                pc = ram[frame - 5] & 0xFFFF
+                argument = ram[2]
+                ram[argument] = ram[sp - 1]
+                sp = argument + 1
+                ram[4] = ram[frame - 1]
+                ram[3] = ram[frame - 2]
+                ram[2] = ram[frame - 3]
+                ram[1] = ram[frame - 4]
+            else:  # past the last command
+                pc -= 1
+                steps -= 1
+                self.halted = True
+                break
+        ram[0] = sp
+        self.pc = pc
+        return steps
+
+
+# A variable of a test script: RAM[i], a register, or a segment[i].
+_VARIABLE_PATTERN = re.compile(r"(?P<name>[A-Za-z]+)(?:\[(?P<index>\d+)\])?")
+
+# The registers of a test script, by their RAM address.
+_REGISTERS = {"sp": 0, "local": 1, "argument": 2, "this": 3, "that": 4}
+
+
+class VMTestScript(ScriptRunner):
+    """Runs a test script (.tst) of the VM emulator headlessly.
+
+    The command executing the program is "vmstep", and "load" loads a .vm
+    file, or the directory of the script when it names none. The variables
+    are RAM[i], the registers sp, local, argument, this and that, and the
+    segments local[i], argument[i], this[i], that[i], temp[i] and
+    pointer[i], see ScriptRunner.
+    """
+
+    STEP_COMMANDS = {"vmstep": 1}
+
+    def __init__(self, path: str, max_steps: int = 10 ** 8,
+                 native_os: bool = True) -> None:
+        """Reads a test script.
+
+        Args:
+            path (str): the path of the .tst file. The files the script
+                names are relative to its directory.
+            max_steps (int): the number of commands a "repeat" without a
+                count runs, unless the program halts before.
+            native_os (bool): run the functions of JackOS natively.
+        """
+        super().__init__(path, max_steps)
+        self.__native_os = native_os
+        self.__interpreter = None
+
+    def _load(self, path: str) -> None:
+        self.__interpreter = VMInterpreter.load(path, self.__native_os)
+
+    def _run(self, steps: int) -> None:
+        self.__interpreter.run(steps)
+
+    def _set(self, variable: str, value: int) -> None:
+        self.__interpreter.ram[self.__address(variable)] = value
+
+    def _get(self, variable: str) -> int:
+        return self.__interpreter.ram[self.__address(variable)]
+
+    def __address(self, variable: str) -> int:
+        """Returns the RAM address of a variable of the script."""
+        match = _VARIABLE_PATTERN.fullmatch(variable)
+        if match is None:
+            raise self._unknown_variable(variable)
+        name, index = match.group("name"), match.group("index")
+        if index is None:
+            if name in _REGISTERS:
+                return _REGISTERS[name]
+        elif name == "RAM":
+            return int(index)
+        elif name == "temp":
+            return _TEMP + int(index)
+        elif name == "pointer":
+            return _POINTER + int(index)
+        elif name in _SEGMENT_REGISTERS:
+            return self.__interpreter.ram[_SEGMENT_REGISTERS[name]] + \
+                int(index)
+        raise self._unknown_variable(variable)
+
+
+if "__main__" == __name__:
+    # Runs a VM program, or VM emulator test scripts.
+    argument_parser = argparse.ArgumentParser(
+        prog="VMInterpreter", description="Runs a VM program (a .vm file or "
+                                          "a directory), or VM emulator test "
+                                          "scripts (.tst), headlessly.")
+    argument_parser.add_argument(
+        "input_paths", nargs="+", metavar="input_path",
+        help="a program, or a test script")
+    argument_parser.add_argument(
+        "--steps", type=int, default=10 ** 8,
+        help="stop after this many commands, unless the program halts "
+             "before (default: 100000000)")
+    argument_parser.add_argument(
+        "--print", type=int, nargs="+", default=[], metavar="ADDRESS",
+        dest="addresses", help="print these RAM words after running")
+    argument_parser.add_argument(
+        "--jack-os", action="store_false", dest="native_os",
+        help="run the Jack OS of the program's .vm files, instead of the "
+             "native Math, Memory, Array, String and Sys functions")
+    arguments = argument_parser.parse_args()
+
+    failed = False
+    for input_path in arguments.input_paths:
+        if os.path.splitext(input_path)[1].lower() == ".tst":
+            script = VMTestScript(input_path, arguments.steps,
+                                  arguments.native_os)
+            try:
+                passed = script.run()
+            except (OSError, ValueError) as error:
+                passed = False
+                script.failure = str(error)
+            failed = failed or not passed
+            print(input_path + ": " + ("passed" if passed else script.failure))
+            continue
+        interpreter = VMInterpreter.load(os.path.abspath(input_path),
+                                         arguments.native_os)
+        interpreter.bootstrap()
+        start = time.perf_counter()
+        executed = interpreter.run(arguments.steps)
+        seconds = time.perf_counter() - start
+        print(str(executed) + " commands in " + format(seconds, ".3f") +
+              "s, " + format(executed / max(seconds, 1e-9), ",.0f") +
+              " commands/s" + (", halted" if interpreter.halted else "") +
+              (", error " + str(interpreter.error)
+               if interpreter.error is not None else ""))
+        for ram_address in arguments.addresses:
+            print("RAM[" + str(ram_address) + "] = " +
+                  str(interpreter.ram[ram_address]))
+    sys.exit(1 if failed else 0)
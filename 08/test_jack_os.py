@@ -0,0 +1,63 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import array
+from JackOS import HEAP_BASE, HEAP_END, JackOS
+
+
+def _memory() -> tuple:
+    ram = array.array('h', bytes(2 * (1 << 15)))
+    functions = JackOS(ram).functions()
+    functions["Memory.init"]()
+    return ram, functions["Memory.alloc"], functions["Memory.deAlloc"], \
+        functions["Memory.max"]
+
+
+def test_alloc_lays_out_blocks_as_memory_jack() -> None:
+    ram, alloc, de_alloc, memory_max = _memory()
+    block = alloc(20)
+    # carved from the end of the heap, with block[-1] = size + 1
+    assert block == HEAP_END - 20
+    assert ram[block - 1] == 21
+    assert ram[HEAP_BASE] == HEAP_END - HEAP_BASE - 21
+    assert ram[HEAP_BASE + 1] == 0
+
+
+def test_de_alloc_reuses_blocks() -> None:
+    # the sequence of 12/MemoryTest, whose blocks must all be distinct
+    ram, alloc, de_alloc, memory_max = _memory()
+    a = alloc(3)
+    b = alloc(3)
+    c = alloc(500)
+    assert len({a, b, c}) == 3
+    de_alloc(a)
+    de_alloc(b)
+    # the segment at b - 1 heads the free list, and is long enough again
+    assert ram[b - 1] == 4
+    assert alloc(3) == b
+    assert alloc(3) == a
+
+
+def test_alloc_fails_with_minus_one() -> None:
+    ram, alloc, de_alloc, memory_max = _memory()
+    assert alloc(HEAP_END - HEAP_BASE) == -1
+    # the rest of the segment would be too short, so it is all taken
+    block = alloc(HEAP_END - HEAP_BASE - 2)
+    assert block == HEAP_BASE + 1
+    assert ram[block - 1] == HEAP_END - HEAP_BASE
+    assert alloc(1) == -1
+    de_alloc(block)
+    assert alloc(1) != -1
+
+
+def test_max() -> None:
+    ram, alloc, de_alloc, memory_max = _memory()
+    block = alloc(4)
+    ram[block:block + 4] = array.array('h', [3, -7, 12, 5])
+    assert memory_max(block) == 12
+    ram[block - 1] = 1  # an empty block
+    assert memory_max(block) == 0
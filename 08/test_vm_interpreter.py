@@ -0,0 +1,51 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import glob
+import os
+import pathlib
+import shutil
+import pytest
+from VMInterpreter import VMTestScript
+
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# The VM emulator scripts of the project.
+_SCRIPTS = sorted(glob.glob(os.path.join(_DIRECTORY, "*", "*", "*VME.tst")))
+
+
+def _copy(script_path: str, directory: pathlib.Path) -> pathlib.Path:
+    """Copies the directory of a script, which writes its output there."""
+    copy = directory / os.path.basename(os.path.dirname(script_path))
+    shutil.copytree(os.path.dirname(script_path), copy)
+    return copy / os.path.basename(script_path)
+
+
+@pytest.mark.parametrize("script_path", _SCRIPTS,
+                         ids=[os.path.basename(path) for path in _SCRIPTS])
+def test_scripts_match_compare_files(script_path: str,
+                                     tmp_path: pathlib.Path) -> None:
+    script = VMTestScript(str(_copy(script_path, tmp_path)))
+    assert script.run(), script.failure
+    compare_path = glob.glob(str(tmp_path / "*" / "*.cmp"))[0]
+    with open(compare_path, 'r') as compare_file:
+        assert len(script.output_lines) == len(compare_file.readlines())
+
+
+def test_mismatch_fails(tmp_path: pathlib.Path) -> None:
+    script_path = _copy(os.path.join(
+        _DIRECTORY, "FunctionCalls", "FibonacciElement",
+        "FibonacciElementVME.tst"), tmp_path)
+    # the 4th Fibonacci element is 3, not 5
+    compare_path = script_path.parent / "FibonacciElement.cmp"
+    compare_path.write_text(compare_path.read_text().replace("3 |", "5 |"))
+    script = VMTestScript(str(script_path))
+    assert not script.run()
+    assert script.failure.startswith("comparison failure at line 2")
+    assert (script_path.parent / "FibonacciElement.out").read_text() \
+        .splitlines()[1] == "|    262 |      3 |"